@@ -5,15 +5,123 @@ load_dotenv()
 
 class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")  # e.g. a local fake server for load tests
+    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./faang_interviewer.db")
     APP_SECRET_KEY: str = os.getenv("APP_SECRET_KEY", "dev-secret-key")
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
     
+    # Database pool settings (async engine)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    
     # Interview settings
     DEFAULT_SESSION_DURATION: int = 45  # minutes
     MAX_QUESTIONS_PER_SESSION: int = 3
+    QUESTION_BANK_PATH: str = os.getenv("QUESTION_BANK_PATH", "")  # optional extra JSON question bank
+    
+    # Code execution settings (sandboxed worker pool)
+    CODE_RUNNER_WORKERS: int = int(os.getenv("CODE_RUNNER_WORKERS", "2"))
+    CODE_RUNNER_CPU_SECONDS: float = float(os.getenv("CODE_RUNNER_CPU_SECONDS", "2"))
+    CODE_RUNNER_MEMORY_MB: int = int(os.getenv("CODE_RUNNER_MEMORY_MB", "256"))
+    CODE_RUNNER_WALL_TIMEOUT_SECONDS: float = float(os.getenv("CODE_RUNNER_WALL_TIMEOUT_SECONDS", "5"))
+    CODE_RUNNER_MAX_JOBS_PER_WORKER: int = int(os.getenv("CODE_RUNNER_MAX_JOBS_PER_WORKER", "200"))
+    # Each job's child drops to this uid/gid when the API runs as root (65534 is "nobody")
+    CODE_RUNNER_SANDBOX_UID: int = int(os.getenv("CODE_RUNNER_SANDBOX_UID", "65534"))
+    CODE_RUNNER_SANDBOX_GID: int = int(os.getenv("CODE_RUNNER_SANDBOX_GID", "65534"))
+    # Refuse to run submissions where the seccomp filter can't be installed (non-Linux dev machines: set False)
+    CODE_RUNNER_REQUIRE_SECCOMP: bool = os.getenv("CODE_RUNNER_REQUIRE_SECCOMP", "True").lower() == "true"
+    # Empirical complexity measurement per submission (0 disables it)
+    COMPLEXITY_TIME_BUDGET_SECONDS: float = float(os.getenv("COMPLEXITY_TIME_BUDGET_SECONDS", "1"))
+    COMPLEXITY_MAX_INPUT_SIZE: int = int(os.getenv("COMPLEXITY_MAX_INPUT_SIZE", "65536"))
+    
+    # Metrics settings (Prometheus text format at /metrics)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+    
+    # Response settings (orjson; static catalog payloads are pre-encoded with an ETag)
+    STATIC_RESPONSE_MAX_AGE_SECONDS: int = int(os.getenv("STATIC_RESPONSE_MAX_AGE_SECONDS", "300"))
+    
+    # Submission persistence settings (write-behind, batched inserts)
+    SUBMISSION_WRITER_BATCH_SIZE: int = int(os.getenv("SUBMISSION_WRITER_BATCH_SIZE", "500"))
+    SUBMISSION_WRITER_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("SUBMISSION_WRITER_FLUSH_INTERVAL_SECONDS", "0.1"))
+    SUBMISSION_WRITER_MAX_QUEUE: int = int(os.getenv("SUBMISSION_WRITER_MAX_QUEUE", "10000"))
+    SUBMISSION_WRITER_ENQUEUE_TIMEOUT_SECONDS: float = float(os.getenv("SUBMISSION_WRITER_ENQUEUE_TIMEOUT_SECONDS", "5"))
+    SUBMISSION_WRITER_DRAIN_TIMEOUT_SECONDS: float = float(os.getenv("SUBMISSION_WRITER_DRAIN_TIMEOUT_SECONDS", "10"))
+    
+    # Batch grading settings
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+    BATCH_MAX_CONCURRENCY: int = int(os.getenv("BATCH_MAX_CONCURRENCY", "8"))
+    
+    # Shared state settings ("memory" is per-process; "sqlite" lets several uvicorn workers share sessions/stats)
+    STATE_BACKEND: str = os.getenv("STATE_BACKEND", "memory")
+    STATE_DB_PATH: str = os.getenv("STATE_DB_PATH", "./faang_state.db")
+    
+    # Session store settings
+    SESSION_STORE_MAX_SESSIONS: int = int(os.getenv("SESSION_STORE_MAX_SESSIONS", "100000"))
+    SESSION_IDLE_TTL_SECONDS: float = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "7200"))
+    SESSION_RETENTION_SECONDS: float = float(os.getenv("SESSION_RETENTION_SECONDS", "86400"))
+    SESSION_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+    # STATE_BACKEND=sqlite: last-seen times from reads are written back in one batch this often
+    SESSION_TOUCH_FLUSH_SECONDS: float = float(os.getenv("SESSION_TOUCH_FLUSH_SECONDS", "5"))
+    
+    # Live session settings (WebSocket channel per interview session)
+    LIVE_SESSION_TICK_SECONDS: float = float(os.getenv("LIVE_SESSION_TICK_SECONDS", "1"))
+    LIVE_SESSION_MAX_CONNECTIONS: int = int(os.getenv("LIVE_SESSION_MAX_CONNECTIONS", "10000"))
+    LIVE_SESSION_MAX_QUEUE: int = int(os.getenv("LIVE_SESSION_MAX_QUEUE", "32"))
     
     # AI Analysis settings
     AI_ANALYSIS_ENABLED: bool = bool(OPENAI_API_KEY)
+    
+    # LLM client settings
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+    LLM_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "10"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "1"))
+    
+    # LLM scheduler settings (rate 0 disables the token bucket)
+    LLM_REQUESTS_PER_SECOND: float = float(os.getenv("LLM_REQUESTS_PER_SECOND", "10"))
+    LLM_BURST: int = int(os.getenv("LLM_BURST", "20"))
+    LLM_MAX_QUEUE: int = int(os.getenv("LLM_MAX_QUEUE", "200"))
+    LLM_INTERACTIVE_MAX_WAIT_SECONDS: float = float(os.getenv("LLM_INTERACTIVE_MAX_WAIT_SECONDS", "3"))
+    LLM_BACKGROUND_MAX_WAIT_SECONDS: float = float(os.getenv("LLM_BACKGROUND_MAX_WAIT_SECONDS", "30"))
+    LLM_BREAKER_FAILURES: int = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+    LLM_BREAKER_RESET_SECONDS: float = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+    
+    # Analysis cache settings (empty DB path keeps the cache memory-only)
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "10000"))
+    ANALYSIS_CACHE_TTL_SECONDS: float = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "86400"))
+    ANALYSIS_CACHE_DB_PATH: str = os.getenv("ANALYSIS_CACHE_DB_PATH", "")
+    
+    # Analysis prompt budget settings (local token estimate; code is compacted, then trimmed around the entry point)
+    ANALYSIS_PROMPT_MAX_TOKENS: int = int(os.getenv("ANALYSIS_PROMPT_MAX_TOKENS", "3000"))
+    ANALYSIS_DESCRIPTION_MAX_TOKENS: int = int(os.getenv("ANALYSIS_DESCRIPTION_MAX_TOKENS", "600"))
+    ANALYSIS_MAX_COMPLETION_TOKENS: int = int(os.getenv("ANALYSIS_MAX_COMPLETION_TOKENS", "800"))
+    ANALYSIS_TOKEN_LOG_SIZE: int = int(os.getenv("ANALYSIS_TOKEN_LOG_SIZE", "200"))
+    
+    # Pre-generated question pool settings
+    QUESTION_POOL_TARGET_DEPTH: int = int(os.getenv("QUESTION_POOL_TARGET_DEPTH", "5"))
+    QUESTION_POOL_REFILLS_PER_MINUTE: float = float(os.getenv("QUESTION_POOL_REFILLS_PER_MINUTE", "30"))
+    QUESTION_POOL_MAX_KEYS: int = int(os.getenv("QUESTION_POOL_MAX_KEYS", "50"))
+    # Topic pools nobody has drawn from for this long are dropped (difficulty-only pools are kept)
+    QUESTION_POOL_KEY_IDLE_SECONDS: float = float(os.getenv("QUESTION_POOL_KEY_IDLE_SECONDS", "1800"))
+    
+    # Near-duplicate question settings (MinHash/LSH over title + description shingles)
+    QUESTION_SIMILARITY_THRESHOLD: float = float(os.getenv("QUESTION_SIMILARITY_THRESHOLD", "0.5"))
+    QUESTION_SIMILARITY_BINS: int = int(os.getenv("QUESTION_SIMILARITY_BINS", "64"))
+    QUESTION_SIMILARITY_BANDS: int = int(os.getenv("QUESTION_SIMILARITY_BANDS", "16"))
+    QUESTION_SIMILARITY_RETRIES: int = int(os.getenv("QUESTION_SIMILARITY_RETRIES", "1"))
+    
+    # Code similarity settings (winnowed AST fingerprints per question, for plagiarism screening)
+    CODE_SIMILARITY_KGRAM: int = int(os.getenv("CODE_SIMILARITY_KGRAM", "16"))
+    CODE_SIMILARITY_WINDOW: int = int(os.getenv("CODE_SIMILARITY_WINDOW", "8"))
+    CODE_SIMILARITY_MAX_POSTING: int = int(os.getenv("CODE_SIMILARITY_MAX_POSTING", "50"))
+    CODE_SIMILARITY_FLAG_THRESHOLD: float = float(os.getenv("CODE_SIMILARITY_FLAG_THRESHOLD", "0.6"))
+    CODE_SIMILARITY_MAX_COHORT: int = int(os.getenv("CODE_SIMILARITY_MAX_COHORT", "200000"))
+    CODE_SIMILARITY_WORKERS: int = int(os.getenv("CODE_SIMILARITY_WORKERS", "0"))  # 0 = one per CPU
 
 settings = Settings()
\ No newline at end of file
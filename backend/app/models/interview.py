@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Float, Boolean, JSON
+from sqlalchemy import Column, BigInteger, Integer, String, Date, DateTime, Text, Float, Boolean, JSON, Index
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -7,16 +8,82 @@ from pydantic import BaseModel
 
 Base = declarative_base()
 
+# SQLite's CURRENT_TIMESTAMP has second precision; binding values in the same
+# format keeps equality comparisons (e.g. keyset cursors) exact
+SecondPrecisionDateTime = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite"
+)
+
 class InterviewSession(Base):
     __tablename__ = "interview_sessions"
     
     id = Column(Integer, primary_key=True, index=True)
     session_type = Column(String(50))  # "coding", "system_design", "behavioral"
     duration_minutes = Column(Integer, default=45)
-    start_time = Column(DateTime, default=func.now())
+    start_time = Column(SecondPrecisionDateTime, default=func.now())
     end_time = Column(DateTime, nullable=True)
     status = Column(String(20), default="in_progress")  # "in_progress", "completed", "paused"
     questions_data = Column(JSON)  # Store questions and responses
     ai_analysis = Column(Text, nullable=True)
     overall_score = Column(Float, nullable=True)
-    created_at = Column(DateTime, default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, default=func.now())
+    
+    # Keyset pagination indexes: newest-first listing, optionally filtered
+    __table_args__ = (
+        Index("ix_interview_sessions_start_time_id", "start_time", "id"),
+        Index("ix_interview_sessions_status_start_time_id", "status", "start_time", "id"),
+        Index("ix_interview_sessions_type_start_time_id", "session_type", "start_time", "id"),
+    )
+    
+    # Fetch server-side defaults (start_time, created_at) in the INSERT itself
+    # so async handlers don't need a refresh round trip
+    __mapper_args__ = {"eager_defaults": True}
+
+class Submission(Base):
+    __tablename__ = "submissions"
+    
+    id = Column(String(36), primary_key=True)  # uuid4, assigned when the submission is accepted
+    question_id = Column(String(100), nullable=False)
+    session_id = Column(String(36), nullable=True)
+    difficulty = Column(String(20), nullable=True)
+    tags = Column(JSON, nullable=True)  # The question's tags, for the per-tag progress rollups
+    user_code = Column(Text, nullable=False)
+    time_taken_seconds = Column(Integer, nullable=False)
+    analysis = Column(JSON)
+    analysis_tier = Column(String(20), nullable=True)  # "static", "execution", "llm"
+    overall_score = Column(Float, nullable=True)
+    fingerprint_count = Column(Integer, nullable=True)  # Distinct code fingerprints, for similarity scores
+    created_at = Column(DateTime, default=func.now())
+    
+    __table_args__ = (
+        Index("ix_submissions_question_id_created_at", "question_id", "created_at"),
+        Index("ix_submissions_session_id", "session_id"),
+    )
+
+class ProgressRollup(Base):
+    __tablename__ = "progress_rollups"  # Score aggregates per day/week bucket
+    
+    period = Column(String(5), primary_key=True)  # "day", "week"
+    period_start = Column(Date, primary_key=True)  # UTC day, or the Monday starting the week
+    dimension = Column(String(20), primary_key=True)  # "overall", "difficulty", "tag"
+    key = Column(String(100), primary_key=True)  # difficulty/tag name, "" for overall
+    attempts = Column(Integer, nullable=False, default=0)
+    solved = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    best_score = Column(Float, nullable=False, default=0.0)
+    
+    # The primary key leads with (period, period_start), so a dashboard window is
+    # one range scan; without a rowid SQLite stores rows in that order
+    __table_args__ = {"sqlite_with_rowid": False}
+
+class CodeFingerprint(Base):
+    __tablename__ = "code_fingerprints"  # Winnowed code fingerprint postings, per question
+    
+    question_id = Column(String(100), primary_key=True)
+    fingerprint = Column(BigInteger, primary_key=True)  # 61-bit hash of a normalized AST token k-gram
+    submission_id = Column(String(36), primary_key=True)
+    
+    # (question_id, fingerprint) leads the key, so a posting list is one range
+    # scan, stored contiguously without a rowid
+    __table_args__ = {"sqlite_with_rowid": False}
@@ -22,4 +22,13 @@ class QuestionSubmission(BaseModel):
     question_id: str
     user_code: Optional[str] = None
     user_answer: Optional[str] = None
-    time_taken_seconds: int
\ No newline at end of file
+    time_taken_seconds: int
+    deep_review: bool = False  # Always get the LLM review, even if local tiers settle the score
+
+class SubmissionBatch(BaseModel):
+    submissions: List[QuestionSubmission]  # CodeSubmission payloads validate too (extra fields ignored)
+
+class CohortRescore(BaseModel):
+    question_id: str
+    submission_ids: Optional[List[str]] = None  # Defaults to every stored submission for the question
+    k: int = 5
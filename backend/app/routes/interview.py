@@ -1,18 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+import base64
+import binascii
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from datetime import datetime
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.interview import InterviewSession
 from app.models.schemas import InterviewSessionCreate, InterviewSessionResponse, QuestionSubmission
 
 router = APIRouter(prefix="/interview", tags=["interview"])
 
+# Only the columns InterviewSessionResponse serializes; skips questions_data/ai_analysis
+SESSION_RESPONSE_COLUMNS = [
+    InterviewSession.__table__.c[name] for name in InterviewSessionResponse.model_fields
+]
+
+def encode_cursor(start_time: datetime, session_id: int) -> str:
+    raw = f"{start_time.isoformat()}|{session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        start_time, session_id = raw.split("|")
+        return datetime.fromisoformat(start_time), int(session_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.post("/start", response_model=InterviewSessionResponse)
 async def start_interview_session(
     session_data: InterviewSessionCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Start a new interview session"""
     new_session = InterviewSession(
@@ -22,34 +42,58 @@ async def start_interview_session(
     )
     
     db.add(new_session)
-    db.commit()
-    db.refresh(new_session)
+    await db.commit()
     
     return new_session
 
 @router.get("/sessions", response_model=List[InterviewSessionResponse])
-async def get_all_sessions(db: Session = Depends(get_db)):
-    """Get all interview sessions"""
-    sessions = db.query(InterviewSession).all()
-    return sessions
+async def get_all_sessions(
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    session_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get interview sessions, newest first, one keyset page at a time
+    
+    Pass the X-Next-Cursor response header back as ?cursor= to get the next page.
+    """
+    query = select(*SESSION_RESPONSE_COLUMNS)
+    if status:
+        query = query.where(InterviewSession.status == status)
+    if session_type:
+        query = query.where(InterviewSession.session_type == session_type)
+    if cursor:
+        start_time, session_id = decode_cursor(cursor)
+        query = query.where(tuple_(InterviewSession.start_time, InterviewSession.id) < (start_time, session_id))
+    query = query.order_by(InterviewSession.start_time.desc(), InterviewSession.id.desc()).limit(limit + 1)
+    
+    rows = (await db.execute(query)).mappings().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["start_time"], rows[-1]["id"])
+    return rows
 
 @router.get("/session/{session_id}", response_model=InterviewSessionResponse)
-async def get_session(session_id: int, db: Session = Depends(get_db)):
+async def get_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get specific interview session"""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+    result = await db.execute(select(*SESSION_RESPONSE_COLUMNS).where(InterviewSession.id == session_id))
+    session = result.mappings().first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     return session
 
 @router.post("/session/{session_id}/end")
-async def end_interview_session(session_id: int, db: Session = Depends(get_db)):
+async def end_interview_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """End an interview session"""
-    session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
-    if not session:
+    result = await db.execute(
+        update(InterviewSession)
+        .where(InterviewSession.id == session_id)
+        .values(end_time=datetime.now(), status="completed")
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Session not found")
-    
-    session.end_time = datetime.now()
-    session.status = "completed"
-    db.commit()
+    await db.commit()
     
     return {"message": "Interview session ended successfully"}
\ No newline at end of file
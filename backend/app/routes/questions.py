@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Dict, Any, Optional
 
 from app.database import get_db
 from app.services.ai_service import ai_service
-from app.models.schemas import QuestionSubmission
+from app.services.analysis_cache import analysis_cache
+from app.services.analysis_pipeline import analysis_pipeline
+from app.services.code_similarity import code_similarity
+from app.services.fast_json import StaticJSON, dumps
+from app.services.live_sessions import live_sessions
+from app.services.prompt_budget import prompt_budget
+from app.services.question_index import public_question, question_index
+from app.services.question_pool import question_pool
+from app.services.question_similarity import question_similarity
+from app.services.submission_writer import SubmissionQueueFull, submission_row, submission_writer
+from app.models.schemas import CohortRescore, QuestionSubmission, SubmissionBatch
 from app.config import settings
 from datetime import datetime
+import uuid
 
 router = APIRouter(prefix="/questions", tags=["questions"])
 
@@ -20,74 +32,203 @@ async def generate_question(
     if difficulty not in ["easy", "medium", "hard"]:
         raise HTTPException(status_code=400, detail="Invalid difficulty. Use: easy, medium, or hard")
     
-    # Use AI generation if available, otherwise fallback
-    if settings.AI_ANALYSIS_ENABLED:
-        question = await ai_service.generate_coding_question_with_ai(difficulty, topic)
-    else:
+    # Serve a pre-generated AI question if one is ready, otherwise fallback
+    question = question_pool.pop(difficulty, topic) if settings.AI_ANALYSIS_ENABLED else None
+    ai_generated = question is not None
+    if question is None:
         question = ai_service.generate_coding_question(difficulty)
     
     return {
         "success": True,
-        "question": question,
-        "ai_generated": settings.AI_ANALYSIS_ENABLED,
+        "question": public_question(question),
+        "ai_generated": ai_generated,
         "generated_at": datetime.now().isoformat()
     }
 
-@router.post("/submit")
-async def submit_solution(submission: QuestionSubmission, db: Session = Depends(get_db)):
-    """Submit and analyze a coding solution"""
-    
-    # Mock question data for analysis
-    mock_question = {
+def submission_question(question_id: str) -> Dict[str, Any]:
+    """Bank questions carry test cases; unknown ids are analyzed against a generic description"""
+    return question_index.get(question_id) or {
+        "id": question_id,
         "title": "Sample Problem",
         "description": "Sample coding problem",
         "time_limit_minutes": 20,
         "difficulty": "medium"
     }
+
+async def save_quietly(row: Dict[str, Any]) -> None:
+    """Persist a submission from inside a streaming response, where a 503 can no longer be sent"""
+    try:
+        await submission_writer.save(row)
+    except SubmissionQueueFull as e:
+        print(f"Warning: submission {row['id']} not saved: {e}")
+
+@router.post("/submit")
+async def submit_solution(submission: QuestionSubmission, db: Session = Depends(get_db)):
+    """Submit and analyze a coding solution"""
     
-    # Use AI analysis if available
-    if settings.AI_ANALYSIS_ENABLED and submission.user_code:
-        analysis = await ai_service.analyze_code_with_ai(
-            question=mock_question,
-            user_code=submission.user_code,
-            time_taken=submission.time_taken_seconds
-        )
-    else:
-        analysis = ai_service.analyze_code_solution(
-            question=mock_question,
-            user_code=submission.user_code or "",
-            time_taken=submission.time_taken_seconds
-        )
+    question = submission_question(submission.question_id)
+    
+    # Cheap local tiers first; the LLM only runs when they can't settle the score
+    analysis, tier, cached = await analysis_pipeline.analyze(
+        question=question,
+        user_code=submission.user_code or "",
+        time_taken=submission.time_taken_seconds,
+        deep_review=submission.deep_review
+    )
+    
+    submission_id = str(uuid.uuid4())
+    try:
+        await submission_writer.save(submission_row(
+            submission_id, submission.question_id, submission.user_code or "", submission.time_taken_seconds,
+            analysis, tier, difficulty=question.get("difficulty"), tags=question.get("tags")
+        ))
+    except SubmissionQueueFull:
+        raise HTTPException(status_code=503, detail="Too many submissions in flight", headers={"Retry-After": "1"})
     
     return {
         "success": True,
         "analysis": analysis,
-        "ai_powered": settings.AI_ANALYSIS_ENABLED,
-        "submission_id": f"sub_{submission.question_id}_{int(datetime.now().timestamp())}"
+        "analysis_tier": tier,
+        "ai_powered": tier == "llm",
+        "cached": cached,
+        "submission_id": submission_id
     }
 
+@router.post("/submit/stream")
+async def submit_solution_stream(submission: QuestionSubmission):
+    """Submit a solution and stream the analysis as Server-Sent Events
+    
+    Events: "local" (static/execution result, immediately), then while the LLM
+    writes "token" (raw text), "field" (a finished top-level field) and "item"
+    (a finished feedback/improvement entry), then "done" with the full analysis.
+    """
+    question = submission_question(submission.question_id)
+    
+    async def events():
+        async for event, data in analysis_pipeline.stream(
+            question=question,
+            user_code=submission.user_code or "",
+            time_taken=submission.time_taken_seconds,
+            deep_review=submission.deep_review
+        ):
+            if event == "done":
+                data["submission_id"] = str(uuid.uuid4())
+                await save_quietly(submission_row(
+                    data["submission_id"], submission.question_id, submission.user_code or "",
+                    submission.time_taken_seconds, data["analysis"], data["analysis_tier"],
+                    difficulty=question.get("difficulty"), tags=question.get("tags")
+                ))
+            yield b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/submit/batch")
+async def submit_solutions_batch(batch: SubmissionBatch):
+    """Grade many solutions at once, streaming one NDJSON line per submission as it finishes
+    
+    Equivalent code for the same question is analyzed once and fanned back out
+    (marked with duplicate_of); lines arrive in completion order with their
+    index in the request. A final {"done": true, ...} line closes the stream.
+    """
+    if not batch.submissions:
+        raise HTTPException(status_code=400, detail="No submissions in batch")
+    if len(batch.submissions) > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(batch.submissions)} items (max {settings.BATCH_MAX_ITEMS})"
+        )
+    
+    submissions = [
+        {
+            "question": submission_question(item.question_id),
+            "user_code": item.user_code or "",
+            "time_taken": item.time_taken_seconds,
+            "deep_review": item.deep_review
+        }
+        for item in batch.submissions
+    ]
+    
+    async def lines():
+        started = datetime.now()
+        async for result in analysis_pipeline.analyze_batch(submissions, settings.BATCH_MAX_CONCURRENCY):
+            item = batch.submissions[result["index"]]
+            result["question_id"] = item.question_id
+            result["submission_id"] = str(uuid.uuid4())
+            if result["success"]:
+                # Waiting on a full queue here slows the stream down instead of failing it
+                await save_quietly(submission_row(
+                    result["submission_id"], item.question_id, item.user_code or "", item.time_taken_seconds,
+                    result["analysis"], result["analysis_tier"],
+                    difficulty=submissions[result["index"]]["question"].get("difficulty"),
+                    tags=submissions[result["index"]]["question"].get("tags")
+                ))
+            yield dumps(result) + b"\n"
+        elapsed_ms = (datetime.now() - started).total_seconds() * 1000
+        yield dumps({"done": True, "items": len(submissions), "elapsed_ms": round(elapsed_ms, 1)}) + b"\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.get("/submissions/{submission_id}/similar")
+async def similar_submissions(submission_id: str, k: int = 5):
+    """Other submissions to the same question whose code most resembles this one (plagiarism screening)"""
+    if not 1 <= k <= 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    result = await code_similarity.similar_to_submission(submission_id, k)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return result
+
+@router.post("/similarity/rescore")
+async def rescore_cohort(request: CohortRescore):
+    """Score each submission in a cohort against the others, most suspicious first"""
+    if not 1 <= request.k <= 100:
+        raise HTTPException(status_code=400, detail="k must be between 1 and 100")
+    try:
+        return await code_similarity.rescore(request.question_id, request.submission_ids, request.k)
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+CATEGORY_CATALOG = StaticJSON({
+    "categories": [
+        {"name": "Array", "count": 150, "difficulty_distribution": {"easy": 50, "medium": 70, "hard": 30}},
+        {"name": "String", "count": 120, "difficulty_distribution": {"easy": 40, "medium": 60, "hard": 20}},
+        {"name": "Hash Table", "count": 80, "difficulty_distribution": {"easy": 30, "medium": 35, "hard": 15}},
+        {"name": "Dynamic Programming", "count": 200, "difficulty_distribution": {"easy": 20, "medium": 100, "hard": 80}},
+        {"name": "Tree", "count": 100, "difficulty_distribution": {"easy": 25, "medium": 50, "hard": 25}},
+        {"name": "Graph", "count": 90, "difficulty_distribution": {"easy": 15, "medium": 45, "hard": 30}}
+    ],
+    "total_questions": 740
+})
+
 @router.get("/categories")
-async def get_question_categories():
+async def get_question_categories(request: Request):
     """Get available question categories"""
-    return {
-        "categories": [
-            {"name": "Array", "count": 150, "difficulty_distribution": {"easy": 50, "medium": 70, "hard": 30}},
-            {"name": "String", "count": 120, "difficulty_distribution": {"easy": 40, "medium": 60, "hard": 20}},
-            {"name": "Hash Table", "count": 80, "difficulty_distribution": {"easy": 30, "medium": 35, "hard": 15}},
-            {"name": "Dynamic Programming", "count": 200, "difficulty_distribution": {"easy": 20, "medium": 100, "hard": 80}},
-            {"name": "Tree", "count": 100, "difficulty_distribution": {"easy": 25, "medium": 50, "hard": 25}},
-            {"name": "Graph", "count": 90, "difficulty_distribution": {"easy": 15, "medium": 45, "hard": 30}}
-        ],
-        "total_questions": 740
-    }
+    return CATEGORY_CATALOG.response(request)
 
-@router.get("/stats")
-async def get_system_stats():
-    """Get system statistics"""
+def system_stats() -> Dict[str, Any]:
     return {
         "ai_enabled": settings.AI_ANALYSIS_ENABLED,
+        "analysis_cache": analysis_cache.stats(),
+        "analysis_pipeline": analysis_pipeline.stats(),
+        "submission_writer": submission_writer.stats(),
+        "question_pool": question_pool.stats(),
+        "question_similarity": question_similarity.stats(),
+        "code_similarity": code_similarity.stats(),
+        "live_sessions": live_sessions.stats(),
+        "llm_single_flight": ai_service.single_flight.stats(),
+        "llm_prompt_budget": prompt_budget.stats(),
+        "llm_scheduler": ai_service.scheduler.stats(),
         "total_sessions_today": 0,  # We'll implement this with real data later
         "average_session_duration": "23 minutes",
         "most_popular_difficulty": "medium",
         "success_rate": "68%"
-    }
\ No newline at end of file
+    }
+
+@router.get("/stats")
+async def get_system_stats():
+    """Get system statistics (counters change on every request, so no ETag)"""
+    return system_stats()
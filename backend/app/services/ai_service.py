@@ -1,25 +1,220 @@
-import openai
+import asyncio
+import hashlib
+import time
 import json
-from typing import Dict, List, Any
+import random
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 from datetime import datetime
 from app.config import settings
+from app.services.llm_scheduler import INTERACTIVE, BACKGROUND, LLMScheduler, LLMUnavailable
+from app.services.metrics import llm_request_duration, llm_tokens, metrics
+from app.services.prompt_budget import prompt_budget
+from app.services.question_similarity import question_similarity
+from app.services.single_flight import SingleFlight
+
+# Predefined questions used when AI generation is unavailable (built once, not per call)
+FALLBACK_QUESTIONS = {
+    "easy": [
+        {
+            "id": "two_sum",
+            "title": "Two Sum",
+            "description": "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target.",
+            "examples": [
+                {
+                    "input": "nums = [2,7,11,15], target = 9",
+                    "output": "[0,1]",
+                    "explanation": "Because nums[0] + nums[1] == 9, we return [0, 1]."
+                }
+            ],
+            "difficulty": "easy",
+            "tags": ["Array", "Hash Table"],
+            "time_limit_minutes": 15
+        }
+    ],
+    "medium": [
+        {
+            "id": "longest_substring",
+            "title": "Longest Substring Without Repeating Characters",
+            "description": "Given a string s, find the length of the longest substring without repeating characters.",
+            "examples": [
+                {
+                    "input": 's = "abcabcbb"',
+                    "output": "3",
+                    "explanation": 'The answer is "abc", with the length of 3.'
+                }
+            ],
+            "difficulty": "medium",
+            "tags": ["Hash Table", "String", "Sliding Window"],
+            "time_limit_minutes": 25
+        }
+    ]
+}
+
+def _classify_llm_error(error: BaseException):
+    """How an LLM call failure counts toward the circuit breaker"""
+    import httpx
+    import openai
+    
+    if isinstance(error, openai.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        return "failure"  # Includes timeouts
+    if isinstance(error, openai.APIStatusError):
+        return "failure" if error.status_code >= 500 else None
+    if isinstance(error, httpx.TransportError):
+        return "failure"
+    return None
 
 class AIInterviewService:
     def __init__(self):
-        if settings.OPENAI_API_KEY:
-            self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        else:
-            self.client = None
+        # The OpenAI SDK (and httpx/httpcore under it) is imported with the first
+        # LLM call rather than at start-up; see `client`
+        self.enabled = bool(settings.OPENAI_API_KEY)
+        self._client = None
+        if not self.enabled:
             print("Warning: OpenAI API key not provided. Using mock responses.")
+        
+        # Caps in-flight LLM calls and their rate; sheds to the local fallback when the wait would blow the budget
+        self.scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            requests_per_second=settings.LLM_REQUESTS_PER_SECOND,
+            burst=settings.LLM_BURST,
+            max_queue=settings.LLM_MAX_QUEUE,
+            failure_threshold=settings.LLM_BREAKER_FAILURES,
+            reset_seconds=settings.LLM_BREAKER_RESET_SECONDS,
+            classify_error=_classify_llm_error
+        )
+        # Identical prompts in flight at the same time share one upstream call
+        self.single_flight = SingleFlight()
     
-    async def generate_coding_question_with_ai(self, difficulty: str, topic: str = None) -> Dict[str, Any]:
+    @property
+    def client(self):
+        """The shared AsyncOpenAI client, built on first use; None without an API key"""
+        if self._client is None and self.enabled:
+            import httpx
+            import openai
+            
+            # One shared, bounded connection pool for every LLM call on this worker
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(
+                    settings.LLM_TIMEOUT_SECONDS,
+                    connect=settings.LLM_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+            self._client = openai.AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_BASE_URL or None,
+                http_client=http_client,
+                max_retries=settings.LLM_MAX_RETRIES
+            )
+        return self._client
+    
+    def _max_wait(self, priority: int) -> float:
+        if priority == BACKGROUND:
+            return settings.LLM_BACKGROUND_MAX_WAIT_SECONDS
+        return settings.LLM_INTERACTIVE_MAX_WAIT_SECONDS
+    
+    @contextmanager
+    def _timed_call(self, operation: str):
+        """Record one LLM call's duration (queueing included) under its outcome"""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            yield
+            outcome = "ok"
+        except LLMUnavailable:
+            outcome = "shed"
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            outcome = "cancelled"
+            raise
+        finally:
+            llm_request_duration.labels(operation, outcome).observe(time.perf_counter() - started)
+    
+    async def _chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: str,
+        priority: int = INTERACTIVE,
+        max_tokens: Optional[int] = None,
+        report: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Run one chat completion, coalesced with identical in-flight requests"""
+        request = json.dumps([settings.OPENAI_MODEL, temperature, max_tokens, messages])
+        key = hashlib.sha256(request.encode("utf-8")).hexdigest()
+        return await self.single_flight.do(
+            key, lambda: self._request_completion(messages, temperature, operation, priority, max_tokens, report)
+        )
+    
+    async def _request_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        operation: str,
+        priority: int,
+        max_tokens: Optional[int],
+        report: Optional[Dict[str, Any]]
+    ) -> str:
+        """Run one chat completion once the scheduler admits it and return the message text"""
+        with self._timed_call(operation):
+            async with self.scheduler.slot(priority, self._max_wait(priority)):
+                response = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=messages,
+                    temperature=temperature,
+                    timeout=settings.LLM_TIMEOUT_SECONDS,
+                    **({"max_tokens": max_tokens} if max_tokens else {})
+                )
+        if report is None:
+            report = {"estimated_prompt_tokens": prompt_budget.estimate_messages(messages)}
+        if response.usage:
+            llm_tokens.labels(operation, "prompt").inc(response.usage.prompt_tokens)
+            llm_tokens.labels(operation, "completion").inc(response.usage.completion_tokens)
+            prompt_budget.record(operation, report, response.usage.prompt_tokens, response.usage.completion_tokens)
+        else:
+            prompt_budget.record(operation, report, None, None)
+        return response.choices[0].message.content
+    
+    async def aclose(self):
+        """Close the shared HTTP connection pool"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    async def generate_coding_question_with_ai(
+        self, difficulty: str, topic: str = None, priority: int = INTERACTIVE
+    ) -> Dict[str, Any]:
         """Generate a coding question using OpenAI API"""
         
-        if not self.client:
+        if not self.enabled:
             return self.generate_coding_question(difficulty)  # Fallback to mock
         
         try:
-            prompt = f"""
+            # Identical concurrent requests share one generation, duplicate check and
+            # retries included, so every waiter gets the same accepted question
+            key = "question:" + json.dumps([settings.OPENAI_MODEL, difficulty, topic, priority])
+            question = await self.single_flight.do(key, lambda: self._generate_question(difficulty, topic, priority))
+            return dict(question)
+            
+        except LLMUnavailable:
+            question = dict(self.generate_coding_question(difficulty))  # Shed: fall back without waiting
+            question["ai_fallback"] = True
+            return question
+        except Exception as e:
+            print(f"Error generating AI question: {e}")
+            question = dict(self.generate_coding_question(difficulty))  # Fallback
+            question["ai_fallback"] = True
+            return question
+    
+    async def _generate_question(self, difficulty: str, topic: Optional[str], priority: int) -> Dict[str, Any]:
+        """One generation: ask, reject near-duplicates, ask again with the clash named, then fall back"""
+        prompt = f"""
             Generate a {difficulty} level coding interview question suitable for FAANG companies.
             {f"Focus on {topic} if provided." if topic else ""}
             
@@ -44,114 +239,83 @@ class AIInterviewService:
             
             Make sure the question is original, challenging, and tests algorithmic thinking.
             """
-            
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7
+        
+        # Reject near-duplicates of the bank and of earlier generated questions
+        for attempt in range(settings.QUESTION_SIMILARITY_RETRIES + 1):
+            content = await self._chat_completion(
+                [{"role": "user", "content": prompt}], temperature=0.7, operation="question", priority=priority
             )
-            
-            question_data = json.loads(response.choices[0].message.content)
-            return question_data
-            
-        except Exception as e:
-            print(f"Error generating AI question: {e}")
-            return self.generate_coding_question(difficulty)  # Fallback
+            question_data = json.loads(content)
+            duplicate = question_similarity.add_if_new(question_data)
+            if duplicate is None:
+                return question_data
+            prompt += f"\n            It must not be a variant of \"{duplicate[1]}\".\n"
+        
+        question = dict(self.generate_coding_question(difficulty))
+        question["ai_fallback"] = True
+        question["near_duplicate_of"] = duplicate[0]
+        return question
     
     async def analyze_code_with_ai(self, question: Dict, user_code: str, time_taken: int) -> Dict[str, Any]:
         """Analyze code solution using OpenAI API"""
         
-        if not self.client:
+        if not self.enabled:
             return self.analyze_code_solution(question, user_code, time_taken)  # Fallback
         
         try:
-            prompt = f"""
-            Analyze this coding interview solution:
-            
-            Question: {question.get('title', 'Unknown')}
-            Description: {question.get('description', 'No description')}
-            
-            User's Code:
-            {user_code}
-            
-            Time taken: {time_taken} seconds (limit was {question.get('time_limit_minutes', 20) * 60} seconds)
-            
-            Provide analysis in this JSON format:
-            {{
-                "correctness_score": 0-100,
-                "efficiency_score": 0-100,
-                "code_quality_score": 0-100,
-                "time_management_score": 0-100,
-                "overall_score": 0-100,
-                "feedback": ["positive feedback point 1", "positive feedback point 2"],
-                "improvements": ["improvement suggestion 1", "improvement suggestion 2"],
-                "time_complexity": "O(?)",
-                "space_complexity": "O(?)",
-                "interview_tips": ["tip1", "tip2"]
-            }}
-            
-            Be constructive but honest in your assessment.
-            """
+            # Compacted code under a static, shared instruction prefix; see prompt_budget
+            messages, report = await prompt_budget.prepare(question, user_code, time_taken)
             
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3
+            content = await self._chat_completion(
+                messages, temperature=0.3, operation="analysis",
+                max_tokens=prompt_budget.max_completion_tokens, report=report
             )
             
-            analysis = json.loads(response.choices[0].message.content)
+            analysis = json.loads(content)
             return analysis
             
+        except LLMUnavailable:
+            return self.analyze_code_solution(question, user_code, time_taken)  # Shed: fall back without waiting
         except Exception as e:
             print(f"Error in AI analysis: {e}")
             return self.analyze_code_solution(question, user_code, time_taken)  # Fallback
     
+    async def stream_code_analysis(self, question: Dict, user_code: str, time_taken: int) -> AsyncIterator[str]:
+        """Yield the analysis completion's text as the model generates it"""
+        messages, report = await prompt_budget.prepare(question, user_code, time_taken)
+        chunks = 0
+        with self._timed_call("analysis_stream"):
+            async with self.scheduler.slot(INTERACTIVE, settings.LLM_INTERACTIVE_MAX_WAIT_SECONDS):
+                stream = await self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    messages=messages,
+                    temperature=0.3,
+                    max_tokens=prompt_budget.max_completion_tokens,
+                    stream=True,
+                    timeout=settings.LLM_TIMEOUT_SECONDS
+                )
+                try:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            chunks += 1
+                            yield chunk.choices[0].delta.content
+                finally:
+                    # Give the connection back even if the client hung up mid-stream
+                    await stream.response.aclose()
+                    # Streams carry no usage block; the API sends one token per content delta
+                    llm_tokens.labels("analysis_stream", "completion").inc(chunks)
+                    prompt_budget.record("analysis_stream", report, None, chunks)
+    
     def generate_coding_question(self, difficulty: str = "medium") -> Dict[str, Any]:
         """Fallback method with predefined questions"""
-        # (Keep the existing implementation from before)
-        questions_bank = {
-            "easy": [
-                {
-                    "id": "two_sum",
-                    "title": "Two Sum",
-                    "description": "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target.",
-                    "examples": [
-                        {
-                            "input": "nums = [2,7,11,15], target = 9",
-                            "output": "[0,1]",
-                            "explanation": "Because nums[0] + nums[1] == 9, we return [0, 1]."
-                        }
-                    ],
-                    "difficulty": "easy",
-                    "tags": ["Array", "Hash Table"],
-                    "time_limit_minutes": 15
-                }
-            ],
-            "medium": [
-                {
-                    "id": "longest_substring",
-                    "title": "Longest Substring Without Repeating Characters",
-                    "description": "Given a string s, find the length of the longest substring without repeating characters.",
-                    "examples": [
-                        {
-                            "input": 's = "abcabcbb"',
-                            "output": "3",
-                            "explanation": 'The answer is "abc", with the length of 3.'
-                        }
-                    ],
-                    "difficulty": "medium",
-                    "tags": ["Hash Table", "String", "Sliding Window"],
-                    "time_limit_minutes": 25
-                }
-            ]
-        }
-        
-        import random
-        return random.choice(questions_bank.get(difficulty, questions_bank["medium"]))
+        return random.choice(FALLBACK_QUESTIONS.get(difficulty, FALLBACK_QUESTIONS["medium"]))
     
     def analyze_code_solution(self, question: Dict, user_code: str, time_taken: int) -> Dict[str, Any]:
-        """Fallback analysis method"""
-        # (Keep the existing implementation from before)
+        """Fallback analysis method
+        
+        No complexity fields: the pipeline's static or measured values stand,
+        and ai_fallback keeps these canned scores out of the analysis cache.
+        """
         analysis = {
             "correctness_score": 75,
             "efficiency_score": 70,
@@ -160,10 +324,21 @@ class AIInterviewService:
             "overall_score": 77,
             "feedback": ["Code structure looks good", "Solution appears to work"],
             "improvements": ["Consider edge cases", "Add more comments"],
-            "time_complexity": "O(n)",
-            "space_complexity": "O(1)"
+            "ai_fallback": True
         }
         return analysis
 
 # Initialize the service
-ai_service = AIInterviewService()
\ No newline at end of file
+ai_service = AIInterviewService()
+metrics.callback_gauge(
+    "llm_queue_depth", "LLM calls waiting for a scheduler slot", ("priority",),
+    lambda: (((name,), depth) for name, depth in ai_service.scheduler.stats()["queue_depth"].items())
+)
+metrics.callback_gauge(
+    "llm_in_flight", "LLM calls holding a scheduler slot", (),
+    lambda: [((), ai_service.scheduler.stats()["in_flight"])]
+)
+metrics.callback_gauge(
+    "llm_circuit_open", "1 while the LLM circuit breaker is open or half-open", (),
+    lambda: [((), int(ai_service.scheduler.state != "closed"))]
+)
@@ -0,0 +1,160 @@
+import ast
+import hashlib
+import io
+import json
+import re
+import sqlite3
+import threading
+import time
+import tokenize
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+
+_SKIP_TOKENS = {tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT}
+
+def _strip_docstrings(tree: ast.AST) -> None:
+    """Drop docstring expressions so they don't change the fingerprint"""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if (body and isinstance(body[0], ast.Expr)
+                    and isinstance(body[0].value, ast.Constant)
+                    and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or [ast.Pass()]
+
+def _strip_comments_and_whitespace(code: str) -> str:
+    """Token-level normalization for code that doesn't parse"""
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(code).readline)
+        return " ".join(tok.string for tok in tokens if tok.type not in _SKIP_TOKENS)
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        without_comments = re.sub(r"#[^\n]*", "", code)
+        return re.sub(r"\s+", "", without_comments)
+
+def fingerprint_code(code: str) -> str:
+    """Hash of the canonical AST, so whitespace/comment-only edits map to the same key"""
+    try:
+        tree = ast.parse(code)
+        _strip_docstrings(tree)
+        canonical = "ast:" + ast.dump(tree, annotate_fields=False, include_attributes=False)
+    except (SyntaxError, ValueError):
+        canonical = "src:" + _strip_comments_and_whitespace(code)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# Scores that depend on how long the submitter took; the key doesn't, so they're recomputed per submission
+TIME_DEPENDENT_FIELDS = ("time_management_score", "overall_score")
+
+def _code_only(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in analysis.items() if key not in TIME_DEPENDENT_FIELDS}
+
+class AnalysisCache:
+    """Two-tier (LRU memory + optional SQLite) cache of code analyses with TTL eviction
+
+    Keys are question id + code fingerprint, so entries keep only what depends
+    on the code; time-dependent scores are left out and recomputed by the caller.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400, db_path: str = ""):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_purge = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS analysis_cache ("
+                "key TEXT PRIMARY KEY, analysis TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def make_key(question_id: str, code: str) -> str:
+        return f"{question_id}:{fingerprint_code(code)}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached analysis, or None on a miss/expired entry"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, analysis = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _code_only(analysis)
+                del self._entries[key]
+                self.evictions += 1
+
+        if self._db is not None:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT analysis, expires_at FROM analysis_cache WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+            if row is not None:
+                # Rows written before time-dependent fields were left out may still carry them
+                analysis = _code_only(json.loads(row[0]))
+                self._remember(key, row[1], analysis)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return dict(analysis)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, analysis: Dict[str, Any]) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        analysis = _code_only(analysis)
+        self._remember(key, expires_at, analysis)
+
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, analysis, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(analysis), expires_at)
+                )
+                self._writes_since_purge += 1
+                if self._writes_since_purge >= 1000:
+                    self._db.execute("DELETE FROM analysis_cache WHERE expires_at <= ?", (time.time(),))
+                    self._writes_since_purge = 0
+
+    def _remember(self, key: str, expires_at: float, analysis: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at, analysis)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persistent": self._db is not None
+        }
+
+# Initialize the cache
+analysis_cache = AnalysisCache(
+    max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ANALYSIS_CACHE_TTL_SECONDS,
+    db_path=settings.ANALYSIS_CACHE_DB_PATH
+)
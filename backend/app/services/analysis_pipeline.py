@@ -0,0 +1,265 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.ai_service import ai_service
+from app.services.analysis_cache import analysis_cache
+from app.services.code_runner import code_runner
+from app.services.json_stream import IncrementalJSONParser
+from app.services.llm_scheduler import LLMUnavailable
+from app.services.static_analysis import analyze_statically, time_management_score
+
+# Efficiency score for a measured time complexity
+_EFFICIENCY_BY_COMPLEXITY = {
+    "O(1)": 95, "O(log n)": 95, "O(n)": 90, "O(n log n)": 82, "O(n²)": 60, "O(2ⁿ)": 35
+}
+# Measured complexity below this confidence doesn't override the static estimate
+_MIN_COMPLEXITY_CONFIDENCE = 0.5
+# Highest overall score for code that fails a test: just under the 70 user stats and rollups count as solved
+FAILING_MAX_OVERALL = 69
+_SCORE_FIELDS = ("correctness_score", "efficiency_score", "code_quality_score", "time_management_score")
+# Computed locally and never taken from the LLM, which only guesses at them
+_LOCAL_FIELDS = ("time_management_score", "execution", "findings")
+
+def tests_failed(analysis: Dict[str, Any]) -> bool:
+    execution = analysis.get("execution")
+    return execution is not None and execution["passed"] < execution["total"]
+
+def overall_score(analysis: Dict[str, Any]) -> int:
+    """Mean of the component scores; failing tests cap it at the correctness score, below passing"""
+    scores = [analysis.get(field) for field in _SCORE_FIELDS]
+    scores = [score for score in scores if isinstance(score, (int, float))]
+    overall = round(sum(scores) / len(scores)) if scores else 0
+    if tests_failed(analysis):
+        overall = min(overall, analysis["correctness_score"], FAILING_MAX_OVERALL)
+    return overall
+
+class AnalysisPipeline:
+    """Tiered submission analysis: AST review, then sandboxed tests, then the LLM only when needed
+
+    Tier "static" answers on its own when the code can't score (empty, syntax
+    error, stub). Tier "execution" settles the score when the question has test
+    cases and they all pass. Otherwise, or when deep_review is asked for, tier
+    "llm" runs; what the code runner measured always beats the LLM's guesses.
+    """
+
+    def __init__(self):
+        self.tiers = {"static": 0, "execution": 0, "llm": 0}
+
+    def _with_execution(self, analysis: Dict[str, Any], execution: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = dict(analysis)
+        analysis["execution"] = execution
+        analysis["correctness_score"] = round(100 * execution["passed"] / execution["total"])
+        measured = ["correctness_score"]
+
+        complexity = execution.get("complexity")
+        if execution["status"] in ("timeout", "cpu_limit_exceeded"):
+            analysis["efficiency_score"] = 30
+            measured.append("efficiency_score")
+        elif complexity and complexity["time"]["confidence"] >= _MIN_COMPLEXITY_CONFIDENCE:
+            analysis["time_complexity"] = complexity["time"]["complexity"]
+            analysis["efficiency_score"] = _EFFICIENCY_BY_COMPLEXITY.get(
+                complexity["time"]["complexity"], analysis["efficiency_score"]
+            )
+            measured += ["time_complexity", "efficiency_score"]
+        if complexity and complexity["space"]["confidence"] >= _MIN_COMPLEXITY_CONFIDENCE:
+            analysis["space_complexity"] = complexity["space"]["complexity"]
+            measured.append("space_complexity")
+
+        analysis["overall_score"] = overall_score(analysis)
+        analysis["measured"] = measured
+        # A failing run is never final on its own; the LLM (when enabled) says what's wrong
+        analysis["settled"] = not tests_failed(analysis)
+        return analysis
+
+    def _feedback(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn local findings into the feedback/improvements lists the LLM tier returns"""
+        findings = analysis["findings"]
+        execution = analysis.get("execution")
+        feedback, improvements = [], [f["message"] for f in findings]
+        if execution is not None and execution["total"]:
+            feedback.append(f"Passed {execution['passed']} of {execution['total']} test cases")
+        if tests_failed(analysis):
+            # No praise for code that doesn't work yet
+            improvements.insert(0, "Fix the failing test cases first; correctness comes before style or speed")
+        else:
+            if not any(f["rule"] in ("nested_loops", "unmemoized_recursion") for f in findings):
+                feedback.append("No nested loops or unbounded recursion")
+            if analysis["code_quality_score"] >= 90:
+                feedback.append("Code structure is clear and readable")
+        analysis.setdefault("feedback", feedback)
+        analysis.setdefault("improvements", improvements)
+        return analysis
+
+    async def _local_tiers(self, question: Dict[str, Any], user_code: str, time_taken: int) -> Tuple[Dict[str, Any], str]:
+        analysis = analyze_statically(question, user_code, time_taken)
+        if not analysis["settled"] and (question.get("examples") or question.get("test_cases")):
+            execution = await code_runner.run(user_code, question)
+            if execution is not None:
+                return self._with_execution(analysis, execution), "execution"
+        return analysis, "static"
+
+    def _needs_llm(self, analysis: Dict[str, Any], user_code: str, deep_review: bool) -> bool:
+        return settings.AI_ANALYSIS_ENABLED and bool(user_code) and (deep_review or not analysis["settled"])
+
+    def _finish(
+        self,
+        analysis: Dict[str, Any],
+        tier: str,
+        llm_analysis: Optional[Dict[str, Any]] = None,
+        llm_failed: bool = False
+    ) -> Tuple[Dict[str, Any], str]:
+        measured = analysis.pop("measured", [])
+        if llm_failed:
+            # The canned fallback knows less than the local tiers did
+            analysis["ai_fallback"] = True
+        elif llm_analysis:
+            # The LLM's review fields win, except what was computed or measured here
+            keep = [*_LOCAL_FIELDS, *measured]
+            analysis, tier = {
+                **analysis,
+                **{key: value for key, value in llm_analysis.items() if key not in keep}
+            }, "llm"
+            analysis["overall_score"] = overall_score(analysis)
+        analysis.pop("settled", None)
+        self.tiers[tier] += 1
+        return self._feedback(analysis), tier
+
+    async def analyze(
+        self,
+        question: Dict[str, Any],
+        user_code: str,
+        time_taken: int,
+        deep_review: bool = False
+    ) -> Tuple[Dict[str, Any], str, bool]:
+        """Returns (analysis, tier that answered, served from the LLM cache)"""
+        analysis, tier = await self._local_tiers(question, user_code, time_taken)
+        if not self._needs_llm(analysis, user_code, deep_review):
+            return (*self._finish(analysis, tier), False)
+
+        # Resubmissions that only differ in whitespace/comments hit the cache
+        cache_key = analysis_cache.make_key(question.get("id", ""), user_code)
+        llm_analysis = analysis_cache.get(cache_key)
+        cached = llm_analysis is not None
+        if not cached:
+            llm_analysis = await ai_service.analyze_code_with_ai(
+                question=question, user_code=user_code, time_taken=time_taken
+            )
+            if llm_analysis.get("ai_fallback"):
+                return (*self._finish(analysis, tier, llm_failed=True), False)
+            analysis_cache.set(cache_key, llm_analysis)
+        return (*self._finish(analysis, tier, llm_analysis), cached)
+
+    async def stream(
+        self,
+        question: Dict[str, Any],
+        user_code: str,
+        time_taken: int,
+        deep_review: bool = False
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, data): "local" first, then "token"/"field"/"item" as the LLM writes, then "done" """
+        analysis, tier = await self._local_tiers(question, user_code, time_taken)
+        if not self._needs_llm(analysis, user_code, deep_review):
+            analysis, tier = self._finish(analysis, tier)
+            yield "done", {"analysis": analysis, "analysis_tier": tier, "cached": False, "partial": False}
+            return
+        preview = {key: value for key, value in analysis.items() if key not in ("settled", "measured")}
+        yield "local", {"analysis": preview, "analysis_tier": tier}
+
+        cache_key = analysis_cache.make_key(question.get("id", ""), user_code)
+        llm_analysis = analysis_cache.get(cache_key)
+        cached, partial = llm_analysis is not None, False
+        if cached:
+            # Same event shapes as a live stream, just all at once
+            for name, value in llm_analysis.items():
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        yield "item", {"name": name, "index": index, "value": item}
+                yield "field", {"name": name, "value": value}
+        else:
+            parser = IncrementalJSONParser()
+            try:
+                async for delta in ai_service.stream_code_analysis(question, user_code, time_taken):
+                    yield "token", {"text": delta}
+                    for event in parser.feed(delta):
+                        yield event.pop("type"), event
+            except LLMUnavailable:
+                yield "error", {"message": "Detailed review is busy; showing the local analysis"}
+            except Exception as e:
+                print(f"Error streaming AI analysis: {e}")
+                yield "error", {"message": "Analysis stream interrupted; showing what arrived"}
+
+            # Keep every field that parsed, even if the stream broke or a value was malformed
+            llm_analysis = parser.fields
+            partial = not parser.complete
+            if llm_analysis and not partial:
+                analysis_cache.set(cache_key, llm_analysis)
+
+        analysis, tier = self._finish(analysis, tier, llm_analysis, llm_failed=not llm_analysis)
+        yield "done", {"analysis": analysis, "analysis_tier": tier, "cached": cached, "partial": partial}
+
+    def _retimed(self, analysis: Dict[str, Any], question: Dict[str, Any], time_taken: int) -> Dict[str, Any]:
+        """A shared analysis re-scored for a duplicate that was submitted with a different time"""
+        analysis = dict(analysis)
+        analysis["time_management_score"] = time_management_score(time_taken, question)
+        analysis["overall_score"] = overall_score(analysis)
+        return analysis
+
+    async def analyze_batch(self, submissions: List[Dict[str, Any]], concurrency: int) -> AsyncIterator[Dict[str, Any]]:
+        """Analyze many submissions, yielding one result per item in completion order
+
+        Items with the same question, equivalent code (see fingerprint_code) and
+        deep_review flag are analyzed once; at most `concurrency` run at a time.
+        """
+        groups: Dict[Tuple[str, bool], List[int]] = {}
+        for index, item in enumerate(submissions):
+            key = (analysis_cache.make_key(item["question"].get("id", ""), item["user_code"]), item["deep_review"])
+            groups.setdefault(key, []).append(index)
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(indexes: List[int]):
+            leader = submissions[indexes[0]]
+            async with semaphore:
+                try:
+                    return indexes, await self.analyze(
+                        leader["question"], leader["user_code"], leader["time_taken"], leader["deep_review"]
+                    ), None
+                except Exception as e:
+                    print(f"Error in batch analysis: {e}")
+                    return indexes, None, e
+
+        tasks = [asyncio.ensure_future(run(indexes)) for indexes in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                indexes, outcome, error = await next_done
+                for index in indexes:
+                    if error is not None:
+                        yield {"index": index, "success": False, "error": f"{type(error).__name__}: {error}"}
+                        continue
+                    analysis, tier, cached = outcome
+                    item = submissions[index]
+                    if index != indexes[0] and item["time_taken"] != submissions[indexes[0]]["time_taken"]:
+                        analysis = self._retimed(analysis, item["question"], item["time_taken"])
+                    yield {
+                        "index": index,
+                        "success": True,
+                        "analysis": analysis,
+                        "analysis_tier": tier,
+                        "cached": cached,
+                        "duplicate_of": indexes[0] if index != indexes[0] else None
+                    }
+        finally:
+            # Client went away or the stream was closed early: stop the remaining work
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self.tiers.values())
+        return {
+            "tiers": dict(self.tiers),
+            "llm_share": round(self.tiers["llm"] / total, 3) if total else 0.0
+        }
+
+# Initialize the pipeline
+analysis_pipeline = AnalysisPipeline()
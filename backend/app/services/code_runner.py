@@ -0,0 +1,549 @@
+import ast
+import asyncio
+import builtins
+import contextlib
+import copy
+import importlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import select
+import signal
+import time
+import tracemalloc
+import typing
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, wall-clock timeout only
+    resource = None
+
+from app.config import settings
+from app.services.complexity import measure_complexity
+from app.services.sandbox import SandboxError, drop_privileges, install_syscall_filter
+
+# Names LeetCode-style solutions use without importing them
+_PRELUDE = {name: getattr(typing, name) for name in ("Any", "Dict", "List", "Optional", "Set", "Tuple")}
+_MAX_CAPTURED_OUTPUT = 10000
+# Extra wall-clock slack for the fork and pipe round trip before the pool gives up on a worker
+_WORKER_GRACE_SECONDS = 5
+
+# Modules a submission may import; os, sys, subprocess, socket and the rest are refused
+ALLOWED_IMPORTS = frozenset({
+    "__future__", "array", "bisect", "cmath", "collections", "copy", "dataclasses", "decimal", "enum",
+    "fractions", "functools", "heapq", "itertools", "math", "numbers", "operator", "random", "re",
+    "statistics", "string", "typing"
+})
+_BLOCKED_BUILTINS = {
+    "open", "input", "breakpoint", "exit", "quit", "help", "copyright", "credits", "license",
+    "compile", "exec", "eval", "globals"
+}
+
+class CpuTimeExceeded(Exception):
+    pass
+
+def parse_call_arguments(text: str) -> Tuple[list, dict]:
+    """Parse an example input like 'nums = [2,7], target = 9' into literal args/kwargs"""
+    call = ast.parse(f"f({text})", mode="eval").body
+    args = [ast.literal_eval(arg) for arg in call.args]
+    kwargs = {kw.arg: ast.literal_eval(kw.value) for kw in call.keywords}
+    return args, kwargs
+
+def parse_expected(text: Any) -> Any:
+    if not isinstance(text, str):
+        return text
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text.strip()
+
+def build_test_cases(question: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Visible examples plus hidden test_cases, skipping any that aren't literal Python"""
+    cases = []
+    for hidden, source in ((False, question.get("examples", [])), (True, question.get("test_cases", []))):
+        for case in source:
+            try:
+                args, kwargs = parse_call_arguments(case["input"])
+            except (KeyError, ValueError, SyntaxError):
+                continue
+            cases.append({
+                "args": args,
+                "kwargs": kwargs,
+                "expected": parse_expected(case.get("output")),
+                "hidden": hidden
+            })
+    return cases
+
+class _BoundedOutput(io.StringIO):
+    def write(self, text: str) -> int:
+        if self.tell() < _MAX_CAPTURED_OUTPUT:
+            super().write(text[:_MAX_CAPTURED_OUTPUT - self.tell()])
+        return len(text)
+
+def _on_cpu_limit(signum, frame):
+    raise CpuTimeExceeded()
+
+def _cpu_seconds_used() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def _set_cpu_budget(seconds: Optional[float]) -> None:
+    """Move the soft RLIMIT_CPU to (used so far + seconds); None lifts it"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = resource.RLIM_INFINITY if seconds is None else math.ceil(_cpu_seconds_used() + seconds)
+    if hard != resource.RLIM_INFINITY and (soft == resource.RLIM_INFINITY or soft > hard):
+        soft = hard
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+def _guarded_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.partition(".")[0] not in ALLOWED_IMPORTS:
+        raise ImportError(f"import of '{name}' is not allowed")
+    return builtins.__import__(name, globals, locals, fromlist, level)
+
+_SAFE_BUILTINS = {name: value for name, value in vars(builtins).items() if name not in _BLOCKED_BUILTINS}
+_SAFE_BUILTINS["__import__"] = _guarded_import
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        try:
+            return sorted(value)
+        except TypeError:
+            return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON-like data")
+
+def to_json(value: Any) -> str:
+    """Serialize a return value as plain JSON data; tuples become lists, sets sorted lists"""
+    return json.dumps(value, default=_json_default)
+
+def find_entry_point(namespace: Dict[str, Any], wanted: Optional[str], kwargs_names: set):
+    """Pick the function to call: explicit entry_point, a Solution method, or a matching function"""
+    functions = [
+        value for value in namespace.values()
+        if callable(value) and getattr(value, "__module__", None) == "__submission__"
+    ]
+    solution = namespace.get("Solution")
+    if isinstance(solution, type):
+        instance = solution()
+        functions = [
+            getattr(instance, name) for name, value in vars(solution).items()
+            if callable(value) and not name.startswith("_")
+        ] or functions
+
+    for function in functions:
+        if getattr(function, "__name__", None) == wanted:
+            return function
+
+    # Prefer a function whose parameters cover the example's keyword names
+    for function in functions:
+        code = getattr(function, "__code__", None)
+        if code is not None and kwargs_names <= set(code.co_varnames[:code.co_argcount]):
+            return function
+    plain = [f for f in functions if not isinstance(f, type)]
+    return plain[-1] if plain else None
+
+def outputs_match(actual: Any, expected: Any, unordered: bool = False) -> bool:
+    """Compare plain JSON data only (both sides decoded from to_json), expected first"""
+    if isinstance(expected, (int, float)) and not isinstance(expected, bool) \
+            and isinstance(actual, (int, float)) and not isinstance(actual, bool):
+        return math.isclose(actual, expected, rel_tol=1e-6, abs_tol=1e-6)
+    if unordered and isinstance(actual, list) and isinstance(expected, list):
+        try:
+            return sorted(expected) == sorted(actual)
+        except TypeError:
+            return False
+    return expected == actual
+
+def execute_submission(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one submission on its test inputs; runs in a throwaway child and never sees expected outputs"""
+    calls = job["calls"]
+    result = {"status": "ok", "outcomes": []}
+
+    try:
+        compiled = compile(job["code"], "<submission>", "exec")
+    except SyntaxError as e:
+        result.update(status="compile_error", error=f"{e.msg} (line {e.lineno})")
+        return result
+
+    namespace = {"__name__": "__submission__", "__builtins__": _SAFE_BUILTINS, **_PRELUDE}
+    output = _BoundedOutput()
+    tracemalloc.start()
+    _set_cpu_budget(job["cpu_seconds"])
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            exec(compiled, namespace)
+            kwargs_names = set(calls[0]["kwargs"]) if calls else set()
+            entry_point = find_entry_point(namespace, job.get("entry_point"), kwargs_names)
+            if entry_point is None:
+                result.update(status="no_entry_point", error="No function found to call")
+                return result
+
+            for call in calls:
+                args, kwargs = copy.deepcopy((call["args"], call["kwargs"]))
+                tracemalloc.reset_peak()
+                started = time.perf_counter()
+                outcome = {}
+                try:
+                    actual = entry_point(*args, **kwargs)
+                    outcome["runtime_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                    outcome["output"] = to_json(actual)
+                except (CpuTimeExceeded, MemoryError):
+                    raise
+                except Exception as e:
+                    outcome.setdefault("runtime_ms", round((time.perf_counter() - started) * 1000, 3))
+                    outcome["error"] = f"{type(e).__name__}: {e}"
+                outcome["peak_memory_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+                result["outcomes"].append(outcome)
+
+            # Empirical complexity from the first case that ran cleanly, scaled up (own time budget);
+            # the pool keeps it only if that case also passed
+            case = next((i for i, outcome in enumerate(result["outcomes"]) if "error" not in outcome), None)
+            if case is not None and job.get("complexity_budget"):
+                _set_cpu_budget(job["complexity_budget"] + 1)
+                result["complexity_case"] = case
+                result["complexity"] = measure_complexity(
+                    entry_point, calls[case]["args"], calls[case]["kwargs"],
+                    job["complexity_budget"], job["complexity_max_size"]
+                )
+    except CpuTimeExceeded:
+        result.update(status="cpu_limit_exceeded", error=f"CPU time limit of {job['cpu_seconds']}s exceeded")
+    except MemoryError:
+        result.update(status="memory_limit_exceeded", error="Memory limit exceeded")
+    except (Exception, SystemExit) as e:
+        result.update(status="runtime_error", error=f"{type(e).__name__}: {e}")
+    finally:
+        _set_cpu_budget(None)
+        tracemalloc.stop()
+
+    result["stdout"] = output.getvalue()
+    return result
+
+def _failure(status: str, error: str) -> Dict[str, Any]:
+    return {"status": status, "error": error, "outcomes": []}
+
+def _confine(memory_limit_bytes: int) -> None:
+    """Limits and scrubbing for a job's child, applied before any submission code runs
+
+    Restricted builtins alone can be walked around (object.__subclasses__()
+    reaches os and subprocess), so the boundary is the kernel's: the child
+    drops root, may not fork, and a seccomp filter makes exec, open, sockets
+    and signalling other processes fail with EPERM.
+    """
+    os.environ.clear()
+    for name in ("OPENAI_API_KEY", "APP_SECRET_KEY"):
+        setattr(type(settings), name, "")
+    if resource is not None:
+        if memory_limit_bytes:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+        if hasattr(resource, "RLIMIT_NPROC"):
+            resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    drop_privileges(settings.CODE_RUNNER_SANDBOX_UID, settings.CODE_RUNNER_SANDBOX_GID)
+    try:
+        install_syscall_filter()
+    except SandboxError:
+        if settings.CODE_RUNNER_REQUIRE_SECCOMP:
+            raise
+
+def _run_forked(job: Dict[str, Any], conn, memory_limit_bytes: int) -> Dict[str, Any]:
+    """Fork a fresh child from this warm worker for one job; nothing a submission does outlives it"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            conn.close()
+            try:
+                _confine(memory_limit_bytes)
+                execution = execute_submission(job)
+            except (SandboxError, OSError) as e:
+                execution = _failure("sandbox_error", f"Sandbox could not be set up: {e}")
+            payload = json.dumps(execution, default=str).encode()
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(payload)
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    chunks = []
+    deadline = time.monotonic() + job["wall_seconds"]
+    timed_out = False
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                timed_out = True
+                break
+            chunk = os.read(read_fd, 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(read_fd)
+        if timed_out:
+            os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+    if timed_out:
+        return _failure("timeout", f"Wall-clock limit of {job['wall_seconds']}s exceeded")
+    try:
+        execution = json.loads(b"".join(chunks))
+    except ValueError:
+        execution = None
+    if not isinstance(execution, dict):
+        return _failure("crashed", "Execution process died (likely a resource limit)")
+    return execution
+
+def _worker_main(conn, memory_limit_bytes: int) -> None:
+    """Long-lived warm worker: forks a child per job and never runs submission code itself"""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+    # The children can't open files, so everything they may import is loaded here first
+    for name in ALLOWED_IMPORTS:
+        importlib.import_module(name)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        if hasattr(os, "fork"):
+            conn.send(_run_forked(job, conn, memory_limit_bytes))
+        else:
+            conn.send(execute_submission(job))  # No fork (Windows): no per-job isolation
+
+def _plain(value: Any) -> Any:
+    try:
+        return json.loads(to_json(value))
+    except TypeError:
+        return value  # e.g. a complex literal; nothing JSON-decoded will equal it
+
+def judge(execution: Dict[str, Any], tests: List[Dict[str, Any]], unordered: bool = False) -> Dict[str, Any]:
+    """Score a child's raw outputs against the expected ones, which never leave the API process
+
+    The child's reply is treated as untrusted data: return values arrive as
+    JSON text, so an object with a rigged __eq__ can't stand in for an answer.
+    """
+    result = {
+        "status": str(execution.get("status", "crashed")), "passed": 0, "total": len(tests), "tests": [],
+        "peak_memory_kb": 0, "runtime_ms": 0.0
+    }
+    if execution.get("error"):
+        result["error"] = str(execution["error"])
+    outcomes = execution.get("outcomes")
+    outcomes = outcomes if isinstance(outcomes, list) else []
+    for index, (test, outcome) in enumerate(zip(tests, outcomes)):
+        outcome = outcome if isinstance(outcome, dict) else {"error": "Malformed result"}
+        error = outcome.get("error")
+        actual = None
+        if error is None:
+            try:
+                actual = json.loads(outcome["output"])
+            except (KeyError, TypeError, ValueError):
+                error = "Return value is not JSON-like data"
+        expected = _plain(test["expected"])
+        passed = error is None and outputs_match(actual, expected, unordered)
+        runtime_ms = float(outcome.get("runtime_ms") or 0)
+        peak_kb = int(outcome.get("peak_memory_kb") or 0)
+        report = {
+            "index": index,
+            "hidden": test["hidden"],
+            "passed": passed,
+            "runtime_ms": runtime_ms,
+            "peak_memory_kb": peak_kb
+        }
+        if error:
+            report["error"] = str(error)
+        if not passed and not test["hidden"]:
+            report["expected"] = repr(test["expected"])
+            report["actual"] = repr(actual)[:200]
+        result["tests"].append(report)
+        result["passed"] += passed
+        result["runtime_ms"] += runtime_ms
+        result["peak_memory_kb"] = max(result["peak_memory_kb"], peak_kb)
+
+    case = execution.get("complexity_case")
+    if isinstance(execution.get("complexity"), dict) and isinstance(case, int) \
+            and 0 <= case < len(result["tests"]) and result["tests"][case]["passed"]:
+        result["complexity"] = execution["complexity"]
+    result["runtime_ms"] = round(result["runtime_ms"], 3)
+    result["stdout"] = str(execution.get("stdout", ""))[:_MAX_CAPTURED_OUTPUT]
+    return result
+
+class _Worker:
+    def __init__(self, context, memory_limit_bytes: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, memory_limit_bytes), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+        self.broken = False
+
+    @property
+    def alive(self) -> bool:
+        # A worker that just crashed can still look alive until the OS reaps it
+        return not self.broken and self.process.is_alive()
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Blocking round trip; kills the worker if it overruns the wall clock"""
+        self.jobs += 1
+        try:
+            self.conn.send(job)
+            if self.conn.poll(timeout):
+                return self.conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            self.broken = True
+            return _failure("crashed", "Execution worker died (likely a resource limit)")
+        self.broken = True
+        self.kill()
+        return _failure("timeout", f"Wall-clock limit of {timeout}s exceeded")
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=1)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+class CodeRunner:
+    """Pool of pre-forked, warm worker processes that execute submissions against test cases
+
+    Each job runs in a fresh child forked from a warm worker, so a submission
+    can't tamper with the worker or see other jobs. The child gets only the
+    test inputs, restricted builtins and imports, rlimits (address space,
+    CPU time, no forking), an unprivileged uid when the API runs as root, a
+    seccomp filter (no exec, open, sockets or signals) and a wall-clock
+    timeout; outputs are judged here.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        cpu_seconds: float = 2,
+        memory_mb: int = 256,
+        wall_timeout_seconds: float = 5,
+        max_jobs_per_worker: int = 200,
+        complexity_budget_seconds: float = 1,
+        complexity_max_size: int = 65536
+    ):
+        self.size = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_limit_bytes = memory_mb * 1024 * 1024
+        self.wall_timeout_seconds = wall_timeout_seconds
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.complexity_budget_seconds = complexity_budget_seconds
+        self.complexity_max_size = complexity_max_size
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[_Worker] = []
+        self._context = None
+
+        self.submissions = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.recycled = 0
+
+    def _get_context(self):
+        if self._context is None:
+            methods = multiprocessing.get_all_start_methods()
+            self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if "forkserver" in methods:
+                # Keep the fork server light: don't re-import the app's __main__
+                self._context.set_forkserver_preload([__name__])
+        return self._context
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._get_context(), self.memory_limit_bytes)
+        self._workers.append(worker)
+        return worker
+
+    def _retire(self, worker: _Worker) -> None:
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.stop()
+
+    async def start(self) -> None:
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(await asyncio.to_thread(self._spawn))
+
+    async def stop(self) -> None:
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            await asyncio.to_thread(worker.stop)
+        self._idle = None
+
+    async def _release(self, worker: _Worker) -> None:
+        # Replace workers that died, were killed, or have served their quota
+        if not worker.alive or worker.jobs >= self.max_jobs_per_worker:
+            self.recycled += 1
+            await asyncio.to_thread(self._retire, worker)
+            worker = await asyncio.to_thread(self._spawn)
+        if self._idle is not None:
+            self._idle.put_nowait(worker)
+
+    async def run(self, code: str, question: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Execute code against the question's examples + hidden tests; None if it has none"""
+        tests = build_test_cases(question)
+        if not tests:
+            return None
+        await self.start()
+
+        # Expected outputs stay here; the worker only gets the inputs
+        job = {
+            "code": code,
+            "entry_point": question.get("entry_point"),
+            "calls": [{"args": test["args"], "kwargs": test["kwargs"]} for test in tests],
+            "cpu_seconds": self.cpu_seconds,
+            "wall_seconds": self.wall_timeout_seconds + self.complexity_budget_seconds,
+            "complexity_budget": self.complexity_budget_seconds,
+            "complexity_max_size": self.complexity_max_size
+        }
+        worker = await self._idle.get()
+        execution = asyncio.ensure_future(
+            asyncio.to_thread(worker.run, job, job["wall_seconds"] + _WORKER_GRACE_SECONDS)
+        )
+        # Hand the worker back only once its job is really over, even if the caller is cancelled
+        execution.add_done_callback(lambda _: asyncio.ensure_future(self._release(worker)))
+        result = judge(await asyncio.shield(execution), tests, question.get("compare") == "unordered")
+
+        self.submissions += 1
+        if result["status"] == "timeout":
+            self.timeouts += 1
+        elif result["status"] == "crashed":
+            self.crashes += 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "submissions": self.submissions,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "recycled": self.recycled
+        }
+
+# Initialize the runner (workers are forked on app startup)
+code_runner = CodeRunner(
+    workers=settings.CODE_RUNNER_WORKERS,
+    cpu_seconds=settings.CODE_RUNNER_CPU_SECONDS,
+    memory_mb=settings.CODE_RUNNER_MEMORY_MB,
+    wall_timeout_seconds=settings.CODE_RUNNER_WALL_TIMEOUT_SECONDS,
+    max_jobs_per_worker=settings.CODE_RUNNER_MAX_JOBS_PER_WORKER,
+    complexity_budget_seconds=settings.COMPLEXITY_TIME_BUDGET_SECONDS,
+    complexity_max_size=settings.COMPLEXITY_MAX_INPUT_SIZE
+)
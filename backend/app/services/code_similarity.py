@@ -0,0 +1,489 @@
+import ast
+import asyncio
+import builtins
+import heapq
+import keyword
+import multiprocessing
+import os
+import re
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+from sqlalchemy import Integer, bindparam, insert, select, union_all, update
+
+from app.config import settings
+from app.database import async_engine
+from app.models.interview import CodeFingerprint, Submission
+
+# Rabin-Karp rolling hash over token ids, modulo the Mersenne prime 2^61 - 1
+# (fits a signed 64-bit column, and is stable across processes unlike hash())
+_MOD = (1 << 61) - 1
+_BASE = 0x5BD1E995
+# Union branches per posting query (SQLite allows 500 compound terms); queries
+# are padded to a multiple of _QUERY_STEP so only a few statement shapes get compiled
+_QUERY_CHUNK = 192
+_QUERY_STEP = 16
+_NO_FINGERPRINT = -1
+# Cohorts smaller than this are scored inline; worker start-up would cost more
+_MIN_PARALLEL_COHORT = 2000
+
+# Names that mean the same thing in everyone's code survive normalization
+_BUILTIN_NAMES = frozenset(dir(builtins))
+_BUILTIN_ATTRS = frozenset(
+    name for kind in (list, dict, set, str, int, float, tuple, bytes) for name in dir(kind) if not name.startswith("_")
+)
+_LEXICAL = re.compile(r"#[^\n]*|[A-Za-z_]\w*|\d[\w.]*|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|\S")
+_TOKEN_IDS: Dict[str, int] = {}
+
+def _node_token(node: ast.AST) -> str:
+    if isinstance(node, ast.Name):
+        return node.id if node.id in _BUILTIN_NAMES else "Name"
+    if isinstance(node, ast.Attribute):
+        return "." + node.attr if node.attr in _BUILTIN_ATTRS else "Attribute"
+    if isinstance(node, ast.Constant):
+        return "Constant:" + type(node.value).__name__
+    return type(node).__name__
+
+def _lexical_tokens(code: str) -> List[str]:
+    """Token stream for code that doesn't parse: identifiers and literals collapsed, comments dropped"""
+    tokens = []
+    for token in _LEXICAL.findall(code):
+        first = token[0]
+        if first == "#":
+            continue
+        if first.isalpha() or first == "_":
+            tokens.append(token if keyword.iskeyword(token) or token in _BUILTIN_NAMES else "Name")
+        elif first.isdigit():
+            tokens.append("Number")
+        elif first in "\"'":
+            tokens.append("String")
+        else:
+            tokens.append(token)
+    return tokens
+
+def code_tokens(code: str) -> List[str]:
+    """Pre-order AST node types with identifiers and literal values normalized away
+
+    Renaming variables, reformatting, or editing comments and string contents
+    leaves the stream unchanged; builtins (len, range) and methods of builtin
+    types (append, sort) are kept since they carry the solution's structure.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return _lexical_tokens(code)
+    tokens = []
+    stack = [tree]
+    # ast.iter_child_nodes, inlined: this loop runs for every node of every submission
+    while stack:
+        node = stack.pop()
+        tokens.append(_node_token(node))
+        children = []
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, ast.AST))
+            elif isinstance(value, ast.AST) and not isinstance(value, ast.expr_context):
+                children.append(value)
+        children.reverse()
+        stack.extend(children)
+    return tokens
+
+def _token_id(token: str) -> int:
+    token_id = _TOKEN_IDS.get(token)
+    if token_id is None:
+        token_id = _TOKEN_IDS[token] = zlib.crc32(token.encode())
+    return token_id
+
+def winnow(hashes: Sequence[int], window: int) -> Set[int]:
+    """Rightmost minimum of every `window` consecutive hashes (Schleimer et al., 2003)"""
+    if not hashes:
+        return set()
+    window = min(window, len(hashes))
+    selected = set()
+    position = -1
+    for end in range(window - 1, len(hashes)):
+        start = end - window + 1
+        if position < start:
+            # The previous minimum slid out: rescan the window
+            position = start
+            for i in range(start + 1, end + 1):
+                if hashes[i] <= hashes[position]:
+                    position = i
+            selected.add(hashes[position])
+        elif hashes[end] <= hashes[position]:
+            position = end
+            selected.add(hashes[end])
+    return selected
+
+def _rank(
+    size: int,
+    shared: Dict[str, int],
+    sizes: Dict[str, int],
+    k: int,
+    flag_threshold: float
+) -> List[Dict[str, Any]]:
+    """Top-k by Jaccard similarity of fingerprint sets, given the shared counts and set sizes"""
+    scored = []
+    for other, common in shared.items():
+        union = size + max(sizes.get(other, common), common) - common
+        scored.append((common / union if union else 0.0, common, other))
+    return [
+        {
+            "submission_id": other,
+            "similarity": round(similarity, 3),
+            "shared_fingerprints": common,
+            "flagged": similarity >= flag_threshold
+        }
+        for similarity, common, other in heapq.nlargest(k, scored)
+    ]
+
+class _Cohort:
+    """In-memory inverted index over one cohort's fingerprint sets"""
+
+    def __init__(self, ids: Sequence[str], prints: Sequence[Sequence[int]], max_posting: int):
+        postings: Dict[int, List[int]] = {}
+        for slot, fingerprints in enumerate(prints):
+            for fingerprint in fingerprints:
+                postings.setdefault(fingerprint, []).append(slot)
+        common = {fingerprint for fingerprint, slots in postings.items() if len(slots) > max_posting}
+        for fingerprint in common:
+            del postings[fingerprint]
+        self.ids = ids
+        self.prints = prints
+        self.postings = postings
+        self.sizes = [len(fingerprints) - len(common.intersection(fingerprints)) for fingerprints in prints]
+
+    def matches(self, slot: int, k: int, flag_threshold: float) -> List[Dict[str, Any]]:
+        shared: Dict[int, int] = {}
+        for fingerprint in self.prints[slot]:
+            for other in self.postings.get(fingerprint, ()):
+                shared[other] = shared.get(other, 0) + 1
+        shared.pop(slot, None)
+        ids = self.ids
+        return _rank(
+            self.sizes[slot],
+            {ids[other]: common for other, common in shared.items()},
+            {ids[other]: self.sizes[other] for other in shared},
+            k,
+            flag_threshold
+        )
+
+# Per worker process: the cohort, indexed once by the pool initializer
+_cohort: Optional[_Cohort] = None
+
+def _init_cohort_worker(ids: Sequence[str], prints: Sequence[Sequence[int]], max_posting: int) -> None:
+    global _cohort
+    _cohort = _Cohort(ids, prints, max_posting)
+
+def _score_slots(slots: range, k: int, flag_threshold: float) -> List[List[Dict[str, Any]]]:
+    return [_cohort.matches(slot, k, flag_threshold) for slot in slots]
+
+def rescore_cohort(
+    ids: Sequence[str],
+    prints: Sequence[Sequence[int]],
+    k: int = 5,
+    max_posting: int = 50,
+    flag_threshold: float = 0.6,
+    workers: int = 1
+) -> List[List[Dict[str, Any]]]:
+    """Top-k matches within the cohort for every member, split across `workers` processes"""
+    if workers <= 1 or len(ids) < _MIN_PARALLEL_COHORT:
+        cohort = _Cohort(ids, prints, max_posting)
+        return [cohort.matches(slot, k, flag_threshold) for slot in range(len(ids))]
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    step = -(-len(ids) // (workers * 4))
+    chunks = [range(start, min(start + step, len(ids))) for start in range(0, len(ids), step)]
+    with ProcessPoolExecutor(
+        workers, mp_context=context, initializer=_init_cohort_worker, initargs=(ids, prints, max_posting)
+    ) as pool:
+        scored = pool.map(_score_slots, chunks, repeat(k), repeat(flag_threshold))
+        return [matches for chunk in scored for matches in chunk]
+
+class CodeSimilarityIndex:
+    """Winnowed AST fingerprints of every submission, per question, for plagiarism screening
+
+    Code is reduced to a normalized AST token stream (see code_tokens), hashed
+    as overlapping k-grams and winnowed down to a few dozen fingerprints that
+    any shared run of `kgram + window - 1` tokens is guaranteed to hit. The
+    submission writer stores them as (question_id, fingerprint) postings in
+    the same transaction as the submissions, so the index is shared by every
+    worker and needs no rebuild at start-up.
+
+    A lookup reads at most `max_posting + 1` postings per fingerprint; one
+    that appears in more submissions than that (starter code, the idiomatic
+    loop everyone writes) says nothing about copying and is skipped like a
+    stop word, so lookup cost stays bounded as submissions grow into the
+    millions. Candidates are scored by Jaccard similarity over the remaining
+    fingerprints.
+    """
+
+    def __init__(
+        self,
+        engine=async_engine,
+        kgram: int = 16,
+        window: int = 8,
+        max_posting: int = 50,
+        flag_threshold: float = 0.6,
+        max_cohort: int = 200000,
+        workers: int = 0
+    ):
+        self.engine = engine
+        self.kgram = kgram
+        self.window = window
+        self.max_posting = max_posting
+        self.flag_threshold = flag_threshold
+        self.max_cohort = max_cohort
+        self.workers = workers or os.cpu_count() or 1
+        self._statements: Dict[int, Any] = {}
+
+        self.fingerprinted = 0
+        self.lookups = 0
+        self.cohorts_rescored = 0
+        self.last_lookup_ms = 0.0
+
+    def fingerprints(self, code: str) -> Set[int]:
+        token_ids = [_token_id(token) for token in code_tokens(code)]
+        if not token_ids:
+            return set()
+        k = min(self.kgram, len(token_ids))
+        leading = pow(_BASE, k - 1, _MOD)
+        hashes = []
+        h = 0
+        for i, token_id in enumerate(token_ids):
+            if i >= k:
+                h -= token_ids[i - k] * leading
+            h = (h * _BASE + token_id) % _MOD
+            if i >= k - 1:
+                hashes.append(h)
+        return winnow(hashes, self.window)
+
+    def postings(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """code_fingerprints rows for a batch of submissions rows; sets each row's fingerprint_count"""
+        postings = []
+        for row in rows:
+            fingerprints = self.fingerprints(row["user_code"])
+            row["fingerprint_count"] = len(fingerprints)
+            postings.extend(
+                {"question_id": row["question_id"], "fingerprint": fingerprint, "submission_id": row["id"]}
+                for fingerprint in fingerprints
+            )
+        self.fingerprinted += len(rows)
+        return postings
+
+    async def prepare(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """postings() off the event loop, before the writer opens its transaction"""
+        return await asyncio.to_thread(self.postings, rows)
+
+    async def apply(self, connection, postings: List[Dict[str, Any]]) -> None:
+        if postings:
+            await connection.execute(insert(CodeFingerprint), postings)
+
+    def _posting_statement(self, branches: int):
+        """UNION ALL of one capped posting-list scan per fingerprint, built once per branch count"""
+        statement = self._statements.get(branches)
+        if statement is None:
+            selects = [
+                select(CodeFingerprint.fingerprint, CodeFingerprint.submission_id)
+                .where(
+                    CodeFingerprint.question_id == bindparam("question_id"),
+                    CodeFingerprint.fingerprint == bindparam(f"f{i}")
+                )
+                .limit(bindparam("limit", type_=Integer))
+                .subquery(f"p{i}")
+                .select()
+                for i in range(branches)
+            ]
+            statement = selects[0] if branches == 1 else union_all(*selects)
+            self._statements[branches] = statement
+        return statement
+
+    async def _posting_lists(self, connection, question_id: str, fingerprints: Iterable[int]) -> Dict[int, List[str]]:
+        """Submission ids per fingerprint, each list cut off after max_posting + 1 entries"""
+        fingerprints = list(fingerprints)
+        lists: Dict[int, List[str]] = {fingerprint: [] for fingerprint in fingerprints}
+        for start in range(0, len(fingerprints), _QUERY_CHUNK):
+            chunk = fingerprints[start:start + _QUERY_CHUNK]
+            branches = -(-len(chunk) // _QUERY_STEP) * _QUERY_STEP
+            chunk += [_NO_FINGERPRINT] * (branches - len(chunk))
+            params = {f"f{i}": fingerprint for i, fingerprint in enumerate(chunk)}
+            params["question_id"] = question_id
+            params["limit"] = self.max_posting + 1
+            result = await connection.execute(self._posting_statement(branches), params)
+            for fingerprint, submission_id in result.all():
+                lists[fingerprint].append(submission_id)
+        return lists
+
+    async def _matches(
+        self,
+        connection,
+        question_id: str,
+        fingerprints: Set[int],
+        k: int,
+        exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        lists = await self._posting_lists(connection, question_id, fingerprints)
+        common = 0
+        shared: Dict[str, int] = {}
+        for submission_ids in lists.values():
+            if len(submission_ids) > self.max_posting:
+                common += 1
+                continue
+            for other in submission_ids:
+                shared[other] = shared.get(other, 0) + 1
+        shared.pop(exclude, None)
+        if not shared:
+            return []
+
+        # Size-normalize only the candidates sharing the most fingerprints
+        leaders = dict(heapq.nlargest(max(4 * k, 50), shared.items(), key=itemgetter(1)))
+        result = await connection.execute(
+            select(Submission.id, Submission.fingerprint_count).where(Submission.id.in_(list(leaders)))
+        )
+        # The skipped common fingerprints are assumed to appear in the candidate too
+        sizes = {other: (count or 0) - common for other, count in result.all()}
+        return _rank(len(fingerprints) - common, leaders, sizes, k, self.flag_threshold)
+
+    async def similar(
+        self,
+        question_id: str,
+        code: str,
+        k: int = 5,
+        exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Top-k stored submissions to question_id most similar to this code"""
+        fingerprints = self.fingerprints(code)
+        if not fingerprints:
+            return []
+        started = time.perf_counter()
+        async with self.engine.connect() as connection:
+            matches = await self._matches(connection, question_id, fingerprints, k, exclude)
+        self.lookups += 1
+        self.last_lookup_ms = (time.perf_counter() - started) * 1000
+        return matches
+
+    async def similar_to_submission(self, submission_id: str, k: int = 5) -> Optional[Dict[str, Any]]:
+        """Top-k other submissions to the same question; None if the submission isn't stored"""
+        async with self.engine.connect() as connection:
+            row = (await connection.execute(
+                select(Submission.question_id, Submission.user_code).where(Submission.id == submission_id)
+            )).first()
+        if row is None:
+            return None
+        question_id, code = row
+        return {
+            "submission_id": submission_id,
+            "question_id": question_id,
+            "matches": await self.similar(question_id, code, k, exclude=submission_id),
+            "flag_threshold": self.flag_threshold
+        }
+
+    async def _cohort_prints(
+        self,
+        question_id: str,
+        submission_ids: Optional[Sequence[str]]
+    ) -> Dict[str, List[int]]:
+        prints: Dict[str, List[int]] = {}
+        base = select(CodeFingerprint.submission_id, CodeFingerprint.fingerprint).where(
+            CodeFingerprint.question_id == question_id
+        )
+        if submission_ids is None:
+            statements = [base]
+        else:
+            statements = [
+                base.where(CodeFingerprint.submission_id.in_(submission_ids[start:start + 10000]))
+                for start in range(0, len(submission_ids), 10000)
+            ]
+        async with self.engine.connect() as connection:
+            for statement in statements:
+                result = await connection.stream(statement.execution_options(yield_per=50000))
+                async for chunk in result.partitions():
+                    for submission_id, fingerprint in chunk:
+                        fingerprints = prints.get(submission_id)
+                        if fingerprints is None:
+                            prints[submission_id] = [fingerprint]
+                        else:
+                            fingerprints.append(fingerprint)
+        return prints
+
+    async def rescore(
+        self,
+        question_id: str,
+        submission_ids: Optional[Sequence[str]] = None,
+        k: int = 5
+    ) -> Dict[str, Any]:
+        """Score every cohort member against the rest of the cohort (all of the question's
+        submissions by default), most suspicious first; raises ValueError if the cohort is too large"""
+        started = time.perf_counter()
+        prints = await self._cohort_prints(question_id, submission_ids)
+        if len(prints) > self.max_cohort:
+            raise ValueError(f"Cohort too large: {len(prints)} submissions (max {self.max_cohort})")
+        ids = list(prints)
+        workers = min(self.workers, max(1, len(ids) // _MIN_PARALLEL_COHORT))
+        scored = await asyncio.to_thread(
+            rescore_cohort, ids, [prints[submission_id] for submission_id in ids], k,
+            self.max_posting, self.flag_threshold, workers
+        )
+        results = sorted(
+            ({"submission_id": submission_id, "matches": matches} for submission_id, matches in zip(ids, scored)),
+            key=lambda result: -result["matches"][0]["similarity"] if result["matches"] else 0.0
+        )
+        self.cohorts_rescored += 1
+        return {
+            "question_id": question_id,
+            "cohort": len(ids),
+            "missing": len(set(submission_ids)) - len(ids) if submission_ids is not None else 0,
+            "flagged": sum(1 for result in results if result["matches"] and result["matches"][0]["flagged"]),
+            "flag_threshold": self.flag_threshold,
+            "workers": workers,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "results": results
+        }
+
+    async def backfill(self, chunk_size: int = 2000) -> int:
+        """Fingerprint stored submissions that predate the index; returns how many were added"""
+        added = 0
+        while True:
+            async with self.engine.begin() as connection:
+                rows = (await connection.execute(
+                    select(Submission.id, Submission.question_id, Submission.user_code)
+                    .where(Submission.fingerprint_count.is_(None))
+                    .limit(chunk_size)
+                )).mappings().all()
+                if not rows:
+                    return added
+                rows = [dict(row) for row in rows]
+                postings = await self.prepare(rows)
+                await self.apply(connection, postings)
+                await connection.execute(
+                    update(Submission).where(Submission.id == bindparam("submission_id"))
+                    .values(fingerprint_count=bindparam("count")),
+                    [{"submission_id": row["id"], "count": row["fingerprint_count"]} for row in rows]
+                )
+                added += len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "fingerprinted": self.fingerprinted,
+            "lookups": self.lookups,
+            "last_lookup_ms": round(self.last_lookup_ms, 2),
+            "cohorts_rescored": self.cohorts_rescored,
+            "max_posting": self.max_posting,
+            "flag_threshold": self.flag_threshold
+        }
+
+# Initialize the index (postings are written by the submission writer)
+code_similarity = CodeSimilarityIndex(
+    kgram=settings.CODE_SIMILARITY_KGRAM,
+    window=settings.CODE_SIMILARITY_WINDOW,
+    max_posting=settings.CODE_SIMILARITY_MAX_POSTING,
+    flag_threshold=settings.CODE_SIMILARITY_FLAG_THRESHOLD,
+    max_cohort=settings.CODE_SIMILARITY_MAX_COHORT,
+    workers=settings.CODE_SIMILARITY_WORKERS
+)
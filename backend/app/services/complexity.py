@@ -0,0 +1,249 @@
+import gc
+import math
+import random
+import signal
+import string
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Candidate growth curves, simplest first (ties go to the simpler one)
+CANDIDATES: List[Tuple[str, Callable[[float], float]]] = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: n),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n²)", lambda n: n * n),
+    ("O(2ⁿ)", lambda n: 2.0 ** n)
+]
+UNKNOWN = "O(?)"
+
+MIN_SIZE = 8
+GROWTH = math.sqrt(2)
+MIN_POINTS = 4
+# A simpler curve wins unless the best fit's error is lower by more than this fraction
+SIMPLER_SLACK = 0.25
+# Fast calls are timed in batches at least this long so timer resolution doesn't dominate
+MIN_BATCH_SECONDS = 0.0002
+MAX_BATCH_CALLS = 1000
+REPEATS = 5
+# Peak memory below this is indistinguishable from interpreter noise
+MEMORY_FLOOR_BYTES = 512
+
+class BudgetExhausted(Exception):
+    pass
+
+def _on_budget_exhausted(signum, frame):
+    raise BudgetExhausted()
+
+def _random_string(rng: random.Random, alphabet: Sequence[str], length: int) -> str:
+    return "".join(rng.choices(alphabet, k=length))
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _scale_list(value: list, n: int, rng: random.Random, offset: int) -> list:
+    if value and all(isinstance(item, list) for item in value):
+        template = value[0]
+        # Square grids grow in both dimensions so the cell count tracks n
+        rows, width = (math.isqrt(n), math.isqrt(n)) if len(value) == len(template) else (n, len(template))
+        flat = [item for row in value for item in row]
+        return [_scale_items(flat, width, rng, n, offset) for _ in range(rows)]
+    items = _scale_items(value, n, rng, n, offset)
+    if len(value) > 1 and value == sorted(value):
+        items.sort()
+    return items
+
+def _scale_items(sample: list, count: int, rng: random.Random, n: int, offset: int) -> list:
+    """count random items shaped like the sample's"""
+    if not sample or all(_is_int(x) for x in sample):
+        if sample and min(sample) < 0:
+            return rng.choices(range(-n, n + 1), k=count)
+        # Non-negative ints start above every scalar argument, so searches for a
+        # target/k built from the example find nothing and take their full path
+        return rng.choices(range(offset, offset + 2 * n), k=count)
+    if all(isinstance(x, (int, float)) and not isinstance(x, bool) for x in sample):
+        return [rng.uniform(-n, n) for _ in range(count)]
+    if all(isinstance(x, str) for x in sample):
+        alphabet = sorted(set("".join(sample))) or string.ascii_lowercase
+        length = max(1, round(sum(map(len, sample)) / len(sample)))
+        return [_random_string(rng, alphabet, length) for _ in range(count)]
+    return rng.choices(sample, k=count)
+
+def scale_arguments(args: list, kwargs: dict, n: int, rng: random.Random) -> Optional[Tuple[list, dict]]:
+    """Grow a sample call to input size n: sequences get n elements, or int sizes become n"""
+    def has_sequence(value: Any) -> bool:
+        return isinstance(value, (list, str)) and not isinstance(value, bool)
+
+    values = list(args) + list(kwargs.values())
+    if any(has_sequence(value) for value in values):
+        scalars = [abs(value) for value in values if _is_int(value)]
+        flat = [x for value in values if isinstance(value, list) for x in value]
+        flat = [y for x in flat for y in (x if isinstance(x, list) else [x])]
+        offset = max([0] + scalars + [x for x in flat if _is_int(x)]) + 1
+
+        def scale(value: Any) -> Any:
+            if isinstance(value, str):
+                alphabet = sorted(set(value)) if len(set(value)) > 1 else string.ascii_lowercase
+                return _random_string(rng, alphabet, n)
+            if isinstance(value, list):
+                return _scale_list(value, n, rng, offset)
+            return value
+    elif any(_is_int(value) and value > 0 for value in values):
+        def scale(value: Any) -> Any:
+            return n if _is_int(value) and value > 0 else value
+    else:
+        return None
+    return [scale(value) for value in args], {name: scale(value) for name, value in kwargs.items()}
+
+def _fresh(value: Any) -> Any:
+    """Cheap copy of generated input so in-place solutions don't see a mutated list"""
+    if isinstance(value, list):
+        return [_fresh(item) for item in value] if value and isinstance(value[0], list) else value[:]
+    return value
+
+def _time_calls(function: Callable, args: list, kwargs: dict, mutates: bool) -> float:
+    """Seconds per call, batching calls until the batch is long enough to time reliably"""
+    calls = 1
+    while True:
+        if mutates:
+            inputs = [(_fresh(args), {k: _fresh(v) for k, v in kwargs.items()}) for _ in range(calls)]
+        else:
+            inputs = [(args, kwargs)] * calls
+        # Like timeit: keep collector pauses out of the measurement
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            for call_args, call_kwargs in inputs:
+                function(*call_args, **call_kwargs)
+            elapsed = time.perf_counter() - started
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if elapsed >= MIN_BATCH_SECONDS or calls >= MAX_BATCH_CALLS or (mutates and calls * len(args) > 0 and calls >= 8):
+            return elapsed / calls
+        calls = min(MAX_BATCH_CALLS, calls * max(2, math.ceil(MIN_BATCH_SECONDS / max(elapsed, 1e-7))))
+
+def _fit(sizes: List[int], values: List[float], f: Callable[[float], float], floor: float) -> float:
+    """Weighted least squares of values ≈ a + b·f(n) with a, b ≥ 0; returns the relative RMS error"""
+    xs = [f(n) for n in sizes]
+    ws = [1.0 / max(v, floor) ** 2 for v in values]
+    sw = sum(ws)
+    swx = sum(w * x for w, x in zip(ws, xs))
+    swy = sum(w * y for w, y in zip(ws, values))
+    swxx = sum(w * x * x for w, x in zip(ws, xs))
+    swxy = sum(w * x * y for w, x, y in zip(ws, xs, values))
+
+    denominator = sw * swxx - swx * swx
+    a, b = swy / sw, 0.0
+    if denominator > 0:
+        b = (sw * swxy - swx * swy) / denominator
+        a = (swy - b * swx) / sw
+        if b < 0:
+            a, b = swy / sw, 0.0
+        elif a < 0:
+            a, b = 0.0, swxy / swxx
+    residual = sum(w * (y - a - b * x) ** 2 for w, x, y in zip(ws, xs, values))
+    return math.sqrt(residual / len(values))
+
+def fit_complexity(sizes: List[int], values: List[float], floor: float) -> Dict[str, Any]:
+    """Best-fitting growth curve for (size, cost) samples with a 0-1 confidence"""
+    if len(sizes) < MIN_POINTS:
+        return {"complexity": UNKNOWN, "confidence": 0.0}
+    if max(values) <= floor:
+        return {"complexity": "O(1)", "confidence": 1.0}
+
+    errors = []
+    for name, f in CANDIDATES:
+        # 2ⁿ at the sizes we'd reach is only plausible for tiny inputs
+        if name == "O(2ⁿ)" and max(sizes) > 64:
+            continue
+        errors.append((name, _fit(sizes, values, f, floor)))
+
+    best_error = min(error for _, error in errors)
+    chosen = next(i for i, (_, error) in enumerate(errors) if error <= best_error * (1 + SIMPLER_SLACK))
+    name, error = errors[chosen]
+
+    # Confidence: how much better than the next simpler curve this fits, times how
+    # little the next steeper one (which can always fit at least as well) adds,
+    # scaled down for short series
+    beats_simpler = 1.0 - error / errors[chosen - 1][1] if chosen > 0 and errors[chosen - 1][1] > 0 else 1.0
+    steeper_gain = errors[chosen + 1][1] / error if chosen + 1 < len(errors) and error > 0 else 1.0
+    coverage = min(1.0, (len(sizes) - 2) / 6)
+    confidence = max(0.0, beats_simpler) * min(1.0, steeper_gain) * coverage
+    return {"complexity": name, "confidence": round(confidence, 2)}
+
+def measure_complexity(
+    function: Callable,
+    args: list,
+    kwargs: dict,
+    budget_seconds: float,
+    max_size: int,
+    rng: Optional[random.Random] = None
+) -> Dict[str, Any]:
+    """Time and memory-profile function on geometrically growing inputs within a wall-clock budget"""
+    rng = rng or random.Random(0)
+    started = time.perf_counter()
+    deadline = started + budget_seconds
+    if scale_arguments(args, kwargs, MIN_SIZE, rng) is None:
+        return _report("unsupported_input", [], started)
+
+    use_timer = hasattr(signal, "setitimer")
+    if use_timer:
+        previous_handler = signal.signal(signal.SIGALRM, _on_budget_exhausted)
+        signal.setitimer(signal.ITIMER_REAL, budget_seconds)
+    tracemalloc.stop()  # Timing runs untraced; tracing is only on for the memory run
+
+    samples: List[Tuple[int, float, int]] = []
+    status = "ok"
+    size, exact_size = MIN_SIZE, float(MIN_SIZE)
+    try:
+        while size <= max_size:
+            scaled_args, scaled_kwargs = scale_arguments(args, kwargs, size, rng)
+
+            # Memory run first; it also tells us whether the solution mutates its input
+            call_args, call_kwargs = _fresh(scaled_args), {k: _fresh(v) for k, v in scaled_kwargs.items()}
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            function(*call_args, **call_kwargs)
+            peak = tracemalloc.get_traced_memory()[1] - baseline
+            tracemalloc.stop()
+            mutates = call_args != scaled_args or call_kwargs != scaled_kwargs
+
+            runtime = min(_time_calls(function, scaled_args, scaled_kwargs, mutates) for _ in range(REPEATS))
+            samples.append((size, runtime, peak))
+
+            # Stop before a size we can already tell won't fit in what's left of the budget
+            growth = samples[-1][1] / samples[-2][1] if len(samples) > 1 and samples[-2][1] > 0 else GROWTH
+            # (growth squared: the per-step ratio keeps rising for exponential solutions)
+            if time.perf_counter() + runtime * max(growth, GROWTH) ** 2 * (REPEATS + 2) > deadline:
+                status = "budget_exhausted"
+                break
+            exact_size *= GROWTH
+            size = max(size + 1, round(exact_size))
+    except BudgetExhausted:
+        status = "budget_exhausted"
+    except (RecursionError, MemoryError):
+        status = "resource_limit"
+    except Exception as e:
+        status = f"input_error: {type(e).__name__}"
+    finally:
+        if use_timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+        tracemalloc.stop()
+    return _report(status, samples, started)
+
+def _report(status: str, samples: List[Tuple[int, float, int]], started: float) -> Dict[str, Any]:
+    sizes = [size for size, _, _ in samples]
+    return {
+        "status": status,
+        "time": fit_complexity(sizes, [runtime for _, runtime, _ in samples], floor=1e-7),
+        "space": fit_complexity(sizes, [peak for _, _, peak in samples], floor=MEMORY_FLOOR_BYTES),
+        "samples": [
+            {"n": size, "runtime_us": round(runtime * 1e6, 1), "peak_memory_kb": round(peak / 1024, 1)}
+            for size, runtime, peak in samples
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
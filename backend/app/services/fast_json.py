@@ -0,0 +1,56 @@
+import hashlib
+from typing import Any, Dict
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.config import settings
+
+JSON_MEDIA_TYPE = "application/json"
+
+def _default(value: Any) -> Any:
+    """Types orjson doesn't know (pydantic models, sets, Decimals, ...) go through FastAPI's encoder"""
+    return jsonable_encoder(value)
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson; the app's default response class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def cache_control(max_age: int) -> str:
+    # no-cache still lets the browser keep the body; it just revalidates (a 304) every time
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+def not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # A weak match is enough for GET (RFC 9110 13.1.2)
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+def tagged_response(request: Request, body: bytes, headers: Dict[str, str]) -> Response:
+    """The encoded body, or an empty 304 when the client already has this ETag"""
+    if not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+
+class StaticJSON:
+    """A payload encoded once, served as the same bytes with a strong ETag"""
+
+    def __init__(self, content: Any, max_age: int = settings.STATIC_RESPONSE_MAX_AGE_SECONDS):
+        self.body = dumps(content)
+        self.headers = {"ETag": etag_for(self.body), "Cache-Control": cache_control(max_age)}
+
+    def response(self, request: Request) -> Response:
+        return tagged_response(request, self.body, self.headers)
@@ -0,0 +1,130 @@
+import json
+from typing import Any, Dict, List, Optional
+
+_WHITESPACE = " \t\r\n"
+
+class IncrementalJSONParser:
+    """Parses a streamed JSON object chunk by chunk, emitting each field as soon as it completes
+
+    feed() returns events:
+      {"type": "field", "name": key, "value": value}               a top-level field finished
+      {"type": "item", "name": key, "index": i, "value": item}     an item of a top-level array finished
+    Anything before the first "{" (prose, ``` fences) is skipped. A malformed
+    value only loses that value: everything emitted before it stays in `fields`.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.fields: Dict[str, Any] = {}
+        self.complete = False
+        self._started = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._string_start = 0
+        self._value_start: Optional[int] = None
+        self._item_start: Optional[int] = None
+        self._items: List[Any] = []
+
+    def _in_top_array(self) -> bool:
+        return len(self._stack) == 2 and self._stack[1] == "["
+
+    def _finish_item(self, end: int, events: List[Dict[str, Any]]) -> None:
+        start, self._item_start = self._item_start, None
+        try:
+            item = json.loads(self.text[start:end])
+        except ValueError:
+            return
+        events.append({"type": "item", "name": self._key, "index": len(self._items), "value": item})
+        self._items.append(item)
+
+    def _finish_field(self, end: int, events: List[Dict[str, Any]]) -> None:
+        start, self._value_start = self._value_start, None
+        items, self._items = self._items, []
+        try:
+            value = json.loads(self.text[start:end])
+        except ValueError:
+            # Keep whatever array items made it through before the bad byte
+            if not items:
+                return
+            value = items
+        self.fields[self._key] = value
+        events.append({"type": "field", "name": self._key, "value": value})
+
+    def _close_string(self, end: int, events: List[Dict[str, Any]]) -> None:
+        depth = len(self._stack)
+        if depth == 1 and self._expect_key:
+            try:
+                self._key = json.loads(self.text[self._string_start:end])
+            except ValueError:
+                self._key = None
+        elif depth == 1 and self._value_start == self._string_start:
+            self._finish_field(end, events)
+        elif self._in_top_array() and self._item_start == self._string_start:
+            self._finish_item(end, events)
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        offset = len(self.text)
+        self.text += chunk
+        for position, char in enumerate(chunk, offset):
+            if self.complete:
+                break
+            if not self._started:
+                if char == "{":
+                    self._started = True
+                    self._stack.append("{")
+                    self._expect_key = True
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(position + 1, events)
+                continue
+            if char in _WHITESPACE:
+                continue
+
+            # Mark where a top-level value or top-level array item begins
+            if len(self._stack) == 1 and not self._expect_key and self._value_start is None and char not in ",}":
+                self._value_start = position
+            elif self._in_top_array() and self._item_start is None and char not in ",]":
+                self._item_start = position
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                depth = len(self._stack)
+                if self._in_top_array() and self._item_start is not None:
+                    # A nested container item closed
+                    self._finish_item(position + 1, events)
+                elif depth == 1:
+                    # A top-level array or object value closed (flush a trailing scalar item first)
+                    if char == "]" and self._item_start is not None:
+                        self._finish_item(position, events)
+                    if self._value_start is not None:
+                        self._finish_field(position + 1, events)
+                elif depth == 0:
+                    if self._value_start is not None:
+                        self._finish_field(position, events)
+                    self.complete = True
+            elif char == ",":
+                if len(self._stack) == 1:
+                    if self._value_start is not None:
+                        self._finish_field(position, events)
+                    self._expect_key = True
+                elif self._in_top_array() and self._item_start is not None:
+                    self._finish_item(position, events)
+            elif char == ":" and len(self._stack) == 1:
+                self._expect_key = False
+        return events
@@ -0,0 +1,220 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import orjson
+from starlette.websockets import WebSocket, WebSocketState
+
+from app.config import settings
+from app.services.fast_json import dumps
+from app.services.session_store import now_ms
+
+# WebSocket close codes
+CLOSE_NORMAL = 1000
+CLOSE_POLICY_VIOLATION = 1008  # unknown/ended session, or a client not reading its messages
+CLOSE_TRY_AGAIN_LATER = 1013  # worker at its connection limit
+
+# Outbox sentinels: a timer tick is due / the session is over
+_TICK = object()
+_CLOSE = object()
+
+class LiveConnection:
+    """One client's socket; a single sender task does every write, so ticks and replies never interleave
+
+    Ticks aren't queued ahead of time: a loop timer drops a _TICK marker into
+    the outbox when the next whole tick of remaining time comes up, so a slow
+    client never accumulates a backlog of stale ticks. Replies that pile up
+    past the outbox size mean the client stopped reading, and it is dropped.
+    """
+
+    def __init__(self, websocket: WebSocket, session_id: str, deadline_ms: int, tick_ms: int, max_queue: int):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.deadline_ms = deadline_ms
+        self.tick_ms = tick_ms
+        self.close_code = CLOSE_NORMAL
+        self._outbox: asyncio.Queue = asyncio.Queue(max_queue)
+        self._sender: Optional[asyncio.Task] = None
+
+        # Per-connection interview state
+        self.questions_served_ms: Dict[str, int] = {}
+        self.hints_given: Dict[str, int] = {}
+        self.grading: Optional[asyncio.Task] = None
+        self.sent = 0
+
+    def send(self, message: Dict[str, Any]) -> None:
+        try:
+            self._outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            self.close_code = CLOSE_POLICY_VIOLATION
+            if self._sender is not None:
+                self._sender.cancel()
+
+    def finish(self) -> None:
+        """Close once everything already queued has been sent"""
+        self.send(_CLOSE)
+
+    async def settle(self) -> None:
+        """Wait for a submission still being graded
+
+        Shielded, so tearing the connection down never cancels a grading
+        that was already accepted: it is still saved and counted.
+        """
+        while self.grading is not None and not self.grading.done():
+            await asyncio.wait({asyncio.shield(self.grading)})
+
+    async def _send_queued(self) -> None:
+        """Send replies still in the outbox to a client that is still connected"""
+        while not self._outbox.empty():
+            message = self._outbox.get_nowait()
+            if message is _TICK or message is _CLOSE:
+                continue
+            if self.websocket.client_state != WebSocketState.CONNECTED:
+                return
+            await self.websocket.send_text(dumps(message).decode())
+            self.sent += 1
+
+    def _offer_tick(self) -> None:
+        try:
+            self._outbox.put_nowait(_TICK)
+        except asyncio.QueueFull:
+            pass  # Replies are backed up; this tick would be stale anyway
+
+    def tick_message(self) -> Dict[str, Any]:
+        current_ms = now_ms()
+        return {
+            "type": "tick",
+            "remaining_seconds": max(0, round((self.deadline_ms - current_ms) / 1000)),
+            "server_time_ms": current_ms
+        }
+
+    async def _run_sender(self, on_time_up: Callable[["LiveConnection"], Awaitable[List[Dict[str, Any]]]]) -> None:
+        loop = asyncio.get_running_loop()
+        websocket = self.websocket
+        while True:
+            remaining_ms = self.deadline_ms - now_ms()
+            if remaining_ms <= 0:
+                # A submission made in time is graded, and it and the replies already queued go out first
+                await self.settle()
+                await self._send_queued()
+                for message in await on_time_up(self):
+                    await websocket.send_text(dumps(message).decode())
+                    self.sent += 1
+                return
+            # Tick whenever the remaining time crosses a whole tick
+            timer = loop.call_later((remaining_ms % self.tick_ms or self.tick_ms) / 1000, self._offer_tick)
+            message = await self._outbox.get()
+            timer.cancel()
+            if message is _CLOSE:
+                return
+            if message is _TICK:
+                message = self.tick_message()
+            await websocket.send_text(dumps(message).decode())
+            self.sent += 1
+
+class LiveSessionHub:
+    """WebSocket channel per interview session: server-driven timer ticks plus request/reply messages
+
+    Each connection costs two small tasks (receiver and sender) and no polling;
+    ticks come from loop timers rather than a sleeping task per client. The
+    caller supplies the message handler and what to send when time runs out.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, max_connections: int = 10000, max_queue: int = 32):
+        self.tick_ms = max(1, int(tick_seconds * 1000))
+        self.max_connections = max_connections
+        self.max_queue = max_queue
+        self._connections: Set[LiveConnection] = set()
+
+        self.opened = 0
+        self.rejected = 0
+        self.dropped_slow = 0
+        self.received = 0
+        self.sent = 0
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    async def _receive(
+        self,
+        connection: LiveConnection,
+        on_message: Callable[[LiveConnection, Dict[str, Any]], Awaitable[None]]
+    ) -> None:
+        websocket = connection.websocket
+        while True:
+            event = await websocket.receive()
+            if event["type"] == "websocket.disconnect":
+                return
+            try:
+                message = orjson.loads(event.get("text") or "")
+                if not isinstance(message, dict):
+                    raise ValueError
+            except ValueError:
+                connection.send({"type": "error", "status": 400, "detail": "Messages must be JSON objects"})
+                continue
+            self.received += 1
+            await on_message(connection, message)
+
+    async def serve(
+        self,
+        websocket: WebSocket,
+        session_id: str,
+        deadline_ms: int,
+        hello: Dict[str, Any],
+        on_message: Callable[[LiveConnection, Dict[str, Any]], Awaitable[None]],
+        on_time_up: Callable[[LiveConnection], Awaitable[List[Dict[str, Any]]]]
+    ) -> None:
+        """Run one connection until the client leaves, the session ends or time runs out"""
+        if len(self._connections) >= self.max_connections:
+            self.rejected += 1
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+            return
+        await websocket.accept()
+        connection = LiveConnection(websocket, session_id, deadline_ms, self.tick_ms, self.max_queue)
+        connection.send(hello)
+        self._connections.add(connection)
+        self.opened += 1
+
+        sender = connection._sender = asyncio.create_task(connection._run_sender(on_time_up))
+        receiver = asyncio.create_task(self._receive(connection, on_message))
+        try:
+            await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sender, receiver):
+                task.cancel()
+            await asyncio.gather(sender, receiver, return_exceptions=True)
+            try:
+                # The client may have left mid-grading; the submission is still saved, and sent if it can be
+                await connection.settle()
+                if connection.close_code != CLOSE_POLICY_VIOLATION:
+                    await connection._send_queued()
+            except Exception:
+                pass  # The client is already gone
+            finally:
+                self._connections.discard(connection)
+                self.sent += connection.sent
+                if connection.close_code == CLOSE_POLICY_VIOLATION:
+                    self.dropped_slow += 1
+                if websocket.application_state == WebSocketState.CONNECTED:
+                    try:
+                        await websocket.close(code=connection.close_code)
+                    except Exception:
+                        pass  # The client is already gone
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self._connections),
+            "max_connections": self.max_connections,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "dropped_slow": self.dropped_slow,
+            "messages_received": self.received,
+            "messages_sent": self.sent + sum(connection.sent for connection in self._connections),
+            "tick_seconds": self.tick_ms / 1000
+        }
+
+# Initialize the hub
+live_sessions = LiveSessionHub(
+    tick_seconds=settings.LIVE_SESSION_TICK_SECONDS,
+    max_connections=settings.LIVE_SESSION_MAX_CONNECTIONS,
+    max_queue=settings.LIVE_SESSION_MAX_QUEUE
+)
@@ -0,0 +1,259 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from app.services.metrics import llm_queue_wait
+
+# Lower runs first
+INTERACTIVE = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+class LLMUnavailable(Exception):
+    """The scheduler refused the call (shed or circuit open); use the local fallback right away"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"LLM call shed: {reason}")
+        self.reason = reason
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future", "enqueued", "timer")
+
+    def __init__(self, priority: int, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.enqueued = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+class LLMScheduler:
+    """Admission control in front of the LLM: priority queue, token bucket, circuit breaker, shedding
+
+    A call gets a slot when a concurrency slot and a rate token are both free,
+    interactive before background. It is refused (LLMUnavailable) instead of
+    queued when the circuit is open, when the estimated queue wait already
+    exceeds its max_wait, or when the queue is full of equal-or-higher
+    priority work; waiters still queued at their deadline are shed too.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        requests_per_second: float = 10,
+        burst: int = 20,
+        max_queue: int = 200,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30,
+        classify_error: Callable[[BaseException], Optional[str]] = lambda error: "failure"
+    ):
+        self.max_concurrency = max_concurrency
+        self.rate = requests_per_second
+        self.burst = burst
+        self.max_queue = max_queue
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        # Maps an upstream error to "failure", "rate_limited" or None (caller's fault, not upstream health)
+        self.classify_error = classify_error
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._waiting = {priority: 0 for priority in PRIORITY_NAMES}
+        self._in_flight = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._refill_timer: Optional[asyncio.TimerHandle] = None
+
+        self.state = "closed"
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_admitted = False
+
+        # Smoothed upstream call duration, used to estimate queue wait
+        self._service_seconds = 2.0
+        self._waits: deque = deque(maxlen=1000)
+        self.admitted = 0
+        self.completed = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.circuit_opens = 0
+        self.shed = {"circuit_open": 0, "deadline": 0, "expired": 0, "queue_full": 0}
+
+    def _refill(self, now: float) -> None:
+        if self.rate > 0:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._refilled) * self.rate)
+        else:
+            self._tokens = float(self.burst)
+        self._refilled = now
+
+    def estimated_wait(self, priority: int) -> float:
+        """Seconds a new call of this priority would queue before getting a slot"""
+        self._refill(time.monotonic())
+        ahead = sum(count for p, count in self._waiting.items() if p <= priority) + 1
+        short_slots = ahead - (self.max_concurrency - self._in_flight)
+        by_slots = short_slots / self.max_concurrency * self._service_seconds if short_slots > 0 else 0.0
+        by_rate = max(0.0, ahead - self._tokens) / self.rate if self.rate > 0 else 0.0
+        return max(by_slots, by_rate)
+
+    def _admit_circuit(self, now: float) -> bool:
+        if self.state == "open":
+            if now - self._opened_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+            self._trial_admitted = False
+        if self.state == "half_open":
+            # One trial call decides whether to close the circuit again
+            if self._trial_admitted:
+                return False
+            self._trial_admitted = True
+        return True
+
+    def _refuse(self, reason: str) -> LLMUnavailable:
+        self.shed[reason] += 1
+        return LLMUnavailable(reason)
+
+    def _leave_queue(self, waiter: _Waiter) -> None:
+        self._waiting[waiter.priority] -= 1
+        if waiter.timer is not None:
+            waiter.timer.cancel()
+
+    def _expire(self, waiter: _Waiter) -> None:
+        if not waiter.future.done():
+            self._leave_queue(waiter)
+            waiter.future.set_exception(self._refuse("expired"))
+
+    def _make_room(self, priority: int) -> bool:
+        """Evict the newest lower-priority waiter; False if everything queued outranks the caller"""
+        live = [w for w in self._queue if not w.future.done()]
+        victim = max(live, default=None)
+        if victim is None or victim.priority <= priority:
+            return False
+        self._leave_queue(victim)
+        victim.future.set_exception(self._refuse("queue_full"))
+        return True
+
+    def _dispatch(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue and self._in_flight < self.max_concurrency:
+            waiter = self._queue[0]
+            if waiter.future.done():
+                heapq.heappop(self._queue)
+                continue
+            if self.rate > 0 and self._tokens < 1:
+                if self._refill_timer is None:
+                    delay = (1 - self._tokens) / self.rate
+                    self._refill_timer = asyncio.get_running_loop().call_later(delay, self._on_refill)
+                return
+            heapq.heappop(self._queue)
+            self._leave_queue(waiter)
+            self._tokens -= 1
+            self._in_flight += 1
+            self._waits.append(now - waiter.enqueued)
+            llm_queue_wait.labels(PRIORITY_NAMES[waiter.priority]).observe(now - waiter.enqueued)
+            waiter.future.set_result(None)
+
+    def _on_refill(self) -> None:
+        self._refill_timer = None
+        self._dispatch()
+
+    async def acquire(self, priority: int = INTERACTIVE, max_wait: Optional[float] = None) -> None:
+        """Wait for a slot, or raise LLMUnavailable right away if the call can't be served in time"""
+        if not self._admit_circuit(time.monotonic()):
+            raise self._refuse("circuit_open")
+        try:
+            if max_wait is not None and self.estimated_wait(priority) > max_wait:
+                raise self._refuse("deadline")
+            if sum(self._waiting.values()) >= self.max_queue and not self._make_room(priority):
+                raise self._refuse("queue_full")
+
+            waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+            heapq.heappush(self._queue, waiter)
+            self._waiting[priority] += 1
+            self._dispatch()
+            if max_wait is not None and not waiter.future.done():
+                waiter.timer = asyncio.get_running_loop().call_later(max_wait, self._expire, waiter)
+
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled() and waiter.future.exception() is None:
+                    # Granted just as the caller went away: hand the slot back
+                    self._release(None, asyncio.CancelledError())
+                elif not waiter.future.done():
+                    self._leave_queue(waiter)
+                    waiter.future.cancel()
+                raise
+        except LLMUnavailable:
+            # A half-open trial that never reached upstream doesn't count; the next call gets to try
+            if self.state == "half_open":
+                self._trial_admitted = False
+            raise
+        self.admitted += 1
+
+    def _release(self, started: Optional[float], error: Optional[BaseException]) -> None:
+        self._in_flight -= 1
+        now = time.monotonic()
+        kind = None if error is None or not isinstance(error, Exception) else self.classify_error(error)
+        if error is None:
+            self.completed += 1
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * (now - started)
+            self._consecutive_failures = 0
+            if self.state == "half_open":
+                self.state = "closed"
+        elif kind is not None:
+            self.failures += 1
+            self._consecutive_failures += 1
+            if kind == "rate_limited":
+                # Upstream says slow down: drain the bucket so the next call waits a full token
+                self.rate_limited += 1
+                self._tokens = min(self._tokens, 0.0)
+            if self.state == "half_open" or self._consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = now
+                self.circuit_opens += 1
+        elif self.state == "half_open":
+            # The trial was cancelled or failed on our side; let the next call try
+            self._trial_admitted = False
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """Hold one admitted LLM call for the duration of the block"""
+        await self.acquire(priority, max_wait)
+        started = time.monotonic()
+        error: Optional[BaseException] = None
+        try:
+            yield
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(started, error)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        return {
+            "state": self.state,
+            "in_flight": self._in_flight,
+            "queue_depth": {PRIORITY_NAMES[p]: count for p, count in self._waiting.items()},
+            "tokens": round(self._tokens, 2),
+            "admitted": self.admitted,
+            "completed": self.completed,
+            "failures": self.failures,
+            "rate_limited": self.rate_limited,
+            "circuit_opens": self.circuit_opens,
+            "shed": dict(self.shed),
+            "queue_wait_seconds": {
+                "p50": round(waits[len(waits) // 2], 4) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95) - 1], 4) if waits else 0.0,
+                "max": round(waits[-1], 4) if waits else 0.0
+            },
+            "estimated_service_seconds": round(self._service_seconds, 3)
+        }
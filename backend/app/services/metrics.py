@@ -0,0 +1,304 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Request/DB latency buckets (seconds)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# LLM calls run for seconds, not milliseconds
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+# Tokens per LLM request
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """The child for one label combination; cache it at the call site on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+
+# Children update without a lock: a lock doubles the cost of an observation, and
+# the only race (two threads interleaving one += under the GIL) loses a single
+# sample, which a latency histogram can afford.
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self._default.inc(amount)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def dec(self, amount: float = 1) -> None:
+        self._default.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time from a function returning (label values, value) pairs"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        self.collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return None
+
+    def _samples(self) -> Iterable[str]:
+        try:
+            samples = list(self.collect())
+        except Exception as e:
+            print(f"Error collecting metric {self.name}: {e}")
+            return
+        for values, value in samples:
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(value)}"
+
+class CallbackCounter(CallbackGauge):
+    """Counter read at scrape time, for services that already keep their own running totals"""
+    kind = "counter"
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        # Non-cumulative; the last slot is +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _samples(self) -> Iterable[str]:
+        for values, child in list(self._children.items()):
+            counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                bucket = _labels(self.labelnames, values, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{bucket} {cumulative}"
+            labels = _labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def callback_gauge(self, name: str, documentation: str, labelnames: Sequence[str],
+                       collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, collect))
+
+    def callback_counter(self, name: str, documentation: str, labelnames: Sequence[str],
+                         collect: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]) -> CallbackCounter:
+        return self.register(CallbackCounter(name, documentation, labelnames, collect))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Initialize the registry
+metrics = MetricsRegistry()
+
+http_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests currently being served"
+)
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds", "HTTP request latency until the last body byte is sent", ("method", "route")
+)
+http_requests = metrics.counter(
+    "http_requests_total", "HTTP responses by status code", ("method", "route", "status")
+)
+llm_request_duration = metrics.histogram(
+    "llm_request_duration_seconds", "Upstream LLM call duration, including queueing for a slot",
+    ("operation", "outcome"), LLM_BUCKETS
+)
+llm_tokens = metrics.counter(
+    "llm_tokens_total", "LLM tokens by direction (prompt/completion)", ("operation", "direction")
+)
+llm_request_tokens = metrics.histogram(
+    "llm_request_tokens", "Tokens per LLM request by direction (prompt/completion)", ("operation", "direction"),
+    TOKEN_BUCKETS
+)
+llm_queue_wait = metrics.histogram(
+    "llm_queue_wait_seconds", "Time an admitted LLM call waited for a scheduler slot", ("priority",)
+)
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine", "statement")
+)
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: in-flight gauge plus per-route latency and status counts
+
+    Routes are labelled by their path template (/api/sessions/{session_id}),
+    unmatched paths all share one label so a scan can't blow up cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # (method, route, status) -> (duration histogram child, status counter child)
+        self._children: Dict[Tuple[str, str, int], Tuple[_HistogramChild, _CounterChild]] = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight._default
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_flight.dec()
+            # The router writes the matched route into the shared scope
+            route = scope.get("route")
+            key = (scope["method"], route.path if route is not None else "unmatched", status)
+            children = self._children.get(key)
+            if children is None:
+                children = self._children[key] = (
+                    http_request_duration.labels(key[0], key[1]),
+                    http_requests.labels(key[0], key[1], str(status))
+                )
+            children[0].observe(elapsed)
+            children[1].inc()
+
+def _statement_kind(statement: str) -> str:
+    kind = statement.lstrip()[:6].upper()
+    return kind if kind in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+def instrument_engine(engine, name: str) -> None:
+    """Time every statement run on a (sync) SQLAlchemy engine
+
+    Wraps the dialect's execute hooks rather than listening for cursor events:
+    any cursor-event listener switches SQLAlchemy onto its event-dispatch path,
+    which costs ~20 us per statement on its own, while this adds ~1 us.
+    """
+    dialect = engine.dialect
+    perf_counter = time.perf_counter
+
+    def timed(execute):
+        def run(cursor, statement, *args, **kwargs):
+            started = perf_counter()
+            try:
+                return execute(cursor, statement, *args, **kwargs)
+            finally:
+                db_query_duration.labels(name, _statement_kind(statement)).observe(perf_counter() - started)
+        return run
+
+    dialect.do_execute = timed(dialect.do_execute)
+    dialect.do_executemany = timed(dialect.do_executemany)
+    dialect.do_execute_no_params = timed(dialect.do_execute_no_params)
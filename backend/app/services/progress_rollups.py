@@ -0,0 +1,177 @@
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import async_engine
+from app.models.interview import ProgressRollup, Submission
+
+PERIODS = ("day", "week")
+
+# (period, period_start, dimension, key)
+RollupKey = Tuple[str, date, str, str]
+
+def period_start(period: str, day: date) -> date:
+    """First day of the bucket holding `day`; weeks start on Monday"""
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+class ProgressRollups:
+    """Materialized daily/weekly score aggregates, overall and per difficulty and tag
+
+    Rows are folded in by the submission writer inside the same transaction
+    that inserts the submissions, so the rollups never drift from the table
+    and the dashboard reads one primary-key range instead of scanning
+    submissions. Buckets are UTC days, like the submissions' created_at.
+    """
+
+    def __init__(self, engine=async_engine, passing_score: int = 70, improvement_min_attempts: int = 3):
+        self.engine = engine
+        self.passing_score = passing_score
+        self.improvement_min_attempts = improvement_min_attempts
+
+    def aggregate(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fold submissions rows into one delta per rollup key"""
+        # Fold per day first (a batch rarely spans more than one), then fan out to periods
+        by_day: Dict[Tuple[date, str, str], List[float]] = {}
+        now = datetime.utcnow()
+        for row in rows:
+            score = row.get("overall_score")
+            if score is None:
+                continue
+            day = (row.get("created_at") or now).date()
+            solved = int(score >= self.passing_score)
+            keys = [("overall", "")]
+            if row.get("difficulty"):
+                keys.append(("difficulty", row["difficulty"]))
+            keys.extend(("tag", tag) for tag in row.get("tags") or ())
+            for dimension, key in keys:
+                totals = by_day.get((day, dimension, key))
+                if totals is None:
+                    by_day[(day, dimension, key)] = [1, solved, score, score]
+                else:
+                    totals[0] += 1
+                    totals[1] += solved
+                    totals[2] += score
+                    if score > totals[3]:
+                        totals[3] = score
+
+        deltas: Dict[RollupKey, Dict[str, Any]] = {}
+        for (day, dimension, key), (attempts, solved, score_sum, best_score) in by_day.items():
+            for period in PERIODS:
+                start = period_start(period, day)
+                delta = deltas.get((period, start, dimension, key))
+                if delta is None:
+                    deltas[(period, start, dimension, key)] = {
+                        "period": period, "period_start": start, "dimension": dimension, "key": key,
+                        "attempts": attempts, "solved": solved, "score_sum": score_sum, "best_score": best_score
+                    }
+                else:
+                    delta["attempts"] += attempts
+                    delta["solved"] += solved
+                    delta["score_sum"] += score_sum
+                    delta["best_score"] = max(delta["best_score"], best_score)
+        return list(deltas.values())
+
+    async def apply(self, connection, rows: Iterable[Dict[str, Any]]) -> None:
+        """Add a batch of submissions rows to the rollups (upserts inside the caller's transaction)"""
+        deltas = self.aggregate(rows)
+        if not deltas:
+            return
+        if connection.dialect.name == "postgresql":
+            statement, greatest = postgresql.insert(ProgressRollup), func.greatest
+        else:
+            statement, greatest = sqlite.insert(ProgressRollup), func.max
+        table, excluded = ProgressRollup.__table__.c, statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.period, table.period_start, table.dimension, table.key],
+            set_={
+                "attempts": table.attempts + excluded.attempts,
+                "solved": table.solved + excluded.solved,
+                "score_sum": table.score_sum + excluded.score_sum,
+                "best_score": greatest(table.best_score, excluded.best_score)
+            }
+        )
+        await connection.execute(statement, deltas)
+
+    async def rebuild(self, chunk_size: int = 50000) -> int:
+        """Recompute every rollup from the submissions table (backfill); returns the rows folded in"""
+        columns = [Submission.created_at, Submission.difficulty, Submission.tags, Submission.overall_score]
+        folded = 0
+        async with self.engine.begin() as connection:
+            await connection.execute(delete(ProgressRollup))
+            result = await connection.stream(select(*columns).execution_options(yield_per=chunk_size))
+            async for chunk in result.mappings().partitions():
+                await self.apply(connection, chunk)
+                folded += len(chunk)
+        return folded
+
+    async def read(self, period: str, since: date) -> List[Tuple]:
+        """(period_start, dimension, key, attempts, solved, score_sum, best_score) rows, oldest first"""
+        async with self.engine.connect() as connection:
+            result = await connection.execute(
+                select(
+                    ProgressRollup.period_start, ProgressRollup.dimension, ProgressRollup.key, ProgressRollup.attempts,
+                    ProgressRollup.solved, ProgressRollup.score_sum, ProgressRollup.best_score
+                )
+                .where(ProgressRollup.period == period, ProgressRollup.period_start >= since)
+                .order_by(ProgressRollup.period_start)
+            )
+            return result.all()
+
+    def improvement_areas(self, skills: Dict[str, Dict[str, Any]], limit: int = 3) -> List[str]:
+        """Lowest-scoring tags among those practised often enough to judge"""
+        candidates = [tag for tag, totals in skills.items() if totals["attempts"] >= self.improvement_min_attempts]
+        return sorted(candidates, key=lambda tag: skills[tag]["average_score"])[:limit]
+
+    async def dashboard(self, period: str = "day", periods: int = 30, today: Optional[date] = None) -> Dict[str, Any]:
+        """Chart series for the last `periods` buckets, per-tag totals and improvement areas"""
+        today = today or datetime.utcnow().date()
+        step = timedelta(days=7 if period == "week" else 1)
+        first = period_start(period, today) - (periods - 1) * step
+
+        overall: Dict[date, Dict[str, Any]] = {}
+        series: Dict[str, Dict[str, List[Dict[str, Any]]]] = {"difficulty": {}, "tag": {}}
+        totals: Dict[str, List[float]] = {}
+        for start, dimension, key, attempts, solved, score_sum, best_score in await self.read(period, first):
+            point = {
+                "period_start": start.isoformat(),
+                "attempts": attempts,
+                "solved": solved,
+                "average_score": round(score_sum / attempts, 1),
+                "best_score": best_score
+            }
+            if dimension == "overall":
+                overall[start] = point
+                continue
+            series[dimension].setdefault(key, []).append(point)
+            if dimension == "tag":
+                tag = totals.setdefault(key, [0, 0, 0.0])
+                tag[0] += attempts
+                tag[1] += solved
+                tag[2] += score_sum
+
+        # Zero-fill the headline series so charts get a continuous axis
+        points = []
+        for i in range(periods):
+            start = first + i * step
+            points.append(overall.get(start) or {
+                "period_start": start.isoformat(), "attempts": 0, "solved": 0, "average_score": None, "best_score": None
+            })
+
+        skills = {
+            tag: {"attempts": attempts, "solved": solved, "average_score": round(score_sum / attempts, 1)}
+            for tag, (attempts, solved, score_sum) in sorted(totals.items(), key=lambda item: -item[1][0])
+        }
+        return {
+            "period": period,
+            "from": first.isoformat(),
+            "overall": points,
+            "by_difficulty": series["difficulty"],
+            "by_tag": series["tag"],
+            "skills": skills,
+            "improvement_areas": self.improvement_areas(skills)
+        }
+
+# Initialize the rollups
+progress_rollups = ProgressRollups()
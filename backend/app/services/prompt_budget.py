@@ -0,0 +1,384 @@
+import ast
+import asyncio
+import re
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.services.metrics import llm_request_tokens
+
+# Roughly how cl100k-style tokenizers pre-split text, counted piece type by piece type
+_SHORT_PIECE = re.compile(r"[^\W\d_]+|\d{1,3}|_")
+_LONG_WORD = re.compile(r"[^\W\d_]{7,}")
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+_NEWLINE = re.compile(r"\n\s*")
+_INDENT = re.compile(r"\n\s*[ \t]{2}(?=\S)")
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+# A string literal (skipped over) or a comment (removed); a regex pass is far cheaper than tokenize
+_STRING_OR_COMMENT = re.compile(r"""(\"\"\"|''')[\s\S]*?(?:\1|$)|"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|#[^\n]*""")
+_LINE_COMMENT = re.compile(r"^[ \t]*//[^\n]*$", re.MULTILINE)
+# Chat formatting adds a few tokens per message plus the reply primer
+_MESSAGE_OVERHEAD = 4
+_REPLY_OVERHEAD = 3
+# Never squeeze the code below this many tokens, however long the question is
+_MIN_CODE_TOKENS = 256
+_FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef)
+_UNREACHED = 1 << 30
+
+# Static prefix shared by every analysis request; everything that varies goes after it
+ANALYSIS_INSTRUCTIONS = """You review solutions to FAANG-style coding interview questions.
+Reply with only a JSON object of this shape:
+{"correctness_score": 0-100, "efficiency_score": 0-100, "code_quality_score": 0-100, "time_management_score": 0-100, "overall_score": 0-100, "feedback": ["positive point", ...], "improvements": ["suggestion", ...], "time_complexity": "O(?)", "space_complexity": "O(?)", "interview_tips": ["tip", ...]}
+Comments and blank lines have been removed from the code, and long submissions are trimmed to the parts the solution uses; a line "...  # N lines omitted" marks a cut, not a bug. Judge the code shown.
+Be constructive but honest in your assessment."""
+
+def estimate_tokens(text: str) -> int:
+    """Local estimate of a cl100k-style token count; no tokenizer tables needed
+
+    Letter runs count one token per six letters or part of them, digits one
+    per three, punctuation one per two characters, newlines one plus one for
+    any indentation after them, and non-ASCII characters about one each.
+    Spaces ride along with the next word. Each piece type is one
+    regex pass, so this stays cheap on a 2,000-line paste.
+    """
+    tokens = (
+        len(_SHORT_PIECE.findall(text))
+        + sum((len(word) - 1) // 6 for word in _LONG_WORD.findall(text))
+        + sum((len(run) + 1) // 2 for run in _PUNCTUATION.findall(text))
+        + len(_NEWLINE.findall(text))
+        + len(_INDENT.findall(text))
+    )
+    if not text.isascii():
+        tokens += len(_NON_ASCII.findall(text))
+    return tokens
+
+def compact_code(code: str) -> str:
+    """Drop comments, blank lines and trailing whitespace; code and string contents stay as written"""
+    code = code.replace("\r\n", "\n").replace("\r", "\n")
+    if "#" in code:
+        code = _STRING_OR_COMMENT.sub(lambda match: "" if match.group().startswith("#") else match.group(), code)
+    if _LINE_COMMENT.search(code):
+        try:
+            ast.parse(code)  # A line can start with // inside a Python expression
+        except (SyntaxError, ValueError):
+            code = _LINE_COMMENT.sub("", code)  # Likely another language's comments
+    return "\n".join(line.rstrip() for line in code.split("\n") if line.strip())
+
+def clip_text(text: str, budget: int) -> str:
+    """Cut prose to about `budget` estimated tokens"""
+    tokens = estimate_tokens(text)
+    if tokens <= budget:
+        return text
+    return text[:len(text) * budget // tokens].rstrip() + " …"
+
+def _indent(line: str) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+def _omitted(indent: str, count: int) -> str:
+    return f"{indent}...  # {count} line{'s' if count != 1 else ''} omitted"
+
+class _Unit:
+    """A top-level statement, or one statement of a top-level class body, as a span of lines"""
+
+    def __init__(self, node: ast.AST, start: int, end: int, parent: Optional["_Unit"] = None):
+        self.node = node
+        self.start = start  # 0-based, inclusive
+        self.end = end
+        self.parent = parent
+        self.priority = _UNREACHED
+        self.links: List["_Unit"] = []
+        self.kept = ""  # "", "full", "stub" or "clip"
+        self.clip_budget = 0
+
+    def defines(self) -> List[str]:
+        node = self.node
+        if isinstance(node, _FUNCTIONS + (ast.ClassDef,)):
+            return [node.name]
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            return [(alias.asname or alias.name).split(".")[0] for alias in node.names]
+        if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            return [n.id for target in targets for n in ast.walk(target) if isinstance(n, ast.Name)]
+        return []
+
+    def references(self) -> set:
+        if isinstance(self.node, ast.ClassDef) and self.parent is None:
+            nodes = self.node.bases + self.node.decorator_list  # Header only; the body is separate units
+        else:
+            nodes = [self.node]
+        names = set()
+        for root in nodes:
+            for n in ast.walk(root):
+                if isinstance(n, ast.Name):
+                    names.add(n.id)
+                elif isinstance(n, ast.Attribute):
+                    names.add(n.attr)
+        return names
+
+def _start(node: ast.AST) -> int:
+    return min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+
+def _units(tree: ast.Module) -> List[_Unit]:
+    """Statements in source order; a class with a body becomes a header unit followed by its members"""
+    units = []
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef) and node.body:
+            header = _Unit(node, _start(node), _start(node.body[0]) - 1)
+            units.append(header)
+            units.extend(_Unit(child, _start(child), child.end_lineno - 1, header) for child in node.body)
+        else:
+            units.append(_Unit(node, _start(node), node.end_lineno - 1))
+    return units
+
+def _prioritize(units: List[_Unit], entry_point: Optional[str]) -> None:
+    """Priority = call distance from the entry point (the same function the code runner would call)"""
+    functions = [u for u in units if isinstance(u.node, _FUNCTIONS)]
+    entries = [u for u in functions if u.node.name == entry_point]
+    if not entries:
+        entries = [u for u in functions if u.parent is not None and u.parent.node.name == "Solution"
+                   and not u.node.name.startswith("_")]
+    if not entries:
+        entries = [u for u in functions if u.parent is None][-1:]
+
+    by_name: Dict[str, List[_Unit]] = {}
+    for unit in units:
+        for name in unit.defines():
+            by_name.setdefault(name, []).append(unit)
+        if unit.parent is not None and (not isinstance(unit.node, _FUNCTIONS) or unit.node.name.startswith("__")):
+            # Using a class means using its fields and dunder methods
+            unit.parent.links.append(unit)
+
+    # Only reached units are walked for the names they use
+    frontier = entries
+    for unit in entries:
+        unit.priority = 0
+    distance = 0
+    while frontier:
+        distance += 1
+        reached = []
+        for unit in frontier:
+            for target in unit.links + [target for name in unit.references() for target in by_name.get(name, ())]:
+                if target.priority == _UNREACHED:
+                    target.priority = distance
+                    reached.append(target)
+        frontier = reached
+    for unit in units:
+        if isinstance(unit.node, (ast.Import, ast.ImportFrom)):
+            unit.priority = 0
+
+def _clip(lines: List[str], budget: int) -> Tuple[List[str], int]:
+    """Head and tail of lines within budget, with an omission marker between them; also the lines cut"""
+    costs = [estimate_tokens("\n" + line) for line in lines]
+    head, used = 0, 0
+    while head < len(lines) and used + costs[head] <= budget * 2 // 3:
+        used += costs[head]
+        head += 1
+    tail = len(lines)
+    while tail > head and used + costs[tail - 1] + 8 <= budget:
+        used += costs[tail - 1]
+        tail -= 1
+    if tail == head:
+        return lines, 0
+    return lines[:head] + [_omitted(_indent(lines[head]), tail - head)] + lines[tail:], tail - head
+
+def fit_code(code: str, budget: int, entry_point: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """Compact the code, then trim it to about `budget` estimated tokens
+
+    Whole statements are kept in order of call distance from the entry point:
+    the entry function, what it calls, imports and the names those use. A
+    reachable helper that doesn't fit keeps its signature with its body
+    marked omitted. Unreachable code (driver code, tests, dead helpers) is
+    dropped. An entry function too long by itself keeps its head and tail, as
+    does code that doesn't parse or has no function to start from.
+    """
+    compacted = compact_code(code)
+    tokens = estimate_tokens(compacted)
+    report = {
+        "code_tokens": estimate_tokens(code),
+        "compacted_tokens": tokens,
+        "sent_tokens": tokens,
+        "truncated": False,
+        "omitted_lines": 0
+    }
+    if tokens <= budget:
+        return compacted, report
+
+    lines = compacted.split("\n")
+    try:
+        units = _units(ast.parse(compacted))
+    except (SyntaxError, ValueError):
+        units = []
+    _prioritize(units, entry_point)
+    if not any(unit.priority == 0 and isinstance(unit.node, _FUNCTIONS) for unit in units):
+        kept, omitted = _clip(lines, budget)
+    else:
+        span_cost = lambda start, end: estimate_tokens("\n".join(lines[start:end + 1])) + 1 if end >= start else 0
+        used = 0
+        for unit in sorted(units, key=lambda u: (u.priority, u.start)):
+            if unit.priority == _UNREACHED:
+                break
+            if unit.kept:
+                continue  # A class header already kept along with one of its members
+            parent = unit.parent
+            extra = span_cost(parent.start, parent.end) if parent is not None and not parent.kept else 0
+            full = span_cost(unit.start, unit.end) + extra
+            if used + full <= budget:
+                unit.kept, used = "full", used + full
+            elif not isinstance(unit.node, _FUNCTIONS):
+                continue
+            else:
+                stub = span_cost(unit.start, _start(unit.node.body[0]) - 1) + 8 + extra
+                if used + stub > budget:
+                    continue
+                if unit.priority == 0:
+                    unit.kept, unit.clip_budget = "clip", budget - used - extra
+                    used = budget  # The rest of the budget goes to this function
+                else:
+                    unit.kept, used = "stub", used + stub
+            if parent is not None:
+                parent.kept = "full"
+
+        # Back to source order; each run of dropped statements becomes one marker
+        kept, omitted, dropped, run_start, run_block = [], 0, 0, 0, None
+        for unit in units + [None]:
+            # Members of a dropped class run on with the top-level statements around it
+            block = unit.parent if unit is not None and unit.parent is not None and unit.parent.kept else None
+            if dropped and (unit is None or unit.kept or block is not run_block):
+                kept.append(_omitted(_indent(lines[run_start]), dropped))
+                omitted, dropped = omitted + dropped, 0
+            if unit is None:
+                break
+            if not unit.kept:
+                if not dropped:
+                    run_start, run_block = unit.start, block
+                dropped += unit.end - unit.start + 1
+            elif unit.kept == "full":
+                kept.extend(lines[unit.start:unit.end + 1])
+            elif unit.kept == "stub":
+                body_start = _start(unit.node.body[0])
+                kept.extend(lines[unit.start:body_start])
+                kept.append(_omitted(_indent(lines[body_start]), unit.end - body_start + 1))
+                omitted += unit.end - body_start + 1
+            else:
+                clipped, cut = _clip(lines[unit.start:unit.end + 1], unit.clip_budget)
+                kept.extend(clipped)
+                omitted += cut
+
+    code = "\n".join(kept)
+    report["sent_tokens"] = estimate_tokens(code)
+    report["truncated"] = True
+    report["omitted_lines"] = omitted
+    return code, report
+
+class PromptBudget:
+    """Keeps analysis prompts inside a token budget and logs what each LLM request used
+
+    The local estimate is scaled by a correction learned from the provider's
+    reported prompt_tokens, so the budget tracks the real tokenizer over time.
+    """
+
+    def __init__(self, max_prompt_tokens: int = 3000, max_description_tokens: int = 600,
+                 max_completion_tokens: int = 800, log_size: int = 200):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_description_tokens = max_description_tokens
+        self.max_completion_tokens = max_completion_tokens
+        self.correction = 1.0
+        self.prefix_tokens = estimate_tokens(ANALYSIS_INSTRUCTIONS) + _MESSAGE_OVERHEAD
+        self._log: Deque[Dict[str, Any]] = deque(maxlen=log_size)
+
+        self.requests = 0
+        self.truncated = 0
+        self.code_tokens = 0
+        self.code_tokens_sent = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def estimate_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Uncorrected local estimate of a chat request's prompt tokens"""
+        return sum(estimate_tokens(m["content"]) + _MESSAGE_OVERHEAD for m in messages) + _REPLY_OVERHEAD
+
+    def analysis_messages(
+        self, question: Dict[str, Any], user_code: str, time_taken: int
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """Messages for one analysis request, plus a report of how the code was fitted"""
+        description = clip_text(
+            question.get("description", "No description"), int(self.max_description_tokens / self.correction)
+        )
+        context = (
+            f"Question: {question.get('title', 'Unknown')}\n"
+            f"Description: {description}\n"
+            f"Time taken: {time_taken} seconds (limit was {question.get('time_limit_minutes', 20) * 60} seconds)\n"
+            f"Code:\n"
+        )
+        budget = int(self.max_prompt_tokens / self.correction) - self.prefix_tokens - _REPLY_OVERHEAD
+        budget = max(_MIN_CODE_TOKENS, budget - estimate_tokens(context) - _MESSAGE_OVERHEAD)
+        code, report = fit_code(user_code, budget, question.get("entry_point"))
+        messages = [
+            {"role": "system", "content": ANALYSIS_INSTRUCTIONS},
+            {"role": "user", "content": context + code}
+        ]
+        report["estimated_prompt_tokens"] = self.estimate_messages(messages)
+        return messages, report
+
+    async def prepare(
+        self, question: Dict[str, Any], user_code: str, time_taken: int
+    ) -> Tuple[List[Dict[str, str]], Dict[str, Any]]:
+        """analysis_messages() off the event loop; parsing a long paste takes tens of milliseconds"""
+        return await asyncio.to_thread(self.analysis_messages, question, user_code, time_taken)
+
+    def record(
+        self,
+        operation: str,
+        report: Dict[str, Any],
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int]
+    ) -> None:
+        """Log one request's token counts; real prompt counts refine the estimate correction"""
+        estimated = report.get("estimated_prompt_tokens")
+        self._log.append({
+            "operation": operation,
+            "estimated_prompt_tokens": estimated,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "code_tokens": report.get("code_tokens"),
+            "code_tokens_sent": report.get("sent_tokens"),
+            "truncated": report.get("truncated", False)
+        })
+        self.requests += 1
+        self.truncated += report.get("truncated", False)
+        self.code_tokens += report.get("code_tokens", 0)
+        self.code_tokens_sent += report.get("sent_tokens", 0)
+        if prompt_tokens is not None:
+            self.prompt_tokens += prompt_tokens
+            llm_request_tokens.labels(operation, "prompt").observe(prompt_tokens)
+            if estimated:
+                ratio = prompt_tokens / estimated
+                self.correction = min(2.0, max(0.5, 0.9 * self.correction + 0.1 * ratio))
+        if completion_tokens is not None:
+            self.completion_tokens += completion_tokens
+            llm_request_tokens.labels(operation, "completion").observe(completion_tokens)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return list(self._log)[-limit:]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "truncated": self.truncated,
+            "code_tokens": self.code_tokens,
+            "code_tokens_sent": self.code_tokens_sent,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimate_correction": round(self.correction, 3),
+            "max_prompt_tokens": self.max_prompt_tokens,
+            "max_completion_tokens": self.max_completion_tokens,
+            "recent": self.recent()
+        }
+
+# Initialize the budget
+prompt_budget = PromptBudget(
+    max_prompt_tokens=settings.ANALYSIS_PROMPT_MAX_TOKENS,
+    max_description_tokens=settings.ANALYSIS_DESCRIPTION_MAX_TOKENS,
+    max_completion_tokens=settings.ANALYSIS_MAX_COMPLETION_TOKENS,
+    log_size=settings.ANALYSIS_TOKEN_LOG_SIZE
+)
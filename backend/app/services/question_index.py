@@ -0,0 +1,135 @@
+import bisect
+import itertools
+import json
+import random
+import re
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence
+
+from app.services.fast_json import dumps
+
+# Fields only the grader uses; clients never see them
+GRADER_ONLY_FIELDS = frozenset({"test_cases", "compare", "entry_point"})
+
+def public_question(question: Dict[str, Any]) -> Dict[str, Any]:
+    """The question as clients see it: no hidden tests or grading options"""
+    return {key: value for key, value in question.items() if key not in GRADER_ONLY_FIELDS}
+
+def normalize_tag(tag: str) -> str:
+    """Case/separator-insensitive tag key: "Hash Table", "hash-table" and "hash_table" match"""
+    return re.sub(r"[\s_-]+", " ", tag).strip().lower()
+
+class _Bucket:
+    """Question ids with cumulative weights for O(log n) weighted sampling"""
+
+    __slots__ = ("ids", "members", "cumulative", "total")
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.members: set = set()
+        self.cumulative: List[float] = []
+        self.total = 0.0
+
+    def add(self, question_id: str, weight: float) -> None:
+        self.ids.append(question_id)
+        self.members.add(question_id)
+        self.total += weight
+        self.cumulative.append(self.total)
+
+    def sample(self, rng: random.Random) -> str:
+        index = bisect.bisect_right(self.cumulative, rng.random() * self.total)
+        return self.ids[min(index, len(self.ids) - 1)]
+
+class QuestionIndex:
+    """In-memory question bank with (difficulty, tag) postings built once at startup"""
+
+    # Random draws to try before falling back to filtering when most ids are excluded
+    REJECTION_ATTEMPTS = 8
+
+    def __init__(self):
+        self.questions: Dict[str, Dict[str, Any]] = {}
+        self._weights: Dict[str, float] = {}
+        self._by_difficulty: Dict[str, _Bucket] = {}
+        self._by_tag: Dict[tuple, _Bucket] = {}
+        self._encoded: Dict[str, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def add(self, question: Dict[str, Any]) -> None:
+        question_id = question["id"]
+        if question_id in self.questions:
+            return
+        difficulty = question.get("difficulty", "medium")
+        weight = float(question.get("weight", 1.0))
+
+        self.questions[question_id] = question
+        self._weights[question_id] = weight
+        self._by_difficulty.setdefault(difficulty, _Bucket()).add(question_id, weight)
+        for tag in {normalize_tag(tag) for tag in question.get("tags", [])}:
+            self._by_tag.setdefault((difficulty, tag), _Bucket()).add(question_id, weight)
+
+    def load(self, questions: Iterable[Dict[str, Any]]) -> None:
+        for question in questions:
+            self.add(question)
+
+    def load_file(self, path: str) -> None:
+        """Load a JSON bank: either a list of questions or {difficulty: [questions]}"""
+        with open(path) as f:
+            bank = json.load(f)
+        if isinstance(bank, dict):
+            bank = itertools.chain.from_iterable(bank.values())
+        self.load(bank)
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        return self.questions.get(question_id)
+
+    def encoded(self, question_id: str) -> bytes:
+        """The public question as JSON bytes, encoded on first use (questions don't change once loaded)"""
+        body = self._encoded.get(question_id)
+        if body is None:
+            body = self._encoded[question_id] = dumps(public_question(self.questions[question_id]))
+        return body
+
+    def has_difficulty(self, difficulty: str) -> bool:
+        return difficulty in self._by_difficulty
+
+    def select(
+        self,
+        difficulty: str,
+        tags: Sequence[str] = (),
+        exclude: Collection[str] = (),
+        rng: random.Random = random
+    ) -> Optional[Dict[str, Any]]:
+        """Weighted random question of this difficulty carrying every tag, skipping excluded ids"""
+        if tags:
+            buckets = [self._by_tag.get((difficulty, normalize_tag(tag))) for tag in tags]
+            if any(bucket is None for bucket in buckets):
+                return None
+        else:
+            bucket = self._by_difficulty.get(difficulty)
+            buckets = [bucket] if bucket is not None else []
+        if not buckets:
+            return None
+
+        if len(buckets) == 1:
+            bucket = buckets[0]
+            for _ in range(self.REJECTION_ATTEMPTS):
+                question_id = bucket.sample(rng)
+                if question_id not in exclude:
+                    return self.questions[question_id]
+            candidates = [qid for qid in bucket.ids if qid not in exclude]
+        else:
+            # Intersect smallest-first so each step iterates the fewest ids
+            buckets.sort(key=lambda b: len(b.ids))
+            matches = buckets[0].members.intersection(*(b.members for b in buckets[1:]))
+            if exclude:
+                matches.difference_update(exclude)
+            candidates = sorted(matches)
+
+        if not candidates:
+            return None
+        weights = [self._weights[qid] for qid in candidates]
+        return self.questions[rng.choices(candidates, weights=weights)[0]]
+
+# Initialize the index (populated at app startup)
+question_index = QuestionIndex()
@@ -0,0 +1,201 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services.ai_service import ai_service
+from app.services.llm_scheduler import BACKGROUND
+from app.services.metrics import metrics
+
+PoolKey = Tuple[str, Optional[str]]
+
+class QuestionPool:
+    """Per-(difficulty, topic) queues of pre-generated questions kept topped up in the background
+
+    Difficulty-only pools are always kept at target_depth. A topic pool is
+    created by the first request for it, is stocked only as deep as it has
+    been drawn from (so a one-off topic costs one generation, not a full
+    pool), and is dropped once nobody has drawn from it for key_idle_seconds.
+    """
+
+    def __init__(
+        self,
+        generator: Callable[[str, Optional[str]], Awaitable[Dict[str, Any]]],
+        target_depth: int = 5,
+        refills_per_minute: float = 30,
+        max_keys: int = 50,
+        key_idle_seconds: float = 1800,
+        difficulties: Tuple[str, ...] = ("easy", "medium", "hard")
+    ):
+        self.generator = generator
+        self.target_depth = target_depth
+        self.min_refill_interval = 60.0 / refills_per_minute if refills_per_minute > 0 else 0.0
+        self.max_keys = max_keys
+        self.key_idle_seconds = key_idle_seconds
+        self._pools: Dict[PoolKey, Deque[Dict[str, Any]]] = {
+            (difficulty, None): deque() for difficulty in difficulties
+        }
+        # Topic pools only: when each was last drawn from, and how many times
+        self._last_pop: Dict[PoolKey, float] = {}
+        self._demand: Dict[PoolKey, int] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._last_refill_started = 0.0
+        self._backoff = 0.0
+
+        self.pops = 0
+        self.fallbacks = 0
+        self.refills = 0
+        self.refill_errors = 0
+        self.evictions = 0
+        self.refill_seconds_total = 0.0
+        self.refill_seconds_max = 0.0
+        self.last_refill_seconds = 0.0
+
+    @staticmethod
+    def make_key(difficulty: str, topic: Optional[str]) -> PoolKey:
+        return (difficulty, (topic.strip().lower() or None) if topic else None)
+
+    def pop(self, difficulty: str, topic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Take a ready question in O(1); None means the caller should fall back"""
+        key = self.make_key(difficulty, topic)
+        pool = self._pools.get(key)
+        if pool is None:
+            if len(self._pools) >= self.max_keys:
+                self._evict_idle()
+            if len(self._pools) < self.max_keys:
+                pool = self._pools[key] = deque()
+        if pool is not None and key[1] is not None:
+            self._last_pop[key] = time.monotonic()
+            self._demand[key] = self._demand.get(key, 0) + 1
+
+        if pool:
+            self.pops += 1
+            question = pool.popleft()
+        else:
+            self.fallbacks += 1
+            question = None
+
+        if pool is not None and len(pool) < self._target(key):
+            self._wakeup.set()
+        return question
+
+    def _target(self, key: PoolKey) -> int:
+        if key[1] is None:
+            return self.target_depth
+        return min(self.target_depth, self._demand.get(key, 0))
+
+    def _evict_idle(self) -> None:
+        """Drop topic pools nobody has drawn from in key_idle_seconds"""
+        cutoff = time.monotonic() - self.key_idle_seconds
+        for key in [key for key, last_pop in self._last_pop.items() if last_pop < cutoff]:
+            del self._pools[key], self._last_pop[key], self._demand[key]
+            self.evictions += 1
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refill_loop())
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _most_depleted(self) -> Optional[PoolKey]:
+        self._evict_idle()
+        short = [(key, pool) for key, pool in self._pools.items() if len(pool) < self._target(key)]
+        return min(short, key=lambda item: len(item[1]))[0] if short else None
+
+    async def _refill_loop(self) -> None:
+        while True:
+            key = self._most_depleted()
+            if key is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Space out upstream calls so background refills never eat the whole rate limit
+            wait = self._last_refill_started + self.min_refill_interval + self._backoff - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_refill_started = time.monotonic()
+
+            await self._refill_one(key)
+
+    async def _refill_one(self, key: PoolKey) -> None:
+        difficulty, topic = key
+        started = time.perf_counter()
+        try:
+            question = await self.generator(difficulty, topic)
+        except Exception as e:
+            print(f"Error refilling question pool {key}: {e}")
+            question = None
+        elapsed = time.perf_counter() - started
+
+        if question is None or question.get("ai_fallback"):
+            self.refill_errors += 1
+            self._backoff = min(max(self._backoff * 2, 1.0), 60.0)
+            return
+
+        self._backoff = 0.0
+        self.refills += 1
+        self.refill_seconds_total += elapsed
+        self.refill_seconds_max = max(self.refill_seconds_max, elapsed)
+        self.last_refill_seconds = elapsed
+        pool = self._pools.get(key)
+        if pool is not None:  # Not evicted while the question was being generated
+            pool.append(question)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "target_depth": self.target_depth,
+            "depth": {
+                f"{difficulty}:{topic or '*'}": len(pool)
+                for (difficulty, topic), pool in self._pools.items()
+            },
+            "pops": self.pops,
+            "fallbacks": self.fallbacks,
+            "refills": self.refills,
+            "refill_errors": self.refill_errors,
+            "evictions": self.evictions,
+            "refill_latency_seconds": {
+                "last": round(self.last_refill_seconds, 3),
+                "avg": round(self.refill_seconds_total / self.refills, 3) if self.refills else 0.0,
+                "max": round(self.refill_seconds_max, 3)
+            },
+            "running": self._task is not None and not self._task.done()
+        }
+
+# Initialize the pool
+question_pool = QuestionPool(
+    # Pre-generation yields to interactive calls and may wait longer for a slot
+    generator=lambda difficulty, topic: ai_service.generate_coding_question_with_ai(difficulty, topic, BACKGROUND),
+    target_depth=settings.QUESTION_POOL_TARGET_DEPTH,
+    refills_per_minute=settings.QUESTION_POOL_REFILLS_PER_MINUTE,
+    max_keys=settings.QUESTION_POOL_MAX_KEYS,
+    key_idle_seconds=settings.QUESTION_POOL_KEY_IDLE_SECONDS
+)
+metrics.callback_gauge(
+    "question_pool_depth", "Pre-generated questions ready per pool", ("difficulty", "topic"),
+    lambda: (((difficulty, topic or "*"), len(pool)) for (difficulty, topic), pool in list(question_pool._pools.items()))
+)
+metrics.callback_counter(
+    "question_pool_events_total", "Question pool pops, fallbacks, refills, refill errors and evictions", ("event",),
+    lambda: [
+        (("pop",), question_pool.pops),
+        (("fallback",), question_pool.fallbacks),
+        (("refill",), question_pool.refills),
+        (("refill_error",), question_pool.refill_errors),
+        (("eviction",), question_pool.evictions)
+    ]
+)
+metrics.callback_counter(
+    "question_pool_refill_seconds_total", "Time spent generating questions that were added to a pool", (),
+    lambda: [((), question_pool.refill_seconds_total)]
+)
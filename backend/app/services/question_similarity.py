@@ -0,0 +1,179 @@
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.config import settings
+
+_WORD = re.compile(r"[a-z0-9]+")
+_EMPTY = 1 << 32
+# Offset added per step when an empty bin borrows a neighbour's value (odd, ~2^32 / golden ratio)
+_DENSIFY_STEP = 0x9E3779B1
+
+def question_text(question: Dict[str, Any]) -> str:
+    return f"{question.get('title', '')} {question.get('description', '')}"
+
+class QuestionSimilarityIndex:
+    """MinHash/LSH index of question title + description shingles for near-duplicate checks
+
+    Signatures use one-permutation hashing: each word shingle is hashed once
+    and kept as the minimum of one of `num_bins` bins (empty bins borrow from
+    their neighbour), so a signature costs one pass over the text instead of
+    one per hash function. Bins are grouped into `bands`; questions sharing
+    any band are candidates, and a candidate is a near-duplicate when the
+    fraction of equal bins (an estimate of shingle Jaccard similarity)
+    reaches `threshold`. A check touches only the matching buckets, never the
+    whole bank; buckets grown past `max_bucket_size` (bands made entirely of
+    boilerplate shingles such as "given an array of integers") are skipped
+    like stop words, since true near-duplicates also agree on other bands.
+
+    Shingles are hashed with Python's per-process string hash, so the index
+    lives in memory and is rebuilt at start-up, like the question index.
+    """
+
+    def __init__(
+        self,
+        num_bins: int = 64,
+        bands: int = 16,
+        shingle_size: int = 3,
+        threshold: float = 0.5,
+        max_bucket_size: int = 50
+    ):
+        if num_bins & (num_bins - 1) or num_bins % bands:
+            raise ValueError("num_bins must be a power of two divisible by bands")
+        self.num_bins = num_bins
+        self.bands = bands
+        self.rows = num_bins // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.max_bucket_size = max_bucket_size
+        self._mask = num_bins - 1
+        self._shift = num_bins.bit_length() - 1
+
+        self._lock = threading.Lock()
+        # Slot i holds question i: its id/title, signature bins and, per band, the previous slot in its bucket
+        self._entries: List[Tuple[str, str]] = []
+        self._signatures = array("I")
+        self._buckets: List[Dict[int, int]] = [{} for _ in range(bands)]
+        self._chains = [array("l") for _ in range(bands)]
+
+        self.checks = 0
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> Optional[List[int]]:
+        """One-permutation MinHash of the text's word shingles; None if it has no words"""
+        words = _WORD.findall(text.lower())
+        if not words:
+            return None
+        k = min(self.shingle_size, len(words))
+        bins = [_EMPTY] * self.num_bins
+        mask, shift = self._mask, self._shift
+        for shingle in zip(*(words[i:] for i in range(k))):
+            h = hash(shingle) & 0xFFFFFFFFFFFFFFFF
+            value = (h >> shift) & 0xFFFFFFFF
+            if value < bins[h & mask]:
+                bins[h & mask] = value
+
+        # Densify: an empty bin takes the nearest non-empty bin to its right
+        # (wrapping around), offset by the distance so borrowed values stay distinct
+        if _EMPTY in bins:
+            n = self.num_bins
+            last = max(i for i in range(n) if bins[i] != _EMPTY)
+            source, distance = bins[last], 0
+            for step in range(1, n):
+                i = (last - step) % n
+                if bins[i] == _EMPTY:
+                    distance += 1
+                    bins[i] = (source + distance * _DENSIFY_STEP) & 0xFFFFFFFF
+                else:
+                    source, distance = bins[i], 0
+        return bins
+
+    def _band_keys(self, signature: Sequence[int]) -> List[int]:
+        rows = self.rows
+        return [hash(tuple(signature[b * rows:(b + 1) * rows])) for b in range(self.bands)]
+
+    def _best_match(self, signature: Sequence[int], keys: Sequence[int]) -> Optional[Tuple[str, str, float]]:
+        candidates = set()
+        for bucket, chain, key in zip(self._buckets, self._chains, keys):
+            slot = bucket.get(key, -1)
+            members = []
+            while slot != -1 and len(members) <= self.max_bucket_size:
+                members.append(slot)
+                slot = chain[slot]
+            if len(members) <= self.max_bucket_size:
+                candidates.update(members)
+
+        best, best_similarity = -1, 0.0
+        n = self.num_bins
+        for slot in candidates:
+            stored = self._signatures[slot * n:(slot + 1) * n]
+            similarity = sum(a == b for a, b in zip(signature, stored)) / n
+            if similarity > best_similarity:
+                best, best_similarity = slot, similarity
+        if best == -1 or best_similarity < self.threshold:
+            return None
+        question_id, title = self._entries[best]
+        return question_id, title, best_similarity
+
+    def _insert(self, question_id: str, title: str, signature: Sequence[int], keys: Sequence[int]) -> None:
+        slot = len(self._entries)
+        self._entries.append((question_id, title))
+        self._signatures.extend(signature)
+        for bucket, chain, key in zip(self._buckets, self._chains, keys):
+            chain.append(bucket.get(key, -1))
+            bucket[key] = slot
+
+    def find(self, question: Dict[str, Any]) -> Optional[Tuple[str, str, float]]:
+        """(id, title, estimated similarity) of the closest indexed near-duplicate, or None"""
+        signature = self.signature(question_text(question))
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+        with self._lock:
+            return self._best_match(signature, keys)
+
+    def add(self, question: Dict[str, Any]) -> None:
+        signature = self.signature(question_text(question))
+        if signature is None:
+            return
+        keys = self._band_keys(signature)
+        with self._lock:
+            self._insert(str(question.get("id", "")), question.get("title", ""), signature, keys)
+
+    def add_many(self, questions: Iterable[Dict[str, Any]]) -> None:
+        for question in questions:
+            self.add(question)
+
+    def add_if_new(self, question: Dict[str, Any]) -> Optional[Tuple[str, str, float]]:
+        """Index the question unless it near-duplicates one already indexed; returns that match"""
+        signature = self.signature(question_text(question))
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+        with self._lock:
+            self.checks += 1
+            match = self._best_match(signature, keys)
+            if match is not None:
+                self.rejected += 1
+                return match
+            self._insert(str(question.get("id", "")), question.get("title", ""), signature, keys)
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "questions": len(self._entries),
+            "checks": self.checks,
+            "rejected": self.rejected,
+            "threshold": self.threshold
+        }
+
+# Initialize the index (bank questions are added at app startup, generated ones as they arrive)
+question_similarity = QuestionSimilarityIndex(
+    num_bins=settings.QUESTION_SIMILARITY_BINS,
+    bands=settings.QUESTION_SIMILARITY_BANDS,
+    threshold=settings.QUESTION_SIMILARITY_THRESHOLD
+)
@@ -0,0 +1,95 @@
+import ctypes
+import errno
+import os
+import platform
+import struct
+from typing import Dict, Tuple
+
+# Syscalls a submission's child may never make: running programs, new processes
+# or threads, opening or changing files, the network, signalling or tracing
+# other processes, and changing identity. Each fails with EPERM.
+_DENIED_SYSCALLS: Dict[str, Tuple[int, Tuple[int, ...]]] = {
+    # machine: (AUDIT_ARCH_*, syscall numbers)
+    "x86_64": (0xC000003E, (
+        2, 257, 437, 85,                   # open, openat, openat2, creat
+        59, 322,                           # execve, execveat
+        56, 57, 58, 435,                   # clone, fork, vfork, clone3
+        41, 42, 43, 49, 50, 288, 53,       # socket, connect, accept, bind, listen, accept4, socketpair
+        62, 200, 234, 101, 310, 311,       # kill, tkill, tgkill, ptrace, process_vm_readv/writev
+        76, 82, 83, 84, 86, 87, 88, 90,    # truncate, rename, mkdir, rmdir, link, unlink, symlink, chmod
+        258, 263, 264, 265, 266, 268, 316, # mkdirat, unlinkat, renameat, linkat, symlinkat, fchmodat, renameat2
+        165, 166, 105, 106, 117, 119,      # mount, umount2, setuid, setgid, setresuid, setresgid
+    )),
+    "aarch64": (0xC00000B7, (
+        56, 437,                           # openat, openat2
+        221, 281,                          # execve, execveat
+        220, 435,                          # clone, clone3
+        198, 199, 200, 201, 202, 203, 242, # socket, socketpair, bind, listen, accept, connect, accept4
+        129, 130, 131, 117, 270, 271,      # kill, tkill, tgkill, ptrace, process_vm_readv/writev
+        45, 34, 35, 36, 37, 38, 53, 276,   # truncate, mkdirat, unlinkat, symlinkat, linkat, renameat, fchmodat, renameat2
+        40, 39, 146, 144, 147, 149,        # mount, umount2, setuid, setgid, setresuid, setresgid
+    )),
+}
+
+# Classic BPF opcodes and seccomp constants (linux/filter.h, linux/seccomp.h)
+_LD_W_ABS = 0x20
+_JEQ_K = 0x15
+_JGE_K = 0x35
+_RET_K = 0x06
+_SECCOMP_RET_KILL_PROCESS = 0x80000000
+_SECCOMP_RET_ERRNO = 0x00050000
+_SECCOMP_RET_ALLOW = 0x7FFF0000
+_PR_SET_NO_NEW_PRIVS = 38
+_PR_SET_SECCOMP = 22
+_SECCOMP_MODE_FILTER = 2
+_X32_SYSCALL_BIT = 0x40000000
+
+class SandboxError(Exception):
+    pass
+
+def _instruction(code: int, k: int, jt: int = 0, jf: int = 0) -> bytes:
+    return struct.pack("HBBI", code, jt, jf, k)
+
+def _filter_program(audit_arch: int, denied: Tuple[int, ...]) -> bytes:
+    # seccomp_data: nr at offset 0, arch at offset 4
+    program = [
+        _instruction(_LD_W_ABS, 4),
+        _instruction(_JEQ_K, audit_arch, jt=1),
+        _instruction(_RET_K, _SECCOMP_RET_KILL_PROCESS),
+        _instruction(_LD_W_ABS, 0),
+        # x32 syscalls on x86_64 would dodge the numbers below
+        _instruction(_JGE_K, _X32_SYSCALL_BIT, jt=len(denied) + 1),
+    ]
+    for index, number in enumerate(denied):
+        # Match jumps to the EPERM return right after the ALLOW
+        program.append(_instruction(_JEQ_K, number, jt=len(denied) - index))
+    program.append(_instruction(_RET_K, _SECCOMP_RET_ALLOW))
+    program.append(_instruction(_RET_K, _SECCOMP_RET_ERRNO | errno.EPERM))
+    return b"".join(program)
+
+def install_syscall_filter() -> None:
+    """Install the seccomp filter for this process and its future children; irreversible"""
+    machine = platform.machine()
+    if os.uname().sysname != "Linux" or machine not in _DENIED_SYSCALLS:
+        raise SandboxError(f"seccomp filtering is not supported on {os.uname().sysname}/{machine}")
+    audit_arch, denied = _DENIED_SYSCALLS[machine]
+    program = _filter_program(audit_arch, denied)
+
+    class SockFprog(ctypes.Structure):
+        _fields_ = [("len", ctypes.c_ushort), ("filter", ctypes.c_char_p)]
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    prog = SockFprog(len(program) // 8, program)
+    if libc.prctl(_PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0 \
+            or libc.prctl(_PR_SET_SECCOMP, _SECCOMP_MODE_FILTER, ctypes.byref(prog), 0, 0) != 0:
+        raise SandboxError(f"seccomp filter not installed: {os.strerror(ctypes.get_errno())}")
+
+def drop_privileges(uid: int, gid: int) -> None:
+    """Switch a root process to an unprivileged uid/gid for good; no-op when not root"""
+    if os.geteuid() != 0:
+        return
+    os.setgroups([])
+    os.setresgid(gid, gid, gid)
+    os.setresuid(uid, uid, uid)
+    if os.geteuid() == 0 or os.getegid() == 0:
+        raise SandboxError("could not drop root privileges")
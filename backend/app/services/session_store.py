@@ -0,0 +1,392 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.services.sqlite_state import SharedDB, shared_db
+
+ACTIVE = "active"
+COMPLETED = "completed"
+
+def now_ms() -> int:
+    return int(time.time() * 1000)
+
+class SessionRecord:
+    """Compact internal session: slots, interned strings and epoch-millisecond ints"""
+
+    __slots__ = (
+        "session_type", "difficulty", "duration", "topic", "enable_hints", "status",
+        "start_ms", "end_ms", "last_seen_ms", "duration_minutes", "questions_attempted",
+        "seen_questions"
+    )
+
+    def __init__(self, session_type: str, difficulty: str, duration: int, topic: Optional[str],
+                 enable_hints: bool, start_ms: Optional[int] = None):
+        self.session_type = sys.intern(session_type)
+        self.difficulty = sys.intern(difficulty)
+        self.duration = duration
+        self.topic = sys.intern(topic) if topic else None
+        self.enable_hints = enable_hints
+        self.status = ACTIVE
+        self.start_ms = start_ms if start_ms is not None else now_ms()
+        self.end_ms: Optional[int] = None
+        self.last_seen_ms = self.start_ms
+        self.duration_minutes: Optional[int] = None
+        self.questions_attempted = 0
+        self.seen_questions: Optional[set] = None  # allocated on first question served
+
+    def mark_seen(self, question_id: str) -> None:
+        if self.seen_questions is None:
+            self.seen_questions = set()
+        self.seen_questions.add(question_id)
+
+    def complete(self, end_ms: int) -> None:
+        self.status = COMPLETED
+        self.end_ms = end_ms
+        self.duration_minutes = (end_ms - self.start_ms) // 60000
+
+class SessionStore:
+    """Bounded session store with idle-TTL auto-completion and retention-based eviction
+
+    Active and completed sessions live in two insertion-ordered dicts, kept
+    oldest-activity-first, so the sweeper only ever looks at records that
+    are actually due and eviction under the size cap is O(1). The public
+    methods are coroutines so the SQLite backend can run its queries off the
+    event loop; here the work is O(1) and runs inline.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 100000,
+        idle_ttl_seconds: float = 7200,
+        retention_seconds: float = 86400,
+        sweep_interval_seconds: float = 60,
+        on_expire: Optional[Callable[[SessionRecord], Awaitable[None]]] = None
+    ):
+        self.max_sessions = max_sessions
+        self.idle_ttl_ms = int(idle_ttl_seconds * 1000)
+        self.retention_ms = int(retention_seconds * 1000)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.on_expire = on_expire
+
+        self._active: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._completed: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._active) + len(self._completed)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._active or session_id in self._completed
+
+    async def _run(self, method: Callable[..., Any], *args) -> Any:
+        return method(*args)
+
+    async def add(self, session_id: str, record: SessionRecord) -> None:
+        await self._run(self._add, session_id, record)
+
+    async def peek(self, session_id: str) -> Optional[SessionRecord]:
+        """Look up a session without counting it as activity"""
+        return await self._run(self._peek, session_id)
+
+    async def get(self, session_id: str) -> Optional[SessionRecord]:
+        """Look up a session and mark an active one as recently used"""
+        return await self._run(self._get, session_id)
+
+    async def complete(self, session_id: str, end_ms: Optional[int] = None) -> Optional[SessionRecord]:
+        """Mark an active session completed; returns None if it wasn't active"""
+        return await self._run(self._complete, session_id, end_ms)
+
+    async def mark_seen(self, session_id: str, question_id: str) -> None:
+        await self._run(self._mark_seen, session_id, question_id)
+
+    async def sweep(self, current_ms: Optional[int] = None) -> int:
+        """Auto-complete idle sessions and drop completed ones past retention"""
+        expired = await self._run(self._sweep, current_ms)
+        if self.on_expire:
+            for record in expired:
+                await self.on_expire(record)
+        return len(expired)
+
+    def _add(self, session_id: str, record: SessionRecord) -> None:
+        self._active[session_id] = record
+        while len(self) > self.max_sessions:
+            # Drop finished sessions first, then the longest-idle active one
+            victims = self._completed if self._completed else self._active
+            victims.popitem(last=False)
+            self.evicted += 1
+
+    def _peek(self, session_id: str) -> Optional[SessionRecord]:
+        record = self._active.get(session_id)
+        return record if record is not None else self._completed.get(session_id)
+
+    def _get(self, session_id: str) -> Optional[SessionRecord]:
+        record = self._active.get(session_id)
+        if record is not None:
+            record.last_seen_ms = now_ms()
+            self._active.move_to_end(session_id)
+            return record
+        return self._completed.get(session_id)
+
+    def _complete(self, session_id: str, end_ms: Optional[int] = None) -> Optional[SessionRecord]:
+        record = self._active.pop(session_id, None)
+        if record is None:
+            return None
+        completed_ms = now_ms()
+        record.complete(end_ms if end_ms is not None else completed_ms)
+        # Retention counts from completion, which keeps _completed in time order
+        record.last_seen_ms = completed_ms
+        self._completed[session_id] = record
+        return record
+
+    def _mark_seen(self, session_id: str, question_id: str) -> None:
+        record = self._peek(session_id)
+        if record is not None:
+            record.mark_seen(question_id)
+
+    def items(self) -> Iterator[Tuple[str, SessionRecord]]:
+        yield from self._completed.items()
+        yield from self._active.items()
+
+    def _sweep(self, current_ms: Optional[int] = None) -> List[SessionRecord]:
+        """The sessions auto-completed by this sweep, for on_expire"""
+        current_ms = current_ms if current_ms is not None else now_ms()
+        expired = []
+
+        idle_cutoff = current_ms - self.idle_ttl_ms
+        while self._active:
+            session_id, record = next(iter(self._active.items()))
+            if record.last_seen_ms > idle_cutoff:
+                break
+            # An abandoned session ends at its last sign of life, not at sweep time
+            self._complete(session_id, end_ms=record.last_seen_ms)
+            self.expired += 1
+            expired.append(record)
+
+        retention_cutoff = current_ms - self.retention_ms
+        while self._completed:
+            session_id, record = next(iter(self._completed.items()))
+            if record.last_seen_ms > retention_cutoff:
+                break
+            del self._completed[session_id]
+            self.evicted += 1
+
+        return expired
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            await self.sweep()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "active": len(self._active),
+            "completed": len(self._completed),
+            "max_sessions": self.max_sessions,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+_COLUMNS = (
+    "id, session_type, difficulty, duration, topic, enable_hints, status, "
+    "start_ms, end_ms, last_seen_ms, duration_minutes, questions_attempted, seen_questions"
+)
+
+def _from_row(row: tuple) -> Tuple[str, SessionRecord]:
+    (session_id, session_type, difficulty, duration, topic, enable_hints, status,
+     start_ms, end_ms, last_seen_ms, duration_minutes, questions_attempted, seen_questions) = row
+    record = SessionRecord(session_type, difficulty, duration, topic, bool(enable_hints), start_ms=start_ms)
+    record.status = status
+    record.end_ms = end_ms
+    record.last_seen_ms = last_seen_ms
+    record.duration_minutes = duration_minutes
+    record.questions_attempted = questions_attempted
+    record.seen_questions = set(json.loads(seen_questions)) if seen_questions else None
+    return session_id, record
+
+class SQLiteSessionStore(SessionStore):
+    """SessionStore kept in the shared SQLite-WAL state database, so every worker process sees every session
+
+    Queries run in a worker thread, never on the event loop. Each state change
+    is one conditional UPDATE ... RETURNING: when two workers race to end or
+    expire the same session, exactly one of them gets the record back (and
+    counts it in user stats). Reads are plain SELECTs; the last-seen time they
+    bump is held in memory and written back in one batch every
+    touch_flush_seconds (and before each sweep), so lookups never take the
+    database's write lock. Records returned are snapshots; change them through
+    the store. The size cap is enforced by the sweeper.
+    """
+
+    def __init__(self, db: SharedDB, touch_flush_seconds: float = 5, **kwargs):
+        super().__init__(**kwargs)
+        self.db = db
+        self.touch_flush_seconds = touch_flush_seconds
+        # session id -> last-seen ms not yet written back
+        self._touches: Dict[str, int] = {}
+        self._touches_lock = threading.Lock()
+
+    def create_tables(self) -> None:
+        with self.db.transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "id TEXT PRIMARY KEY, session_type TEXT NOT NULL, difficulty TEXT NOT NULL, "
+                "duration INTEGER NOT NULL, topic TEXT, enable_hints INTEGER NOT NULL, status TEXT NOT NULL, "
+                "start_ms INTEGER NOT NULL, end_ms INTEGER, last_seen_ms INTEGER NOT NULL, "
+                "duration_minutes INTEGER, questions_attempted INTEGER NOT NULL DEFAULT 0, seen_questions TEXT)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS ix_sessions_status_last_seen ON sessions (status, last_seen_ms)"
+            )
+
+    def __len__(self) -> int:
+        return self.db.query("SELECT COUNT(*) FROM sessions")[0][0]
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(self.db.query("SELECT 1 FROM sessions WHERE id = ?", (session_id,)))
+
+    async def _run(self, method: Callable[..., Any], *args) -> Any:
+        return await asyncio.to_thread(method, *args)
+
+    def _add(self, session_id: str, record: SessionRecord) -> None:
+        self.db.query(
+            f"INSERT INTO sessions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (session_id, record.session_type, record.difficulty, record.duration, record.topic,
+             int(record.enable_hints), record.status, record.start_ms, record.end_ms, record.last_seen_ms,
+             record.duration_minutes, record.questions_attempted,
+             json.dumps(sorted(record.seen_questions)) if record.seen_questions else None)
+        )
+
+    def _peek(self, session_id: str) -> Optional[SessionRecord]:
+        rows = self.db.query(f"SELECT {_COLUMNS} FROM sessions WHERE id = ?", (session_id,))
+        return _from_row(rows[0])[1] if rows else None
+
+    def _get(self, session_id: str) -> Optional[SessionRecord]:
+        record = self._peek(session_id)
+        if record is not None and record.status == ACTIVE:
+            with self._touches_lock:
+                record.last_seen_ms = self._touches[session_id] = now_ms()
+        return record
+
+    def _flush_touches(self) -> None:
+        """Write the pending last-seen times back in one transaction"""
+        with self._touches_lock:
+            touches, self._touches = self._touches, {}
+        if not touches:
+            return
+        with self.db.transaction() as connection:
+            connection.executemany(
+                "UPDATE sessions SET last_seen_ms = max(last_seen_ms, ?) WHERE id = ? AND status = ?",
+                [(seen_ms, session_id, ACTIVE) for session_id, seen_ms in touches.items()]
+            )
+
+    def _complete(self, session_id: str, end_ms: Optional[int] = None) -> Optional[SessionRecord]:
+        completed_ms = now_ms()
+        end_ms = end_ms if end_ms is not None else completed_ms
+        rows = self.db.query(
+            "UPDATE sessions SET status = ?, end_ms = ?, duration_minutes = (? - start_ms) / 60000, last_seen_ms = ? "
+            f"WHERE id = ? AND status = ? RETURNING {_COLUMNS}",
+            (COMPLETED, end_ms, end_ms, completed_ms, session_id, ACTIVE)
+        )
+        return _from_row(rows[0])[1] if rows else None
+
+    def _mark_seen(self, session_id: str, question_id: str) -> None:
+        # Append in place so concurrent workers serving the same session don't overwrite each other
+        self.db.query(
+            "UPDATE sessions SET seen_questions = json_insert(coalesce(seen_questions, '[]'), '$[#]', ?) "
+            "WHERE id = ? AND NOT EXISTS (SELECT 1 FROM json_each(coalesce(seen_questions, '[]')) WHERE value = ?)",
+            (question_id, session_id, question_id)
+        )
+
+    def items(self) -> Iterator[Tuple[str, SessionRecord]]:
+        rows = self.db.query(f"SELECT {_COLUMNS} FROM sessions ORDER BY status = ?, last_seen_ms", (ACTIVE,))
+        for row in rows:
+            yield _from_row(row)
+
+    def _sweep(self, current_ms: Optional[int] = None) -> List[SessionRecord]:
+        current_ms = current_ms if current_ms is not None else now_ms()
+        # This worker's recent reads count as activity before anything is judged idle
+        self._flush_touches()
+        expired = self.db.query(
+            "UPDATE sessions SET status = ?, end_ms = last_seen_ms, "
+            "duration_minutes = (last_seen_ms - start_ms) / 60000, last_seen_ms = ? "
+            f"WHERE status = ? AND last_seen_ms <= ? RETURNING {_COLUMNS}",
+            (COMPLETED, current_ms, ACTIVE, current_ms - self.idle_ttl_ms)
+        )
+        self.expired += len(expired)
+
+        evicted = self.db.query(
+            "DELETE FROM sessions WHERE status = ? AND last_seen_ms <= ? RETURNING id",
+            (COMPLETED, current_ms - self.retention_ms)
+        )
+        # Over the cap: finished sessions first, then the longest-idle active ones
+        evicted += self.db.query(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY status = ?, last_seen_ms "
+            "LIMIT max(0, (SELECT COUNT(*) FROM sessions) - ?)) RETURNING id",
+            (ACTIVE, self.max_sessions)
+        )
+        self.evicted += len(evicted)
+        return [_from_row(row)[1] for row in expired]
+
+    async def _sweep_loop(self) -> None:
+        since_sweep = 0.0
+        while True:
+            await asyncio.sleep(self.touch_flush_seconds)
+            since_sweep += self.touch_flush_seconds
+            if since_sweep >= self.sweep_interval_seconds:
+                since_sweep = 0.0
+                await self.sweep()
+            else:
+                await self._run(self._flush_touches)
+
+    async def start(self) -> None:
+        await self._run(self.create_tables)
+        await super().start()
+
+    async def stop(self) -> None:
+        await super().stop()
+        await self._run(self._flush_touches)
+
+    def stats(self) -> Dict[str, Any]:
+        counts = dict(self.db.query("SELECT status, COUNT(*) FROM sessions GROUP BY status"))
+        return {
+            "backend": "sqlite",
+            "active": counts.get(ACTIVE, 0),
+            "completed": counts.get(COMPLETED, 0),
+            "pending_touches": len(self._touches),
+            "max_sessions": self.max_sessions,
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
+
+# Initialize the store (STATE_BACKEND=sqlite shares it between worker processes)
+_store_settings = dict(
+    max_sessions=settings.SESSION_STORE_MAX_SESSIONS,
+    idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+    retention_seconds=settings.SESSION_RETENTION_SECONDS,
+    sweep_interval_seconds=settings.SESSION_SWEEP_INTERVAL_SECONDS
+)
+if settings.STATE_BACKEND == "sqlite":
+    session_store = SQLiteSessionStore(shared_db(), settings.SESSION_TOUCH_FLUSH_SECONDS, **_store_settings)
+else:
+    session_store = SessionStore(**_store_settings)
@@ -0,0 +1,59 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from app.config import settings
+
+class SharedDB:
+    """One SQLite-WAL connection per process onto a file that every worker process opens
+
+    WAL lets readers in other workers run alongside the single writer; writes go
+    through `transaction()`, which takes the write lock up front (BEGIN IMMEDIATE)
+    so read-modify-write sequences can't interleave between processes.
+
+    Calls block (up to busy_timeout_ms while another process writes), so the
+    stores run them through asyncio.to_thread. The file is opened on first use,
+    not at import.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._connection = connection
+        return self._connection
+
+    def query(self, sql: str, parameters=()) -> list:
+        """Run one autocommitted statement and fetch its rows; a single statement is atomic on its own"""
+        with self._lock:
+            return self._connect().execute(sql, parameters).fetchall()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+_databases = {}
+
+def shared_db(path: str = "") -> SharedDB:
+    """This process's connection to the shared state database (STATE_DB_PATH by default)"""
+    path = path or settings.STATE_DB_PATH
+    if path not in _databases:
+        _databases[path] = SharedDB(path, settings.SQLITE_BUSY_TIMEOUT_MS)
+    return _databases[path]
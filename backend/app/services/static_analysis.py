@@ -0,0 +1,178 @@
+import ast
+from typing import Any, Dict, List, Optional
+
+_LOOPS = (ast.For, ast.AsyncFor, ast.While)
+_COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+_MEMO_DECORATORS = {"cache", "lru_cache", "memoize", "cached"}
+_MEMO_NAMES = ("memo", "cache", "dp")
+# Loop counters and math-style names that are fine as single letters
+_SHORT_NAMES_OK = set("ijklmnxyzabcdpqrstuvw_")
+_LONG_FUNCTION_LINES = 50
+
+# Quality penalties per finding (code_quality_score starts at 95)
+_PENALTIES = {
+    "bare_except": 10,
+    "mutable_default": 10,
+    "global_state": 8,
+    "debug_print": 5,
+    "long_function": 8,
+    "wildcard_import": 5,
+    "unclear_names": 5,
+    "unmemoized_recursion": 0,
+    "nested_loops": 0
+}
+
+def _finding(rule: str, node: Optional[ast.AST], message: str) -> Dict[str, Any]:
+    return {"rule": rule, "line": getattr(node, "lineno", None), "message": message}
+
+def loop_depth(node: ast.AST) -> int:
+    """Deepest nesting of loops/comprehension generators under node (nested defs excluded)"""
+    deepest = 0
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        depth = loop_depth(child)
+        if isinstance(child, _LOOPS):
+            depth += 1
+        elif isinstance(child, _COMPREHENSIONS):
+            depth += len(child.generators)
+        deepest = max(deepest, depth)
+    return deepest
+
+def _decorator_name(decorator: ast.AST) -> str:
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    return getattr(decorator, "id", "")
+
+def _is_memoized(function: ast.AST) -> bool:
+    if any(_decorator_name(d) in _MEMO_DECORATORS for d in function.decorator_list):
+        return True
+    names = {n.id for n in ast.walk(function) if isinstance(n, ast.Name)}
+    names |= {a.arg for a in ast.walk(function) if isinstance(a, ast.arg)}
+    names |= {n.attr for n in ast.walk(function) if isinstance(n, ast.Attribute)}
+    return any(marker in name.lower() for name in names for marker in _MEMO_NAMES)
+
+def _self_calls(function: ast.AST) -> List[ast.Call]:
+    calls = []
+    for node in ast.walk(function):
+        if not isinstance(node, ast.Call):
+            continue
+        target = node.func
+        name = target.id if isinstance(target, ast.Name) else getattr(target, "attr", None)
+        if name == function.name:
+            calls.append(node)
+    return calls
+
+def _shrinks_argument(call: ast.Call) -> bool:
+    """f(n - 1), f(i + 1), f(s[1:]): recursion over a shrinking value rather than f(node.left)"""
+    return any(isinstance(arg, (ast.BinOp, ast.Subscript)) for arg in list(call.args) + [k.value for k in call.keywords])
+
+def _functions(tree: ast.AST) -> List[ast.AST]:
+    return [n for n in ast.walk(tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+
+def _is_stub(function: ast.AST) -> bool:
+    body = [s for s in function.body if not (isinstance(s, ast.Expr) and isinstance(s.value, ast.Constant))]
+    return all(isinstance(s, ast.Pass) for s in body)
+
+def _quality_findings(tree: ast.AST) -> List[Dict[str, Any]]:
+    findings = []
+    short_names = set()
+    printed = False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ExceptHandler) and node.type is None:
+            findings.append(_finding("bare_except", node, "Bare `except:` hides real errors; catch specific exceptions"))
+        elif isinstance(node, ast.Global):
+            findings.append(_finding("global_state", node, "Avoid global state; pass values through parameters"))
+        elif isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names):
+            findings.append(_finding("wildcard_import", node, "Wildcard imports obscure where names come from"))
+        elif isinstance(node, ast.Call) and getattr(node.func, "id", None) == "print":
+            # Reported once, so a loop of prints isn't penalised per call
+            if not printed:
+                findings.append(_finding("debug_print", node, "Remove debug print statements before submitting"))
+            printed = True
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            defaults = node.args.defaults + [d for d in node.args.kw_defaults if d is not None]
+            if any(isinstance(d, (ast.List, ast.Dict, ast.Set)) for d in defaults):
+                findings.append(_finding("mutable_default", node, f"`{node.name}` has a mutable default argument"))
+            length = (node.end_lineno or node.lineno) - node.lineno + 1
+            if length > _LONG_FUNCTION_LINES:
+                findings.append(_finding("long_function", node, f"`{node.name}` is {length} lines; consider splitting it"))
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            if len(node.id) == 1 and node.id.lower() not in _SHORT_NAMES_OK:
+                short_names.add(node.id)
+
+    if len(short_names) >= 3:
+        findings.append(_finding("unclear_names", None, f"Use descriptive names instead of {', '.join(sorted(short_names))}"))
+    return findings
+
+def estimate_time_complexity(depth: int, sorts: bool, exponential: bool) -> str:
+    if exponential:
+        return "O(2ⁿ)"
+    if depth == 0:
+        return "O(n log n)" if sorts else "O(1)"
+    if depth == 1:
+        return "O(n log n)" if sorts else "O(n)"
+    return "O(n²)" if depth == 2 else f"O(n^{depth})"
+
+def time_management_score(time_taken: int, question: Dict[str, Any]) -> int:
+    limit = question.get("time_limit_minutes", 20) * 60
+    ratio = time_taken / limit if limit else 1.0
+    return int(max(40, min(100, 100 - 40 * max(0.0, ratio - 0.5))))
+
+def analyze_statically(question: Dict[str, Any], user_code: str, time_taken: int) -> Dict[str, Any]:
+    """Tier 0: millisecond AST review; `settled` says whether the score is final without running the code"""
+    findings: List[Dict[str, Any]] = []
+    time_score = time_management_score(time_taken, question)
+
+    def result(correctness: Optional[int], efficiency: int, quality: int, complexity: str, settled: bool) -> Dict[str, Any]:
+        scores = [s for s in (correctness, efficiency, quality, time_score) if s is not None]
+        return {
+            "correctness_score": correctness,
+            "efficiency_score": efficiency,
+            "code_quality_score": quality,
+            "time_management_score": time_score,
+            "overall_score": round(sum(scores) / len(scores)),
+            "time_complexity": complexity,
+            "space_complexity": "O(?)",
+            "findings": findings,
+            "settled": settled
+        }
+
+    if not user_code.strip():
+        findings.append(_finding("empty", None, "No code submitted"))
+        return result(0, 0, 0, "O(?)", settled=True)
+    try:
+        tree = ast.parse(user_code)
+    except SyntaxError as e:
+        findings.append(_finding("syntax_error", e, f"Syntax error: {e.msg} (line {e.lineno})"))
+        return result(0, 0, 20, "O(?)", settled=True)
+
+    functions = _functions(tree)
+    if not functions or all(_is_stub(f) for f in functions):
+        findings.append(_finding("incomplete", tree, "No implemented function found"))
+        return result(0, 0, 30, "O(?)", settled=True)
+
+    depth = loop_depth(tree)
+    if depth >= 2:
+        findings.append(_finding("nested_loops", None, f"Loops nested {depth} deep; look for a hash map or two-pointer pass"))
+
+    exponential = False
+    for function in functions:
+        calls = _self_calls(function)
+        if len(calls) >= 2 and any(_shrinks_argument(c) for c in calls) and not _is_memoized(function):
+            exponential = True
+            findings.append(_finding(
+                "unmemoized_recursion", function,
+                f"`{function.name}` branches recursively without memoization (exponential time); cache subproblems"
+            ))
+
+    findings.extend(_quality_findings(tree))
+    sorts = any(
+        isinstance(n, ast.Call) and (getattr(n.func, "id", None) == "sorted" or getattr(n.func, "attr", None) == "sort")
+        for n in ast.walk(tree)
+    )
+    efficiency = 40 if exponential else {0: 90, 1: 85}.get(depth, 65 if depth == 2 else 45)
+    quality = max(30, 95 - sum(_PENALTIES.get(f["rule"], 5) for f in findings))
+    return result(None, efficiency, quality, estimate_time_complexity(depth, sorts, exponential), settled=False)
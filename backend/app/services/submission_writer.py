@@ -0,0 +1,211 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.database import async_engine
+from app.models.interview import Submission
+from app.services.code_similarity import CodeSimilarityIndex, code_similarity
+from app.services.progress_rollups import ProgressRollups, progress_rollups
+
+# Queued by stop(): everything ahead of it gets written, then the writer exits
+_CLOSE = object()
+
+class SubmissionQueueFull(Exception):
+    """The write-behind queue stayed full for the whole enqueue timeout"""
+
+def submission_row(
+    submission_id: str,
+    question_id: str,
+    user_code: str,
+    time_taken_seconds: int,
+    analysis: Dict[str, Any],
+    analysis_tier: Optional[str] = None,
+    session_id: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    tags: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """A submissions table row for one graded solution"""
+    return {
+        "id": submission_id,
+        "question_id": question_id,
+        "session_id": session_id,
+        "difficulty": difficulty,
+        "tags": list(tags) if tags else None,
+        "user_code": user_code,
+        "time_taken_seconds": time_taken_seconds,
+        "analysis": analysis,
+        "analysis_tier": analysis_tier,
+        "overall_score": analysis.get("overall_score"),
+        "fingerprint_count": None,  # Filled in by the writer along with the code fingerprints
+        # Set here rather than by the database so the rollups bucket by acceptance time
+        "created_at": datetime.utcnow()
+    }
+
+class SubmissionWriter:
+    """Write-behind persistence for submissions: requests enqueue rows, one task inserts them in batches
+
+    A batch is flushed when it reaches `batch_size` rows or `flush_interval_seconds`
+    after its first row, as one transaction, so SQLite's writer lock is taken
+    once per batch instead of once per request. A full queue makes `save()`
+    wait (backpressure); `stop()` drains everything still queued. Each batch
+    is folded into the progress rollups and its code fingerprints indexed in
+    the same transaction.
+    """
+
+    def __init__(
+        self,
+        engine=async_engine,
+        rollups: Optional[ProgressRollups] = progress_rollups,
+        fingerprints: Optional[CodeSimilarityIndex] = code_similarity,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 0.1,
+        max_queue: int = 10000,
+        enqueue_timeout_seconds: float = 5,
+        drain_timeout_seconds: float = 10,
+        max_attempts: int = 3
+    ):
+        self.engine = engine
+        self.rollups = rollups
+        self.fingerprints = fingerprints
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_queue = max_queue
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self.max_attempts = max_attempts
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.written = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.dropped = 0
+        self.backpressure_waits = 0
+        self.last_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.running:
+            self._queue = asyncio.Queue(self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def save(self, row: Dict[str, Any]) -> None:
+        """Queue one submissions row; raises SubmissionQueueFull if the writer can't keep up"""
+        if not self.running:
+            # Not started (scripts, shutdown): write through
+            await self._write([row])
+            return
+        if self._queue.full():
+            self.backpressure_waits += 1
+        try:
+            await asyncio.wait_for(self._queue.put(row), self.enqueue_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise SubmissionQueueFull(f"Submission queue full ({self.max_queue} rows)")
+
+    async def _next_batch(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """Rows for one transaction, and whether stop() asked the writer to finish"""
+        batch: List[Dict[str, Any]] = []
+        row = await self._queue.get()
+        deadline = time.monotonic() + self.flush_interval_seconds
+        while row is not _CLOSE:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                return batch, False
+            if not self._queue.empty():
+                # Take whatever is already queued without yielding
+                row = self._queue.get_nowait()
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, False
+            try:
+                row = await asyncio.wait_for(self._queue.get(), remaining)
+            except asyncio.TimeoutError:
+                return batch, False
+        return batch, True
+
+    async def _write(self, rows: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        # Hash the code before taking SQLite's writer lock
+        postings = await self.fingerprints.prepare(rows) if self.fingerprints is not None else []
+        async with self.engine.begin() as connection:
+            await connection.execute(insert(Submission), rows)
+            if self.rollups is not None:
+                await self.rollups.apply(connection, rows)
+            if self.fingerprints is not None:
+                await self.fingerprints.apply(connection, postings)
+        self.last_flush_ms = (time.perf_counter() - started) * 1000
+        self.written += len(rows)
+        self.batches += 1
+
+    async def _flush(self, rows: List[Dict[str, Any]]) -> None:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await self._write(rows)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed_batches += 1
+                print(f"Error writing {len(rows)} submissions (attempt {attempt}/{self.max_attempts}): {e}")
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(0.1 * 2 ** attempt)
+        self.dropped += len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            batch, closing = await self._next_batch()
+            if batch:
+                await self._flush(batch)
+            if closing:
+                return
+
+    async def _drain(self, task: asyncio.Task, queue: asyncio.Queue) -> None:
+        await queue.put(_CLOSE)
+        await task
+
+    async def stop(self) -> None:
+        """Flush everything queued (up to drain_timeout_seconds), then stop the writer task"""
+        if self._task is None:
+            return
+        task, queue = self._task, self._queue
+        self._task = None  # New saves write through from here on
+        try:
+            await asyncio.wait_for(self._drain(task, queue), self.drain_timeout_seconds)
+        except asyncio.TimeoutError:
+            unwritten = 0
+            while not queue.empty():
+                unwritten += queue.get_nowait() is not _CLOSE
+            print(f"Submission writer drain timed out with {unwritten} rows unwritten")
+            self.dropped += unwritten
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 1) if self.batches else 0.0,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+            "backpressure_waits": self.backpressure_waits,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "running": self.running
+        }
+
+# Initialize the writer
+submission_writer = SubmissionWriter(
+    batch_size=settings.SUBMISSION_WRITER_BATCH_SIZE,
+    flush_interval_seconds=settings.SUBMISSION_WRITER_FLUSH_INTERVAL_SECONDS,
+    max_queue=settings.SUBMISSION_WRITER_MAX_QUEUE,
+    enqueue_timeout_seconds=settings.SUBMISSION_WRITER_ENQUEUE_TIMEOUT_SECONDS,
+    drain_timeout_seconds=settings.SUBMISSION_WRITER_DRAIN_TIMEOUT_SECONDS
+)
@@ -0,0 +1,215 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+from app.services.sqlite_state import SharedDB, shared_db
+
+class UserStatsAggregator:
+    """Running user statistics updated in O(1) per submission/session event
+
+    The public methods are coroutines so the SQLite backend can run its
+    queries off the event loop; here they run inline.
+    """
+
+    def __init__(self, recent_size: int = 5, passing_score: int = 70, bucket_width: int = 10):
+        self.passing_score = passing_score
+        self.bucket_width = bucket_width
+
+        self.total_attempts = 0
+        self.problems_solved = 0
+        self.score_sum = 0.0
+        self.by_difficulty: Dict[str, Dict[str, float]] = {}
+        self.histogram: List[int] = [0] * (100 // bucket_width)
+
+        self.sessions_started = 0
+        self.sessions_completed = 0
+        self.session_minutes_sum = 0
+        # Ring buffer of the most recently started session ids (oldest first)
+        self.recent_sessions: Deque[str] = deque(maxlen=recent_size)
+
+    async def start(self) -> None:
+        """Nothing to set up in memory"""
+
+    async def record_submission(self, score: float, difficulty: Optional[str] = None) -> None:
+        self._record_submission(score, difficulty)
+
+    async def record_session_start(self, session_id: str) -> None:
+        self._record_session_start(session_id)
+
+    async def record_session_end(self, duration_minutes: int) -> None:
+        self._record_session_end(duration_minutes)
+
+    async def recent_session_ids(self) -> List[str]:
+        """The most recently started session ids, oldest first"""
+        return self._recent_session_ids()
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Current aggregates; cost depends only on the number of difficulties/buckets"""
+        return self._snapshot()
+
+    def _record_submission(self, score: float, difficulty: Optional[str] = None) -> None:
+        solved = score >= self.passing_score
+        self.total_attempts += 1
+        self.problems_solved += solved
+        self.score_sum += score
+
+        bucket = self.by_difficulty.setdefault(
+            difficulty or "unknown", {"attempts": 0, "solved": 0, "score_sum": 0.0}
+        )
+        bucket["attempts"] += 1
+        bucket["solved"] += solved
+        bucket["score_sum"] += score
+
+        index = min(max(int(score) // self.bucket_width, 0), len(self.histogram) - 1)
+        self.histogram[index] += 1
+
+    def _record_session_start(self, session_id: str) -> None:
+        self.sessions_started += 1
+        self.recent_sessions.append(session_id)
+
+    def _record_session_end(self, duration_minutes: int) -> None:
+        self.sessions_completed += 1
+        self.session_minutes_sum += duration_minutes
+
+    def _recent_session_ids(self) -> List[str]:
+        return list(self.recent_sessions)
+
+    @property
+    def average_score(self) -> float:
+        return round(self.score_sum / self.total_attempts, 1) if self.total_attempts else 0
+
+    @property
+    def favorite_difficulty(self) -> str:
+        known = {d: b for d, b in self.by_difficulty.items() if d != "unknown"}
+        if not known:
+            return "medium"
+        return max(known, key=lambda d: known[d]["attempts"])
+
+    def _snapshot(self) -> Dict[str, Any]:
+        last_bucket = len(self.histogram) - 1
+        return {
+            "total_attempts": self.total_attempts,
+            "average_score": self.average_score,
+            "problems_solved": self.problems_solved,
+            "favorite_difficulty": self.favorite_difficulty,
+            "difficulty_breakdown": {
+                difficulty: {
+                    "attempts": bucket["attempts"],
+                    "solved": bucket["solved"],
+                    "average_score": round(bucket["score_sum"] / bucket["attempts"], 1)
+                }
+                for difficulty, bucket in self.by_difficulty.items()
+            },
+            "score_histogram": {
+                f"{i * self.bucket_width}-{100 if i == last_bucket else (i + 1) * self.bucket_width - 1}": count
+                for i, count in enumerate(self.histogram)
+            },
+            "sessions_started": self.sessions_started,
+            "sessions_completed": self.sessions_completed,
+            "average_session_minutes": (
+                round(self.session_minutes_sum / self.sessions_completed, 1)
+                if self.sessions_completed else 0
+            )
+        }
+
+class SQLiteUserStats:
+    """UserStatsAggregator's counters kept in the shared SQLite-WAL state database
+
+    Every event is a handful of `value = value + ?` upserts in one write
+    transaction, so increments from any number of worker processes add up
+    exactly; snapshot() rebuilds an aggregator from the counter rows. The
+    queries run in a worker thread, off the event loop.
+    """
+
+    def __init__(self, db: SharedDB, recent_size: int = 5, passing_score: int = 70, bucket_width: int = 10):
+        self.db = db
+        self.recent_size = recent_size
+        self.passing_score = passing_score
+        self.bucket_width = bucket_width
+
+    def create_tables(self) -> None:
+        with self.db.transaction() as connection:
+            # NUMERIC keeps whole-number counters as integers
+            connection.execute("CREATE TABLE IF NOT EXISTS user_stats_counters (name TEXT PRIMARY KEY, value NUMERIC NOT NULL)")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS user_stats_recent_sessions ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL)"
+            )
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self.create_tables)
+
+    async def record_submission(self, score: float, difficulty: Optional[str] = None) -> None:
+        await asyncio.to_thread(self._record_submission, score, difficulty)
+
+    async def record_session_start(self, session_id: str) -> None:
+        await asyncio.to_thread(self._record_session_start, session_id)
+
+    async def record_session_end(self, duration_minutes: int) -> None:
+        await asyncio.to_thread(self._record_session_end, duration_minutes)
+
+    async def recent_session_ids(self) -> List[str]:
+        return await asyncio.to_thread(self._recent_session_ids)
+
+    async def snapshot(self) -> Dict[str, Any]:
+        return await asyncio.to_thread(self._snapshot)
+
+    def _increment(self, connection, increments: Dict[str, float]) -> None:
+        connection.executemany(
+            "INSERT INTO user_stats_counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+            increments.items()
+        )
+
+    def _record_submission(self, score: float, difficulty: Optional[str] = None) -> None:
+        solved = int(score >= self.passing_score)
+        difficulty = difficulty or "unknown"
+        index = min(max(int(score) // self.bucket_width, 0), 100 // self.bucket_width - 1)
+        with self.db.transaction() as connection:
+            self._increment(connection, {
+                "total_attempts": 1,
+                "problems_solved": solved,
+                "score_sum": score,
+                f"difficulty:{difficulty}:attempts": 1,
+                f"difficulty:{difficulty}:solved": solved,
+                f"difficulty:{difficulty}:score_sum": score,
+                f"histogram:{index}": 1
+            })
+
+    def _record_session_start(self, session_id: str) -> None:
+        with self.db.transaction() as connection:
+            self._increment(connection, {"sessions_started": 1})
+            seq = connection.execute(
+                "INSERT INTO user_stats_recent_sessions (session_id) VALUES (?)", (session_id,)
+            ).lastrowid
+            connection.execute("DELETE FROM user_stats_recent_sessions WHERE seq <= ?", (seq - self.recent_size,))
+
+    def _record_session_end(self, duration_minutes: int) -> None:
+        with self.db.transaction() as connection:
+            self._increment(connection, {"sessions_completed": 1, "session_minutes_sum": duration_minutes})
+
+    def _recent_session_ids(self) -> List[str]:
+        rows = self.db.query(
+            "SELECT session_id FROM user_stats_recent_sessions ORDER BY seq DESC LIMIT ?", (self.recent_size,)
+        )
+        return [row[0] for row in reversed(rows)]
+
+    def _snapshot(self) -> Dict[str, Any]:
+        stats = UserStatsAggregator(self.recent_size, self.passing_score, self.bucket_width)
+        for name, value in self.db.query("SELECT name, value FROM user_stats_counters"):
+            kind, _, rest = name.partition(":")
+            if kind == "difficulty":
+                difficulty, field = rest.rsplit(":", 1)
+                stats.by_difficulty.setdefault(difficulty, {"attempts": 0, "solved": 0, "score_sum": 0.0})[field] = value
+            elif kind == "histogram":
+                stats.histogram[int(rest)] = value
+            else:
+                setattr(stats, name, value)
+        return stats._snapshot()
+
+# Initialize the aggregator (STATE_BACKEND=sqlite shares it between worker processes)
+if settings.STATE_BACKEND == "sqlite":
+    user_stats = SQLiteUserStats(shared_db())
+else:
+    user_stats = UserStatsAggregator()
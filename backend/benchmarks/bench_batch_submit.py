@@ -0,0 +1,123 @@
+"""
+Grading throughput for a cohort upload: one POST /questions/submit per
+solution (sequentially, as grader scripts do today, and with 8 client-side
+connections) versus a single POST /questions/submit/batch.
+
+Half the solutions are for a bank question (execution tier), half for an
+unbanked one (LLM tier, fake server); --duplicates of them repeat an earlier
+solution with cosmetic edits. Each mode gets fresh code so the analysis cache
+from a previous mode never answers.
+
+    python benchmarks/bench_batch_submit.py --submissions 200 --duplicates 0.3
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import httpx
+
+from bench_sse_submit import start
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+TWO_SUM = """def twoSum(nums, target):
+    seen = {{}}
+    for i, n in enumerate(nums):
+        if target - n in seen:
+            return [seen[target - n], i]
+        seen[n] = i + {variant} - {variant}
+"""
+
+UNBANKED = """def solve(nums):
+    total = {variant}
+    for n in nums:
+        total += n
+    return total
+"""
+
+
+def cohort(count: int, duplicates: float, offset: int, rng: random.Random) -> list:
+    submissions = []
+    for i in range(count):
+        if submissions and rng.random() < duplicates:
+            # Same solution, reformatted and commented: the fingerprint still matches
+            original = rng.choice(submissions)
+            code = "# resubmitted\n" + original["user_code"].replace("    ", "\t")
+            submissions.append(dict(original, user_code=code, time_taken_seconds=rng.randint(300, 1800)))
+            continue
+        template, question_id = (TWO_SUM, "two-sum") if i % 2 else (UNBANKED, "bench-unbanked")
+        submissions.append({
+            "question_id": question_id,
+            "user_code": template.format(variant=offset + i),
+            "time_taken_seconds": rng.randint(300, 1800)
+        })
+    return submissions
+
+
+def per_request(base_url: str, submissions: list, connections: int) -> float:
+    started = time.perf_counter()
+    with httpx.Client(base_url=base_url, timeout=120) as client:
+        def post(item):
+            client.post("/questions/submit", json=item).raise_for_status()
+        with ThreadPoolExecutor(connections) as pool:
+            list(pool.map(post, submissions))
+    return time.perf_counter() - started
+
+
+def batch(base_url: str, submissions: list) -> float:
+    started = time.perf_counter()
+    received = 0
+    with httpx.stream("POST", f"{base_url}/questions/submit/batch", json={"submissions": submissions}, timeout=600) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if line and "index" in json.loads(line):
+                received += 1
+    assert received == len(submissions), received
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch grading benchmark")
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--duplicates", type=float, default=0.3)
+    parser.add_argument("--latency-ms", type=float, default=1500)
+    parser.add_argument("--fake-port", type=int, default=8023)
+    parser.add_argument("--api-port", type=int, default=8024)
+    args = parser.parse_args()
+
+    fake = start([sys.executable, "benchmarks/fake_openai_server.py", "--port", str(args.fake_port),
+                  "--latency-ms", str(args.latency_ms), "--jitter-ms", "0"], args.fake_port)
+    database = Path(tempfile.mkdtemp()) / "bench.db"
+    env = dict(os.environ, OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"http://127.0.0.1:{args.fake_port}/v1",
+               DATABASE_URL=f"sqlite:///{database}", ANALYSIS_CACHE_DB_PATH="")
+    api = start([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"],
+                args.api_port, env)
+    base_url = f"http://127.0.0.1:{args.api_port}"
+    rng = random.Random(3)
+    try:
+        modes = {
+            "per-request, sequential": lambda items: per_request(base_url, items, 1),
+            "per-request, 8 connections": lambda items: per_request(base_url, items, 8),
+            "batch endpoint": lambda items: batch(base_url, items)
+        }
+        results = {}
+        for offset, (name, run) in enumerate(modes.items()):
+            items = cohort(args.submissions, args.duplicates, offset * 1_000_000, rng)
+            results[name] = run(items)
+    finally:
+        api.terminate()
+        fake.terminate()
+
+    print(f"submissions: {args.submissions}   duplicates: {args.duplicates:.0%}   LLM latency: {args.latency_ms:.0f} ms")
+    for name, elapsed in results.items():
+        print(f"{name:28s} {elapsed:7.1f} s   {args.submissions / elapsed:7.1f} submissions/s")
+
+
+if __name__ == "__main__":
+    main()
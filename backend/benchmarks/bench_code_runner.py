@@ -0,0 +1,103 @@
+"""
+Submissions/sec through the warm CodeRunner pool (a child forked from a warm
+worker per job) versus starting a fresh worker process per submission (same
+execution code, same rlimits).
+
+    python benchmarks/bench_code_runner.py --submissions 500 --workers 2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.code_runner import CodeRunner, _worker_main, build_test_cases
+
+QUESTION = {
+    "id": "two-sum",
+    "examples": [{"input": "nums = [2,7,11,15], target = 9", "output": "[0,1]"}],
+    "test_cases": [
+        {"input": "nums = [3,2,4], target = 6", "output": "[1,2]"},
+        {"input": "nums = [3,3], target = 6", "output": "[0,1]"},
+        {"input": f"nums = {list(range(2000))}, target = 3997", "output": "[1998,1999]"}
+    ],
+    "compare": "unordered"
+}
+
+SOLUTION = """
+def twoSum(nums, target):
+    seen = {}
+    for i, n in enumerate(nums):
+        if target - n in seen:
+            return [seen[target - n], i]
+        seen[n] = i
+"""
+
+
+async def run_pool(submissions: int, workers: int, concurrency: int):
+    runner = CodeRunner(workers=workers, complexity_budget_seconds=0)  # same work as the per-process baseline
+    await runner.start()
+    await runner.run(SOLUTION, QUESTION)  # warm-up
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await runner.run(SOLUTION, QUESTION)
+            latencies.append(time.perf_counter() - started)
+            assert result["passed"] == result["total"], result
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(submissions)))
+    elapsed = time.perf_counter() - started
+    await runner.stop()
+    return submissions / elapsed, statistics.median(latencies)
+
+
+def run_fork_per_submission(submissions: int):
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["app.services.code_runner"])
+    calls = [{"args": test["args"], "kwargs": test["kwargs"]} for test in build_test_cases(QUESTION)]
+    job = {"code": SOLUTION, "calls": calls, "cpu_seconds": 2, "wall_seconds": 5}
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(submissions):
+        one_started = time.perf_counter()
+        parent, child = context.Pipe()
+        process = context.Process(target=_worker_main, args=(child, 256 * 1024 * 1024))
+        process.start()
+        parent.send(job)
+        parent.recv()
+        parent.send(None)
+        process.join()
+        latencies.append(time.perf_counter() - one_started)
+    elapsed = time.perf_counter() - started
+    return submissions / elapsed, statistics.median(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Code runner throughput benchmark")
+    parser.add_argument("--submissions", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    pool_rate, pool_p50 = asyncio.run(run_pool(args.submissions, args.workers, args.concurrency))
+    fork_count = max(args.submissions // 10, 10)
+    fork_rate, fork_p50 = run_fork_per_submission(fork_count)
+
+    print(f"warm pool ({args.workers} workers): {pool_rate:8.1f} submissions/s   p50 {pool_p50 * 1000:7.1f} ms")
+    print(f"process per submission:   {fork_rate:8.1f} submissions/s   p50 {fork_p50 * 1000:7.1f} ms"
+          f"   ({fork_count} runs)")
+    print(f"speedup: {pool_rate / fork_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
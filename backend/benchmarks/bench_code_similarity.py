@@ -0,0 +1,243 @@
+"""
+Plagiarism screening: fingerprint cost, top-k lookup latency as one
+question's submissions grow to --submissions, and cohort re-scoring.
+
+Solutions are random programs (loops, conditionals, accumulators over a
+fixed `class Solution` starter) plus an idiomatic block half of them share,
+so common fingerprints exceed the posting cap the way real boilerplate does.
+A plagiarized copy renames every identifier, adds comments and blank lines
+and inserts one statement. --distinct programs are fingerprinted for real;
+the rest of the corpus reuses their fingerprint sets with most fingerprints
+replaced (other candidates taking the same approach), which keeps loading a
+million submissions to minutes. Postings are bulk-inserted with sqlite3.
+
+Lookups are timed at each --checkpoints size through the app's own
+CodeSimilarityIndex.similar(); a hit means the copied submission ranks first.
+
+    python benchmarks/bench_code_similarity.py --submissions 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+QUESTION_ID = "two-sum"
+NAMES = ["nums", "target", "i", "j", "total", "seen", "result", "left", "right", "count", "best", "value", "stack",
+         "memo", "window"]
+STARTER = "class Solution:\n    def solve(self, nums, target):\n"
+IDIOM = [
+    "seen = {}",
+    "for i, value in enumerate(nums):",
+    "    if target - value in seen:",
+    "        return [seen[target - value], i]",
+    "    seen[value] = i",
+]
+
+
+def expression(rng: random.Random, depth: int = 0) -> str:
+    name = rng.choice(NAMES)
+    if depth > 1:
+        return rng.choice([name, str(rng.randint(0, 9))])
+    return rng.choice([
+        name, str(rng.randint(0, 100)), f"{name} + {expression(rng, depth + 1)}", f"{name} - {rng.randint(1, 3)}",
+        f"len({name})", f"{name}[{rng.choice(NAMES)}]", f"min({name}, {expression(rng, depth + 1)})",
+        f"max({name}, {expression(rng, depth + 1)})", f"{name} * {expression(rng, depth + 1)}"
+    ])
+
+
+def statements(rng: random.Random, depth: int, count: int) -> list:
+    lines = []
+    for _ in range(count):
+        kind = rng.randrange(7 if depth < 3 else 4)
+        name = rng.choice(NAMES)
+        if kind == 0:
+            lines.append(f"{name} = {expression(rng)}")
+        elif kind == 1:
+            lines.append(f"{name} += {expression(rng)}")
+        elif kind == 2:
+            lines.append(f"{name}.append({expression(rng)})")
+        elif kind == 3:
+            lines.append(f"{name} = [] if {expression(rng)} else {expression(rng)}")
+        else:
+            header = [
+                f"for {name} in range({expression(rng)}):",
+                f"if {expression(rng)} {rng.choice(['<', '>', '==', '!='])} {expression(rng)}:",
+                f"while {name} < {expression(rng)}:"
+            ][kind - 4]
+            lines.append(header)
+            lines.extend("    " + line for line in statements(rng, depth + 1, rng.randint(1, 3)))
+    return lines
+
+
+def program(rng: random.Random) -> str:
+    body = statements(rng, 1, rng.randint(5, 9))
+    if rng.random() < 0.5:
+        # Only between top-level statements, never between a header and its block
+        boundaries = [i for i, line in enumerate(body) if not line.startswith(" ")] + [len(body)]
+        at = rng.choice(boundaries)
+        body[at:at] = IDIOM
+    body.append(f"return {rng.choice(NAMES)}")
+    return STARTER + "".join(f"        {line}\n" for line in body)
+
+
+def plagiarize(rng: random.Random, code: str) -> str:
+    renames = {name: f"{rng.choice(['tmp', 'val', 'x', 'acc', 'arr'])}_{i}" for i, name in enumerate(NAMES)}
+    code = re.sub(r"\b(" + "|".join(NAMES) + r")\b", lambda match: renames[match.group(1)], code)
+    lines = code.splitlines()
+    lines.insert(2, "        # my solution")
+    lines.insert(3, f"        {renames['count']} = 0")
+    for _ in range(3):
+        lines.insert(rng.randrange(3, len(lines)), "")
+    return "\n".join(lines) + "\n"
+
+
+def load(database: Path, rows: list) -> None:
+    """rows: (submission_id, fingerprints)"""
+    connection = sqlite3.connect(database)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    connection.execute("PRAGMA cache_size=-1000000")
+    connection.executemany(
+        "INSERT INTO submissions (id, question_id, user_code, time_taken_seconds, fingerprint_count) "
+        "VALUES (?, ?, '', 600, ?)",
+        ((submission_id, QUESTION_ID, len(prints)) for submission_id, prints in rows)
+    )
+    connection.executemany(
+        "INSERT OR IGNORE INTO code_fingerprints (question_id, fingerprint, submission_id) VALUES (?, ?, ?)",
+        ((QUESTION_ID, fingerprint, submission_id) for submission_id, prints in rows for fingerprint in prints)
+    )
+    connection.commit()
+    connection.close()
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+async def lookups(index, queries: list, k: int) -> tuple:
+    """queries: (code, expected submission id or None); returns latencies (ms), hits, false flags"""
+    latencies, hits, false_flags = [], 0, 0
+    for code, expected in queries:
+        started = time.perf_counter()
+        matches = await index.similar(QUESTION_ID, code, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if expected is not None:
+            hits += bool(matches) and matches[0]["submission_id"] == expected
+        else:
+            false_flags += bool(matches) and matches[0]["flagged"]
+    return latencies, hits, false_flags
+
+
+async def flush_cost(batches: int, batch_size: int, codes: list) -> dict:
+    from app.services.submission_writer import SubmissionWriter, submission_row
+
+    costs = {}
+    for name, writer in {"without fingerprints": SubmissionWriter(fingerprints=None),
+                         "with fingerprints": SubmissionWriter()}.items():
+        latencies = []
+        for _ in range(batches):
+            rows = [submission_row(str(uuid.uuid4()), "flush-test", random.choice(codes), 600, {"overall_score": 80})
+                    for _ in range(batch_size)]
+            started = time.perf_counter()
+            await writer._write(rows)
+            latencies.append((time.perf_counter() - started) * 1000)
+        costs[name] = statistics.median(latencies)
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Code similarity benchmark")
+    parser.add_argument("--submissions", type=int, default=1_000_000)
+    parser.add_argument("--checkpoints", default="10000,100000,1000000")
+    parser.add_argument("--distinct", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--cohort", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    database = workdir / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.database import init_db
+    from app.services.code_similarity import code_similarity, code_tokens, rescore_cohort
+    init_db()
+
+    rng = random.Random(5)
+    codes = [program(rng) for _ in range(args.distinct)]
+    started = time.perf_counter()
+    prints = [code_similarity.fingerprints(code) for code in codes]
+    per_submission_us = (time.perf_counter() - started) / len(codes) * 1e6
+    tokens = statistics.mean(len(code_tokens(code)) for code in codes[:1000])
+    print(f"fingerprint: {per_submission_us:.0f} us/submission   {tokens:.0f} AST tokens and "
+          f"{statistics.mean(len(p) for p in prints):.1f} fingerprints per submission on average "
+          f"(k={code_similarity.kgram}, window={code_similarity.window})")
+
+    # The distinct programs are stored under their own ids; queries copy them
+    distinct_ids = [str(uuid.uuid4()) for _ in codes]
+    queries = [(plagiarize(rng, codes[i]), distinct_ids[i])
+               for i in rng.sample(range(len(codes)), args.queries // 2)]
+    queries += [(program(rng), None) for _ in range(args.queries - len(queries))]
+
+    def variant():
+        base = list(prints[rng.randrange(len(prints))])
+        return [f if rng.random() < 0.4 else rng.getrandbits(61) for f in base]
+
+    checkpoints = sorted({min(int(n), args.submissions) for n in args.checkpoints.split(",")} | {args.submissions})
+    loaded, load_seconds = 0, 0.0
+    for checkpoint in checkpoints:
+        started = time.perf_counter()
+        if loaded == 0:
+            load(database, list(zip(distinct_ids, prints)))
+            loaded = len(prints)
+        while loaded < checkpoint:
+            chunk = min(200000, checkpoint - loaded)
+            load(database, [(str(uuid.uuid4()), variant()) for _ in range(chunk)])
+            loaded += chunk
+        load_seconds += time.perf_counter() - started
+        postings = sqlite3.connect(database).execute("SELECT COUNT(*) FROM code_fingerprints").fetchone()[0]
+
+        latencies, hits, false_flags = asyncio.run(lookups(code_similarity, queries, args.k))
+        copies = sum(1 for _, expected in queries if expected is not None)
+        print(f"{loaded:>9} submissions ({postings:>9} postings, loaded in {load_seconds:4.0f} s)   "
+              f"lookup p50 {statistics.median(latencies):5.1f} ms   p99 {percentile(latencies, 0.99):5.1f} ms   "
+              f"copies ranked first {hits}/{copies}   unrelated flagged {false_flags}/{len(queries) - copies}")
+
+    costs = asyncio.run(flush_cost(20, 500, codes))
+    print(f"writer flush of 500 rows   without fingerprints {costs['without fingerprints']:.1f} ms   "
+          f"with fingerprints {costs['with fingerprints']:.1f} ms")
+
+    # Cohort: the first --cohort distinct programs, a tenth of them copied by another member
+    members = min(args.cohort, len(codes))
+    ids = [f"m{i}" for i in range(members)]
+    cohort_prints = [tuple(p) for p in prints[:members]]
+    copied = rng.sample(range(members), members // 10)
+    for i in copied:
+        ids.append(f"copy-of-m{i}")
+        cohort_prints.append(tuple(code_similarity.fingerprints(plagiarize(rng, codes[i]))))
+    for workers in sorted({1, args.workers}):
+        started = time.perf_counter()
+        scored = rescore_cohort(ids, cohort_prints, args.k, code_similarity.max_posting,
+                                code_similarity.flag_threshold, workers)
+        elapsed = time.perf_counter() - started
+        caught = sum(1 for i, matches in zip(ids, scored)
+                     if i.startswith("copy-of-") and matches and matches[0]["submission_id"] == i[len("copy-of-"):])
+        print(f"cohort rescore of {len(ids)} submissions   {workers} worker(s): {elapsed:5.1f} s   "
+              f"copies matched to their source {caught}/{len(copied)}")
+    print(f"(CPUs available: {os.cpu_count()})")
+
+
+if __name__ == "__main__":
+    main()
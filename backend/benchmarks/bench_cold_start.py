@@ -0,0 +1,90 @@
+"""
+Cold-start time: how long a fresh `uvicorn main:app` takes to answer /health.
+
+Each run starts a new server process against a new SQLite file (nothing
+cached in the process, like a scale-to-zero wake-up) and polls /health every
+few milliseconds until the first 200; `import main` is also timed in a fresh
+interpreter. The script exits non-zero when the median time-to-/health
+exceeds --max-ms (0 disables the check), so it can gate CI against start-up
+regressions; the default sits between the ~2.5 s before start-up work moved
+into the lifespan and the ~1.6 s after, measured on one CPU.
+
+    python benchmarks/bench_cold_start.py --runs 5 --max-ms 2000
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+IMPORT_SNIPPET = "import time; started = time.perf_counter(); import main; print((time.perf_counter() - started) * 1000)"
+
+
+def health_ok(port: int) -> bool:
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.5) as connection:
+            connection.sendall(b"GET /health HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n")
+            return connection.recv(64).startswith(b"HTTP/1.1 200")
+    except OSError:
+        return False
+
+
+def time_to_health(port: int, env: dict, timeout: float = 30) -> float:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if health_ok(port):
+                return (time.perf_counter() - started) * 1000
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            time.sleep(0.005)
+        raise RuntimeError(f"/health not answered within {timeout:.0f} s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def time_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8031)
+    parser.add_argument("--max-ms", type=float, default=2000, help="fail if median time-to-/health exceeds this")
+    args = parser.parse_args()
+
+    imports, healths = [], []
+    for _ in range(args.runs):
+        workdir = Path(tempfile.mkdtemp())
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir / 'app.db'}", STATE_DB_PATH=str(workdir / "state.db"),
+                   ANALYSIS_CACHE_DB_PATH="")
+        imports.append(time_import(env))
+        healths.append(time_to_health(args.port, env))
+
+    print(f"runs: {args.runs}   CPUs: {os.cpu_count()}")
+    print(f"import main          median {statistics.median(imports):7.0f} ms   min {min(imports):7.0f} ms   "
+          f"max {max(imports):7.0f} ms")
+    median = statistics.median(healths)
+    print(f"first /health        median {median:7.0f} ms   min {min(healths):7.0f} ms   max {max(healths):7.0f} ms")
+    if args.max_ms and median > args.max_ms:
+        print(f"FAIL: median time-to-/health {median:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
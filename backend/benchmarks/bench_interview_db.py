@@ -0,0 +1,126 @@
+"""
+Requests/sec for concurrent interview session start/end: the async
+(aiosqlite, pooled, WAL) router versus the previous sync-Session handlers.
+
+Both variants run in-process over httpx's ASGI transport against the same
+temporary SQLite file, so only the database path differs. Alongside req/s it
+reports the longest event-loop stall, which is what the sync path costs every
+other request on the worker. Keep --concurrency at or below the sync pool
+limit (15): past it the sync handlers block the loop while waiting for a
+connection that can only be returned by the loop, and the baseline stalls.
+
+    python benchmarks/bench_interview_db.py --sessions 500 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+_tmpdir = tempfile.mkdtemp(prefix="bench_interview_db_")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from sqlalchemy.orm import Session
+
+from app.database import get_db, init_db
+from app.models.interview import InterviewSession
+from app.models.schemas import InterviewSessionCreate, InterviewSessionResponse
+from app.routes import interview
+
+
+def build_sync_baseline() -> APIRouter:
+    """The interview handlers as they were before the async session path"""
+    router = APIRouter(prefix="/interview")
+
+    @router.post("/start", response_model=InterviewSessionResponse)
+    async def start_interview_session(session_data: InterviewSessionCreate, db: Session = Depends(get_db)):
+        new_session = InterviewSession(
+            session_type=session_data.session_type,
+            duration_minutes=session_data.duration_minutes,
+            status="in_progress"
+        )
+        db.add(new_session)
+        db.commit()
+        db.refresh(new_session)
+        return new_session
+
+    @router.post("/session/{session_id}/end")
+    async def end_interview_session(session_id: int, db: Session = Depends(get_db)):
+        session = db.query(InterviewSession).filter(InterviewSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+        session.end_time = datetime.now()
+        session.status = "completed"
+        db.commit()
+        return {"message": "Interview session ended successfully"}
+
+    return router
+
+
+async def watch_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def drive(app: FastAPI, sessions: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(sessions):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                started = await client.post("/interview/start", json={"session_type": "coding"})
+                session_id = started.json()["id"]
+                ended = await client.post(f"/interview/session/{session_id}/end")
+                assert ended.status_code == 200, ended.text
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(watch_loop_lag(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        worst_lag = await lag_task
+
+    # Each session is two requests (start + end)
+    return sessions * 2 / elapsed, worst_lag
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Interview session DB benchmark")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    init_db()
+    sync_app = FastAPI()
+    sync_app.include_router(build_sync_baseline())
+    async_app = FastAPI()
+    async_app.include_router(interview.router)
+
+    sync_rps, sync_lag = asyncio.run(drive(sync_app, args.sessions, args.concurrency))
+    async_rps, async_lag = asyncio.run(drive(async_app, args.sessions, args.concurrency))
+
+    print(f"sessions={args.sessions} concurrency={args.concurrency} db={os.environ['DATABASE_URL']}")
+    print(f"sync Session (baseline):  {sync_rps:8.1f} req/s   max loop stall {sync_lag * 1000:7.1f} ms")
+    print(f"AsyncSession (aiosqlite): {async_rps:8.1f} req/s   max loop stall {async_lag * 1000:7.1f} ms")
+    print(f"throughput ratio:         {async_rps / sync_rps:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
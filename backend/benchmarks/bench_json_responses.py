@@ -0,0 +1,149 @@
+"""
+Requests/sec on the catalog and question endpoints: re-encoding every call vs. orjson and pre-encoded payloads.
+
+"before" is a copy of the old handlers: they return Python objects, which
+FastAPI runs through jsonable_encoder and the stdlib-backed JSONResponse on
+every call. "after" is the app in main.py: /, /api/questions/categories and
+/questions/categories send bytes encoded at import with an ETag,
+/questions/stats is encoded by orjson (no ETag: its counters change on
+every request), and /api/questions sends each question's bytes encoded
+once. "after, 304" repeats the request with the ETag from the first
+response in If-None-Match, as a browser revalidating its cached copy does.
+
+Requests go straight through the ASGI interface (no sockets, so the
+difference isn't lost in HTTP parsing and network noise), with the same CORS
+middleware on both apps. Variants alternate within each of --repeats rounds
+and the best round counts.
+
+    python benchmarks/bench_json_responses.py --requests 20000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+os.environ.setdefault("METRICS_ENABLED", "False")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import orjson  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+
+import main  # noqa: E402
+from app.routes import questions  # noqa: E402
+
+ENDPOINTS = [
+    ("/", b""),
+    ("/api/questions/categories", b""),
+    ("/questions/categories", b""),
+    ("/questions/stats", b""),
+    ("/api/questions", b"difficulty=medium"),
+]
+
+
+def make_before_app() -> FastAPI:
+    """main.app's routes in the same order (so matching costs the same), with the old handlers swapped in"""
+    root = orjson.loads(main.ROOT_PAYLOAD.body)
+    categories = orjson.loads(main.QUESTION_CATEGORIES.body)
+    catalog = orjson.loads(questions.CATEGORY_CATALOG.body)
+
+    async def get_root():
+        return dict(root)
+
+    async def get_question_categories():
+        return list(categories)
+
+    async def get_category_catalog():
+        return dict(catalog)
+
+    async def get_system_stats():
+        return questions.system_stats()
+
+    async def get_question(difficulty: str = "medium", topic: Optional[str] = None, session_id: Optional[str] = None):
+        return await main.select_question(difficulty, topic, session_id)
+
+    old_handlers = {
+        "/": get_root,
+        "/api/questions/categories": get_question_categories,
+        "/questions/categories": get_category_catalog,
+        "/questions/stats": get_system_stats,
+        "/api/questions": get_question,
+    }
+
+    app = FastAPI(default_response_class=JSONResponse)
+    app.add_middleware(CORSMiddleware, allow_origins=main.origins, allow_credentials=True,
+                       allow_methods=["*"], allow_headers=["*"], expose_headers=["X-Next-Cursor"])
+    for route in main.app.router.routes:
+        if isinstance(route, APIRoute) and route.path in old_handlers and "GET" in route.methods:
+            app.add_api_route(route.path, old_handlers[route.path], methods=["GET"], response_class=JSONResponse)
+        else:
+            app.router.routes.append(route)
+    return app
+
+
+async def drive(asgi_app, path: str, query: bytes, requests: int, etag: Optional[bytes]) -> tuple:
+    """(requests/sec, last status, last ETag, last body size)"""
+    seen = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            seen["status"] = message["status"]
+            seen["etag"] = dict(message["headers"]).get(b"etag")
+        else:
+            seen["size"] = len(message.get("body", b""))
+
+    headers = [(b"host", b"127.0.0.1"), (b"accept", b"application/json")]
+    if etag:
+        headers.append((b"if-none-match", etag))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query, "headers": headers, "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+    }
+    started = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(dict(scope), receive, send)
+    return requests / (time.perf_counter() - started), seen["status"], seen["etag"], seen["size"]
+
+
+def main_() -> None:
+    parser = argparse.ArgumentParser(description="JSON response benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    main.load_question_bank()
+    before_app, after_app = make_before_app(), main.app
+
+    print(f"{'endpoint':28s} {'bytes':>6s} {'before rps':>11s} {'after rps':>10s} {'speedup':>8s} "
+          f"{'after, 304 rps':>15s} {'speedup':>8s}")
+    for path, query in ENDPOINTS:
+        etag = asyncio.run(drive(after_app, path, query, 1, None))[2]
+        rounds = []
+        for _ in range(args.repeats):
+            before = asyncio.run(drive(before_app, path, query, args.requests, None))
+            after = asyncio.run(drive(after_app, path, query, args.requests, None))
+            revalidated = asyncio.run(drive(after_app, path, query, args.requests, etag)) if etag else None
+            rounds.append((before, after, revalidated))
+        before = max(r[0][0] for r in rounds)
+        after = max(r[1][0] for r in rounds)
+        size = rounds[0][1][3]
+        line = f"{path:28s} {size:6d} {before:11.0f} {after:10.0f} {after / before:7.2f}x"
+        if etag:
+            statuses = {r[2][1] for r in rounds}
+            revalidated = max(r[2][0] for r in rounds)
+            line += f" {revalidated:15.0f} {revalidated / before:7.2f}x   (status {'/'.join(map(str, statuses))})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main_()
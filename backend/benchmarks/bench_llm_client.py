@@ -0,0 +1,108 @@
+"""
+Load test for the pooled async LLM client in AIInterviewService.
+
+Starts benchmarks/fake_openai_server.py (unless --base-url is given), fires
+--requests concurrent analyze_code_with_ai calls and reports throughput,
+latency percentiles and the worst event-loop stall seen while they ran.
+
+    python benchmarks/bench_llm_client.py --requests 200 --latency-ms 300
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def start_fake_server(port: int, latency_ms: float) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [
+            sys.executable, str(BACKEND_DIR / "benchmarks" / "fake_openai_server.py"),
+            "--port", str(port), "--latency-ms", str(latency_ms), "--jitter-ms", "0"
+        ]
+    )
+    import httpx
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/stats", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("fake OpenAI server did not start")
+
+
+async def watch_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Return the largest delay between scheduled and actual wake-ups"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(args) -> None:
+    from app.services.ai_service import ai_service
+
+    question = {"title": "Two Sum", "description": "Find two numbers", "time_limit_minutes": 15}
+    latencies = []
+
+    async def one(i: int) -> None:
+        started = time.perf_counter()
+        await ai_service.analyze_code_with_ai(question, f"def solve(): return {i}", 300)
+        latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(watch_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag_task
+    await ai_service.aclose()
+
+    latencies.sort()
+    print(f"requests:          {args.requests}")
+    print(f"concurrency cap:   {args.concurrency}")
+    print(f"wall time:         {elapsed:.2f}s")
+    print(f"throughput:        {args.requests / elapsed:.1f} req/s")
+    print(f"latency p50/p95:   {statistics.median(latencies) * 1000:.0f} / "
+          f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} ms")
+    print(f"max event loop lag: {worst_lag * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM client load test")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--base-url", help="use an already running OpenAI-compatible server")
+    args = parser.parse_args()
+
+    server = None
+    if not args.base_url:
+        server = start_fake_server(args.port, args.latency_ms)
+        args.base_url = f"http://127.0.0.1:{args.port}/v1"
+
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ["OPENAI_BASE_URL"] = args.base_url
+    os.environ["LLM_MAX_CONCURRENCY"] = str(args.concurrency)
+    try:
+        asyncio.run(run(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Interactive latency during a submission spike against a rate-limited LLM.
+
+The fake OpenAI server answers 429 past --upstream-rps. A burst of unique
+POST /questions/submit calls for an unbanked question (LLM tier) runs while
+the API is configured two ways:
+
+- unscheduled: no token bucket, no deadline, breaker effectively off; every
+  call goes upstream, 429s are retried by the client, then fall back
+- scheduled: the bucket matches the upstream limit and calls whose queue wait
+  would exceed LLM_INTERACTIVE_MAX_WAIT_SECONDS fall back immediately
+
+    python benchmarks/bench_llm_spike.py --requests 200 --concurrency 50 --upstream-rps 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from bench_sse_submit import start, submission
+
+
+async def spike(base_url: str, requests: int, concurrency: int, offset: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, tiers = [], {}
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/questions/submit", json=submission(offset + i))
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - started)
+            tier = response.json()["analysis_tier"]
+            tiers[tier] = tiers.get(tier, 0) + 1
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+        scheduler = (await client.get("/questions/stats")).json()["llm_scheduler"]
+    latencies.sort()
+    return {
+        "elapsed": elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "llm": tiers.get("llm", 0),
+        "scheduler": scheduler
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="LLM spike benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--upstream-rps", type=float, default=5)
+    parser.add_argument("--fake-port", type=int, default=8025)
+    parser.add_argument("--api-port", type=int, default=8026)
+    args = parser.parse_args()
+
+    fake = start([sys.executable, "benchmarks/fake_openai_server.py", "--port", str(args.fake_port),
+                  "--latency-ms", str(args.latency_ms), "--jitter-ms", "0", "--rate-limit", str(args.upstream_rps)],
+                 args.fake_port)
+    configs = {
+        "unscheduled": {"LLM_REQUESTS_PER_SECOND": "0", "LLM_INTERACTIVE_MAX_WAIT_SECONDS": "3600",
+                        "LLM_BREAKER_FAILURES": "1000000"},
+        "scheduled": {"LLM_REQUESTS_PER_SECOND": str(args.upstream_rps), "LLM_BURST": str(int(args.upstream_rps))}
+    }
+    results = {}
+    try:
+        for offset, (name, overrides) in enumerate(configs.items()):
+            database = Path(tempfile.mkdtemp()) / "bench.db"
+            env = dict(os.environ, OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"http://127.0.0.1:{args.fake_port}/v1",
+                       DATABASE_URL=f"sqlite:///{database}", ANALYSIS_CACHE_DB_PATH="",
+                       **overrides)
+            api = start([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port),
+                         "--log-level", "warning"], args.api_port, env)
+            before = httpx.get(f"http://127.0.0.1:{args.fake_port}/stats").json()["rate_limited"]
+            try:
+                results[name] = asyncio.run(spike(f"http://127.0.0.1:{args.api_port}", args.requests,
+                                                  args.concurrency, offset * args.requests))
+            finally:
+                api.terminate()
+                api.wait()
+            results[name]["429s"] = httpx.get(f"http://127.0.0.1:{args.fake_port}/stats").json()["rate_limited"] - before
+    finally:
+        fake.terminate()
+
+    print(f"requests: {args.requests}   concurrency: {args.concurrency}   "
+          f"upstream limit: {args.upstream_rps:.0f} req/s   LLM latency: {args.latency_ms:.0f} ms")
+    for name, r in results.items():
+        shed = ", ".join(f"{reason} {count}" for reason, count in r["scheduler"]["shed"].items() if count) or "none"
+        print(f"{name:12s} p50 {r['p50'] * 1000:6.0f} ms   p95 {r['p95'] * 1000:6.0f} ms   wall {r['elapsed']:5.1f} s   "
+              f"LLM-graded {r['llm']:3d}   upstream 429s {r['429s']:4d}   shed: {shed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Per-request cost of the metrics instrumentation.
+
+Drives a bare ASGI endpoint and a one-route FastAPI app straight through
+their ASGI interface (no sockets, so the difference isn't lost in network
+noise) with and without MetricsMiddleware, and runs SELECT 1 on an in-memory
+SQLite engine with and without query timing. Variants alternate within each of
+--repeats rounds and the best round counts, so machine noise hits both sides.
+
+    python benchmarks/bench_metrics_overhead.py --requests 20000
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.metrics import MetricsMiddleware, instrument_engine, metrics  # noqa: E402
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/sessions/{session_id}")
+    async def get_session(session_id: str):
+        return {"id": session_id, "status": "active"}
+
+    return app
+
+
+async def bare_endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def drive(asgi_app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/sessions/{i}", "raw_path": b"", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+        }
+        await asgi_app(scope, receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+def request_time(asgi_app, requests: int) -> float:
+    return asyncio.run(drive(asgi_app, requests))
+
+
+def query_time(engine, queries: int) -> float:
+    with engine.connect() as connection:
+        started = time.perf_counter()
+        for _ in range(queries):
+            connection.execute(text("SELECT 1")).scalar()
+        return (time.perf_counter() - started) / queries
+
+
+def best_pair(plain, instrumented, repeats: int):
+    """Best time of each variant, alternating them every round"""
+    rounds = [(plain(), instrumented()) for _ in range(repeats)]
+    return min(r[0] for r in rounds), min(r[1] for r in rounds)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    endpoint = best_pair(lambda: request_time(bare_endpoint, args.requests),
+                         lambda: request_time(MetricsMiddleware(bare_endpoint), args.requests), args.repeats)
+
+    plain_app, timed_app = make_app(), make_app()
+    timed_app.add_middleware(MetricsMiddleware)
+    fastapi_route = best_pair(lambda: request_time(plain_app, args.requests),
+                              lambda: request_time(timed_app, args.requests), args.repeats)
+
+    plain_engine, timed_engine = create_engine("sqlite://"), create_engine("sqlite://")
+    instrument_engine(timed_engine, "bench")
+    query = best_pair(lambda: query_time(plain_engine, args.queries),
+                      lambda: query_time(timed_engine, args.queries), args.repeats)
+
+    started = time.perf_counter()
+    exposition = metrics.render()
+    render_seconds = time.perf_counter() - started
+
+    for label, (plain, instrumented) in (("bare ASGI endpoint", endpoint), ("FastAPI route", fastapi_route),
+                                         ("SELECT 1 (SQLite)", query)):
+        print(f"{label:20s} plain {plain * 1e6:7.2f} us   instrumented {instrumented * 1e6:7.2f} us   "
+              f"overhead {(instrumented - plain) * 1e6:5.2f} us")
+    print(f"{'/metrics render':20s} {render_seconds * 1e3:.2f} ms for {len(exposition.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Session API throughput and consistency under `uvicorn --workers N`.
+
+Each client runs the interview flow: create a session, fetch it, get a
+question for it, end it, then read /api/user/stats. Requests from one flow
+land on whichever worker accepts the connection, so with per-process state a
+session created on one worker 404s on another. Afterwards every created
+session is fetched again and the shared counters are checked against what
+the clients did.
+
+Client load is spread over --client-processes so the load generator isn't the
+bottleneck; on a machine with fewer cores than workers + clients, scaling is
+capped by the CPU count, which is printed alongside the results.
+
+    python benchmarks/bench_multiworker.py --workers 1 2 4 --seconds 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import httpx
+
+from bench_sse_submit import start
+
+
+async def client_flows(base_url: str, seconds: float, concurrency: int) -> dict:
+    totals = {"flows": 0, "requests": 0, "not_found": 0, "session_ids": []}
+    deadline = time.perf_counter() + seconds
+
+    async def flow_loop(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            created = (await client.post("/api/sessions", json={"difficulty": "easy"})).json()
+            session_id = created["session_id"]
+            responses = [
+                await client.get(f"/api/sessions/{session_id}"),
+                await client.get("/api/questions", params={"difficulty": "easy", "session_id": session_id}),
+                await client.post(f"/api/sessions/{session_id}/end"),
+                await client.get("/api/user/stats")
+            ]
+            totals["requests"] += 1 + len(responses)
+            totals["not_found"] += sum(r.status_code == 404 for r in responses)
+            totals["flows"] += 1
+            totals["session_ids"].append(session_id)
+
+    # No keep-alive: every request opens a connection, so consecutive steps of one
+    # flow can land on different workers (as they would behind a load balancer)
+    limits = httpx.Limits(max_keepalive_connections=0)
+    clients = [httpx.AsyncClient(base_url=base_url, timeout=30, limits=limits) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*(flow_loop(client) for client in clients))
+    finally:
+        for client in clients:
+            await client.aclose()
+    return totals
+
+
+def run_client(args: tuple) -> dict:
+    return asyncio.run(client_flows(*args))
+
+
+async def verify(base_url: str, session_ids: list) -> dict:
+    missing = 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=30, limits=httpx.Limits(max_keepalive_connections=0)) as client:
+        for start_index in range(0, len(session_ids), 50):
+            batch = session_ids[start_index:start_index + 50]
+            responses = await asyncio.gather(*(client.get(f"/api/sessions/{sid}") for sid in batch))
+            missing += sum(r.status_code == 404 for r in responses)
+        stats = (await client.get("/api/user/stats")).json()
+    return {"missing": missing, "stats": stats}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Multi-worker session API benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--backend", choices=["sqlite", "memory"], default="sqlite")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=16, help="flow loops per client process")
+    parser.add_argument("--warmup", type=float, default=4, help="seconds to wait per worker for start-up")
+    parser.add_argument("--port", type=int, default=8027)
+    args = parser.parse_args()
+
+    print(f"backend: {args.backend}   CPUs: {os.cpu_count()}   "
+          f"clients: {args.client_processes} x {args.concurrency} flows   {args.seconds:.0f} s per run")
+    baseline = None
+    for workers in args.workers:
+        workdir = Path(tempfile.mkdtemp())
+        env = dict(os.environ, STATE_BACKEND=args.backend, STATE_DB_PATH=str(workdir / "state.db"),
+                   DATABASE_URL=f"sqlite:///{workdir / 'app.db'}", ANALYSIS_CACHE_DB_PATH="")
+        api = start([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port),
+                     "--workers", str(workers), "--log-level", "warning"], args.port, env)
+        base_url = f"http://127.0.0.1:{args.port}"
+        try:
+            # /docs answers as soon as the first worker is up; let the rest (and their sandbox pools) start too
+            time.sleep(args.warmup * workers)
+            with Pool(args.client_processes) as pool:
+                results = pool.map(run_client, [(base_url, args.seconds, args.concurrency)] * args.client_processes)
+            session_ids = [sid for r in results for sid in r["session_ids"]]
+            check = asyncio.run(verify(base_url, session_ids))
+        finally:
+            api.terminate()
+            api.wait()
+
+        requests = sum(r["requests"] for r in results)
+        not_found = sum(r["not_found"] for r in results)
+        throughput = requests / args.seconds
+        baseline = baseline or throughput
+        counted = check["stats"].get("sessions_started", 0)
+        print(f"workers {workers}:  {throughput:7.0f} req/s  ({throughput / baseline:4.2f}x)   "
+              f"404s during flows {not_found:5d}   sessions lost {check['missing']:5d}   "
+              f"sessions_started {counted}/{len(session_ids)}")
+
+
+if __name__ == "__main__":
+    main()
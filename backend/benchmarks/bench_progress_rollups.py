@@ -0,0 +1,149 @@
+"""
+Dashboard progress data at --rows submissions: GROUP BY over the submissions
+table on request versus reading the precomputed progress rollups.
+
+Loads synthetic submissions spread over --days days (bulk-inserted with
+sqlite3, bypassing the app), backfills the rollups with
+ProgressRollups.rebuild(), then times both ways of producing the last 30
+days per day (overall, per difficulty, per tag), and what folding a batch
+into the rollups adds to a submission writer flush.
+
+    python benchmarks/bench_progress_rollups.py --rows 10000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+TAGS = ["Array", "Hash Table", "String", "Dynamic Programming", "Tree", "Graph", "Binary Search", "Two Pointers",
+        "Sliding Window", "Stack", "Heap", "Greedy", "Backtracking", "Linked List", "Math", "Sorting"]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+# On-request aggregation: what the dashboard would cost without rollups
+NAIVE_QUERIES = [
+    "SELECT date(created_at), count(*), sum(overall_score >= 70), sum(overall_score), max(overall_score) "
+    "FROM submissions WHERE created_at >= :since GROUP BY 1",
+    "SELECT date(created_at), difficulty, count(*), sum(overall_score >= 70), sum(overall_score), max(overall_score) "
+    "FROM submissions WHERE created_at >= :since GROUP BY 1, 2",
+    "SELECT date(created_at), tag.value, count(*), sum(overall_score >= 70), sum(overall_score), max(overall_score) "
+    "FROM submissions, json_each(submissions.tags) AS tag WHERE created_at >= :since GROUP BY 1, 2"
+]
+
+
+def load(database: Path, rows: int, days: int, chunk: int = 100000) -> None:
+    rng = random.Random(7)
+    questions = [(f"q{i}", rng.choice(DIFFICULTIES), json.dumps(rng.sample(TAGS, rng.randint(1, 3)))) for i in range(200)]
+    start = datetime.utcnow() - timedelta(days=days)
+    step = days * 86400 / rows
+
+    def generate(first: int, count: int):
+        for i in range(first, first + count):
+            question_id, difficulty, tags = questions[rng.randrange(len(questions))]
+            created_at = (start + timedelta(seconds=i * step)).strftime("%Y-%m-%d %H:%M:%S.%f")
+            yield (f"{i:036d}", question_id, difficulty, tags, "", 600, "execution", rng.randint(20, 100), created_at)
+
+    connection = sqlite3.connect(database)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=OFF")
+    for first in range(0, rows, chunk):
+        connection.executemany(
+            "INSERT INTO submissions (id, question_id, difficulty, tags, user_code, time_taken_seconds, "
+            "analysis_tier, overall_score, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            generate(first, min(chunk, rows - first))
+        )
+        connection.commit()
+    connection.close()
+
+
+def timed(samples: int, run) -> list:
+    latencies = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        run()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return sorted(latencies)
+
+
+async def flush_cost(batches: int, batch_size: int) -> dict:
+    from app.services.submission_writer import SubmissionWriter, submission_row
+
+    def batch():
+        return [
+            submission_row(str(uuid.uuid4()), "q1", "", 600, {"overall_score": random.randint(20, 100)}, "execution",
+                           difficulty=random.choice(DIFFICULTIES), tags=random.sample(TAGS, 2))
+            for _ in range(batch_size)
+        ]
+
+    costs = {}
+    for name, writer in {"without rollups": SubmissionWriter(rollups=None), "with rollups": SubmissionWriter()}.items():
+        latencies = []
+        for _ in range(batches):
+            rows = batch()
+            started = time.perf_counter()
+            await writer._write(rows)
+            latencies.append((time.perf_counter() - started) * 1000)
+        costs[name] = statistics.median(latencies)
+    return costs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Progress rollups benchmark")
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    database = workdir / "bench.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{database}"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.database import init_db
+    from app.services.progress_rollups import progress_rollups
+    init_db()
+
+    started = time.perf_counter()
+    load(database, args.rows, args.days)
+    print(f"loaded {args.rows} submissions over {args.days} days in {time.perf_counter() - started:.0f} s "
+          f"({database.stat().st_size / 2**20:.0f} MB)")
+
+    started = time.perf_counter()
+    folded = asyncio.run(progress_rollups.rebuild())
+    rollup_rows = sqlite3.connect(database).execute("SELECT COUNT(*) FROM progress_rollups").fetchone()[0]
+    print(f"rebuilt rollups from {folded} submissions in {time.perf_counter() - started:.0f} s ({rollup_rows} rollup rows)")
+
+    since = (datetime.utcnow() - timedelta(days=29)).strftime("%Y-%m-%d")
+    reader = sqlite3.connect(database)
+    naive = timed(3, lambda: [reader.execute(query, {"since": since}).fetchall() for query in NAIVE_QUERIES])
+    print(f"on-request GROUP BY (30 days)   median {statistics.median(naive):9.1f} ms   ({len(naive)} runs)")
+
+    async def dashboards(period: str, periods: int) -> list:
+        latencies = []
+        for _ in range(args.samples):
+            started = time.perf_counter()
+            await progress_rollups.dashboard(period, periods)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return sorted(latencies)
+
+    for period, periods in [("day", 30), ("week", 52)]:
+        latencies = asyncio.run(dashboards(period, periods))
+        print(f"rollup dashboard ({periods} {period}s)     median {statistics.median(latencies):9.2f} ms   "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1]:7.2f} ms")
+
+    costs = asyncio.run(flush_cost(20, 500))
+    print(f"writer flush of 500 rows         without rollups {costs['without rollups']:.1f} ms   "
+          f"with rollups {costs['with rollups']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
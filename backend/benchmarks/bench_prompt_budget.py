@@ -0,0 +1,222 @@
+"""
+Analysis prompt size: the old inline prompt vs. compacted, budgeted messages on realistic submissions.
+
+Submissions are generated in four shapes:
+- typical: one Solution method with comments, blank lines and a docstring
+- helpers: a solution plus helper functions, a node class and imports
+- pasted file: a solution buried in 500-2500 lines of unrelated utilities,
+  commented-out attempts and a print-heavy __main__ driver
+- other language: JavaScript with // comments, which doesn't parse as Python
+
+For each shape it reports estimated prompt tokens for the old prompt and the
+new one, how often each would overflow a 4,096-token context, whether the
+solution method reached the model intact, and the time the fitting takes.
+The old prompt is the template analyze_code_with_ai sent before budgeting.
+If tiktoken and its cl100k_base table are available, the local estimate is
+checked against it.
+
+    python benchmarks/bench_prompt_budget.py --submissions 2000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.prompt_budget import compact_code, estimate_tokens, prompt_budget
+
+CONTEXT_WINDOW = 4096
+NAMES = ["nums", "target", "left", "right", "count", "seen", "result", "window", "best", "stack", "memo", "graph"]
+QUESTION = {
+    "id": "two_sum",
+    "title": "Two Sum",
+    "description": "Given an array of integers nums and an integer target, return indices of the two numbers such "
+                   "that they add up to target. You may assume that each input would have exactly one solution, "
+                   "and you may not use the same element twice. You can return the answer in any order.",
+    "time_limit_minutes": 15
+}
+
+
+def old_prompt(question: dict, user_code: str, time_taken: int) -> str:
+    return f"""
+            Analyze this coding interview solution:
+
+            Question: {question.get('title', 'Unknown')}
+            Description: {question.get('description', 'No description')}
+
+            User's Code:
+            {user_code}
+
+            Time taken: {time_taken} seconds (limit was {question.get('time_limit_minutes', 20) * 60} seconds)
+
+            Provide analysis in this JSON format:
+            {{
+                "correctness_score": 0-100,
+                "efficiency_score": 0-100,
+                "code_quality_score": 0-100,
+                "time_management_score": 0-100,
+                "overall_score": 0-100,
+                "feedback": ["positive feedback point 1", "positive feedback point 2"],
+                "improvements": ["improvement suggestion 1", "improvement suggestion 2"],
+                "time_complexity": "O(?)",
+                "space_complexity": "O(?)",
+                "interview_tips": ["tip1", "tip2"]
+            }}
+
+            Be constructive but honest in your assessment.
+            """
+
+
+def body(rng: random.Random, lines: int, indent: str, calls: list = ()) -> list:
+    out = []
+    for _ in range(lines):
+        name, other = rng.choice(NAMES), rng.choice(NAMES)
+        kind = rng.randrange(8)
+        if kind == 0:
+            out.append(f"{indent}# {rng.choice(['update the window', 'check the edge case', 'TODO: simplify', 'move the pointer'])}")
+        elif kind == 1:
+            out.append("")
+        elif kind == 2 and calls:
+            out.append(f"{indent}{name} = {rng.choice(calls)}({other})")
+        elif kind == 3:
+            out.append(f"{indent}if {name} > {other}:  # {rng.choice(['shrink', 'grow', 'done'])}")
+            out.append(f"{indent}    {name} -= {rng.randint(1, 9)}")
+        elif kind == 4:
+            out.append(f"{indent}for i in range(len({name})):")
+            out.append(f"{indent}    {other}[i] = {name}[i] + {rng.randint(0, 99)}")
+        else:
+            out.append(f"{indent}{name} = {other} + {rng.randint(0, 99)}")
+    return out
+
+
+def solution(rng: random.Random, helpers: list, lines: int) -> list:
+    return [
+        "class Solution:",
+        "    def twoSum(self, nums, target):",
+        '        """Return the indices of the two numbers that add up to target."""',
+        *body(rng, lines, "        ", helpers),
+        "        return [left, right]"
+    ]
+
+
+def typical(rng: random.Random) -> str:
+    return "\n".join(solution(rng, [], rng.randint(10, 40))) + "\n"
+
+
+def with_helpers(rng: random.Random) -> str:
+    helpers = [f"helper_{i}" for i in range(rng.randint(2, 5))]
+    lines = ["import heapq", "from collections import defaultdict, deque", "", "class ListNode:",
+             "    def __init__(self, val=0, next=None):", "        self.val = val", "        self.next = next", ""]
+    for helper in helpers:
+        lines += [f"def {helper}({rng.choice(NAMES)}):", *body(rng, rng.randint(8, 25), "    "), f"    return {rng.choice(NAMES)}", ""]
+    return "\n".join(lines + solution(rng, helpers, rng.randint(15, 40))) + "\n"
+
+
+def pasted_file(rng: random.Random) -> str:
+    target = rng.randint(500, 2500)
+    helpers = [f"helper_{i}" for i in range(3)]
+    lines = ["import sys", "import heapq", "from collections import defaultdict", ""]
+    for helper in helpers:
+        lines += [f"def {helper}({rng.choice(NAMES)}):", *body(rng, rng.randint(8, 20), "    "), f"    return {rng.choice(NAMES)}", ""]
+    utility = 0
+    while len(lines) < target * 0.6:
+        lines += [f"def util_{utility}(data):", *body(rng, rng.randint(10, 60), "    "), "    return data", ""]
+        utility += 1
+    lines += ["# Old attempt, kept for reference:"]
+    lines += ["# " + line for line in solution(rng, [], rng.randint(20, 60))]
+    lines += solution(rng, helpers, rng.randint(20, 50)) + ["", 'if __name__ == "__main__":']
+    while len(lines) < target:
+        lines.append(f"    print(Solution().twoSum([{rng.randint(0, 9)}, {rng.randint(0, 9)}, {rng.randint(0, 9)}], {rng.randint(0, 18)}))")
+    return "\n".join(lines) + "\n"
+
+
+def other_language(rng: random.Random) -> str:
+    lines = ["var twoSum = function(nums, target) {", "    // map from value to index", "    const seen = new Map();", ""]
+    for _ in range(rng.randint(15, 400)):
+        name = rng.choice(NAMES)
+        lines.append(rng.choice([f"    // {rng.choice(['check', 'update', 'edge case'])}", "",
+                                 f"    let {name} = nums[{rng.randint(0, 9)}] + {rng.randint(0, 99)};",
+                                 f"    if ({name} > target) {{ {name} -= 1; }}"]))
+    return "\n".join(lines + ["    return [];", "};"]) + "\n"
+
+
+def solution_intact(code: str, sent: str) -> bool:
+    """Whether every compacted line of the twoSum method made it into the prompt"""
+    lines = compact_code(code).split("\n")
+    start = next((i for i, line in enumerate(lines) if "def twoSum" in line), None)
+    if start is None:
+        return True
+    method = [lines[start]]
+    for line in lines[start + 1:]:
+        if not line.startswith("        "):
+            break
+        method.append(line)
+    sent_lines = sent.split("\n")
+    position = 0
+    for line in method:
+        try:
+            position = sent_lines.index(line, position) + 1
+        except ValueError:
+            return False
+    return True
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analysis prompt budget benchmark")
+    parser.add_argument("--submissions", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(24)
+    shapes = [("typical", typical, 0.70), ("helpers", with_helpers, 0.15),
+              ("pasted file", pasted_file, 0.10), ("other language", other_language, 0.05)]
+    print(f"prompt budget {prompt_budget.max_prompt_tokens} tokens, static prefix {prompt_budget.prefix_tokens} "
+          f"tokens, max completion {prompt_budget.max_completion_tokens} tokens")
+
+    totals = {"old": 0, "new": 0}
+    samples = []
+    for name, make, share in shapes:
+        count = max(1, int(args.submissions * share))
+        old, new, fit_ms, intact, truncated = [], [], [], 0, 0
+        for _ in range(count):
+            code = make(rng)
+            samples.append(code)
+            old.append(estimate_tokens(old_prompt(QUESTION, code, 600)))
+            started = time.perf_counter()
+            messages, report = prompt_budget.analysis_messages(QUESTION, code, 600)
+            fit_ms.append((time.perf_counter() - started) * 1000)
+            new.append(report["estimated_prompt_tokens"])
+            truncated += report["truncated"]
+            intact += solution_intact(code, messages[1]["content"])
+        totals["old"] += sum(old)
+        totals["new"] += sum(new)
+        print(f"{name:15s} n={count:5d}   prompt tokens mean {statistics.mean(old):6.0f} -> {statistics.mean(new):5.0f}   "
+              f"p99 {percentile(old, 0.99):6.0f} -> {percentile(new, 0.99):5.0f}   "
+              f"over {CONTEXT_WINDOW} {sum(t > CONTEXT_WINDOW for t in old) / count:6.1%} -> "
+              f"{sum(t > CONTEXT_WINDOW for t in new) / count:4.1%}   trimmed {truncated / count:6.1%}   "
+              f"solution intact {intact / count:6.1%}   fit p50 {statistics.median(fit_ms):5.2f} ms "
+              f"p99 {percentile(fit_ms, 0.99):6.2f} ms")
+    print(f"all shapes: {totals['old']} -> {totals['new']} estimated prompt tokens "
+          f"({1 - totals['new'] / totals['old']:.1%} fewer)")
+
+    try:
+        import tiktoken
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"estimate not checked against a real tokenizer (tiktoken/cl100k_base unavailable: {type(e).__name__})")
+        return
+    errors = [estimate_tokens(code) / max(1, len(encoding.encode(code))) - 1 for code in samples[:500]]
+    print(f"local estimate vs cl100k_base: median error {statistics.median(errors):+.1%}   "
+          f"p5 {percentile(errors, 0.05):+.1%}   p95 {percentile(errors, 0.95):+.1%}")
+
+
+if __name__ == "__main__":
+    main()
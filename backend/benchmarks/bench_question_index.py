@@ -0,0 +1,90 @@
+"""
+Question selection latency at bank scale: QuestionIndex versus the old linear
+scan in main.get_question (lowercasing every tag of every question per call).
+
+    python benchmarks/bench_question_index.py --questions 50000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.question_index import QuestionIndex
+
+TAGS = [
+    "Array", "String", "Hash Table", "Dynamic Programming", "Math", "Sorting", "Greedy",
+    "Depth-First Search", "Binary Search", "Breadth-First Search", "Tree", "Matrix",
+    "Two Pointers", "Bit Manipulation", "Stack", "Heap", "Graph", "Design", "Prefix Sum",
+    "Simulation", "Backtracking", "Counting", "Sliding Window", "Union Find", "Linked List",
+    "Trie", "Recursion", "Divide and Conquer", "Queue", "Memoization"
+]
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+
+def make_bank(count: int, rng: random.Random):
+    return [
+        {
+            "id": f"q{i}",
+            "title": f"Question {i}",
+            "difficulty": rng.choice(DIFFICULTIES),
+            "tags": rng.sample(TAGS, rng.randint(1, 4)),
+            "weight": rng.choice([0.5, 1.0, 1.0, 2.0])
+        }
+        for i in range(count)
+    ]
+
+
+def linear_scan(bank_by_difficulty, difficulty, topic):
+    questions = bank_by_difficulty[difficulty]
+    filtered = [q for q in questions if topic.lower() in [tag.lower() for tag in q.get("tags", [])]]
+    return random.choice(filtered if filtered else questions)
+
+
+def timed(fn, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return statistics.median(samples) * 1e6, samples[int(len(samples) * 0.99) - 1] * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Question index benchmark")
+    parser.add_argument("--questions", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    bank = make_bank(args.questions, rng)
+    bank_by_difficulty = {d: [q for q in bank if q["difficulty"] == d] for d in DIFFICULTIES}
+
+    started = time.perf_counter()
+    index = QuestionIndex()
+    index.load(bank)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    seen = {f"q{i}" for i in rng.sample(range(args.questions), 200)}
+    cases = {
+        "linear scan, 1 tag (old)": lambda: linear_scan(bank_by_difficulty, "medium", "Array"),
+        "index, difficulty only": lambda: index.select("medium", rng=rng),
+        "index, 1 tag": lambda: index.select("medium", ["array"], rng=rng),
+        "index, 1 tag, 200 seen": lambda: index.select("medium", ["array"], exclude=seen, rng=rng),
+        "index, 2-tag intersection": lambda: index.select("medium", ["array", "hash table"], rng=rng),
+        "index, 3-tag intersection": lambda: index.select("hard", ["array", "sorting", "greedy"], rng=rng),
+    }
+
+    print(f"questions: {args.questions:,}   index build: {build_ms:.0f} ms")
+    for name, fn in cases.items():
+        p50, p99 = timed(fn, args.repeat if "old" not in name else max(args.repeat // 20, 20))
+        print(f"{name:28s} p50 {p50:9.1f} us   p99 {p99:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Near-duplicate question index: build time, memory and check latency at --corpus questions.
+
+Synthetic questions mix shared boilerplate sentences ("Given an array of
+integers nums ...") with Zipf-distributed filler words, so unrelated
+questions overlap the way real problem statements do. Near-duplicates are
+indexed questions under a new title with ~10% of their words replaced.
+Detection and false-positive rates are measured on the LSH index; a sample
+of queries is also answered by a brute-force pairwise Jaccard scan to show
+what the index avoids.
+
+    python benchmarks/bench_question_similarity.py --corpus 100000
+"""
+import argparse
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.services.question_similarity import QuestionSimilarityIndex, question_text
+
+BOILERPLATE = [
+    "Given an array of integers nums and an integer target",
+    "Given a string s consisting of lowercase English letters",
+    "Given the root of a binary tree",
+    "You may assume that each input would have exactly one solution",
+    "Return the answer in any order",
+    "Return the minimum number of operations required",
+    "If there is no such subarray return 0 instead",
+    "The test cases are generated so that the answer fits in a 32 bit integer",
+    "Given an m x n grid of characters board",
+    "Return true if it is possible otherwise return false",
+    "Design an algorithm that runs in O(n) time",
+    "Given a linked list return the node where the cycle begins",
+]
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def make_question(rng: random.Random, vocabulary: list, weights: list, i: int) -> dict:
+    words = rng.choices(vocabulary, weights=weights, k=rng.randint(40, 110))
+    sentences = rng.sample(BOILERPLATE, 2) + [" ".join(words)]
+    rng.shuffle(sentences)
+    title = " ".join(rng.choices(vocabulary, weights=weights, k=3)).title()
+    return {"id": f"q{i}", "title": title, "description": ". ".join(sentences)}
+
+
+def near_duplicate(rng: random.Random, vocabulary: list, question: dict) -> dict:
+    words = question["description"].split()
+    for _ in range(max(1, len(words) // 10)):
+        words[rng.randrange(len(words))] = rng.choice(vocabulary)
+    return {"id": "dup", "title": "Reworded " + rng.choice(vocabulary).title(), "description": " ".join(words)}
+
+
+def shingles(index: QuestionSimilarityIndex, question: dict) -> set:
+    words = re.findall(r"[a-z0-9]+", question_text(question).lower())
+    return set(zip(*(words[i:] for i in range(index.shingle_size))))
+
+
+def timed_checks(index: QuestionSimilarityIndex, queries: list) -> tuple:
+    latencies, hits = [], 0
+    for query in queries:
+        started = time.perf_counter()
+        hits += index.find(query) is not None
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return latencies, hits
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Question similarity index benchmark")
+    parser.add_argument("--corpus", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--brute-force-queries", type=int, default=40)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    vocabulary = make_vocabulary(rng, 5000)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    corpus = [make_question(rng, vocabulary, weights, i) for i in range(args.corpus)]
+
+    index = QuestionSimilarityIndex(threshold=args.threshold)
+    started = time.perf_counter()
+    index.add_many(corpus)
+    build_seconds = time.perf_counter() - started
+
+    tracemalloc.start()
+    measured = QuestionSimilarityIndex(threshold=args.threshold)
+    measured.add_many(corpus)
+    index_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del measured
+
+    print(f"corpus: {args.corpus} questions   bins: {index.num_bins}   bands: {index.bands}   threshold: {args.threshold}")
+    print(f"build: {build_seconds:.1f} s ({build_seconds / args.corpus * 1e6:.0f} us/question)   "
+          f"index memory: {index_bytes / 2**20:.1f} MB ({index_bytes / args.corpus:.0f} B/question)")
+
+    duplicates = [near_duplicate(rng, vocabulary, rng.choice(corpus)) for _ in range(args.queries)]
+    fresh = [make_question(rng, vocabulary, weights, args.corpus + i) for i in range(args.queries)]
+    for name, queries in [("near-duplicate", duplicates), ("new question", fresh)]:
+        latencies, hits = timed_checks(index, queries)
+        print(f"check {name:15s} p50 {statistics.median(latencies):6.0f} us   p99 {latencies[int(len(latencies) * 0.99) - 1]:6.0f} us   "
+              f"flagged {hits / len(queries):6.1%}")
+
+    # Ground truth for a sample: exact shingle Jaccard against every question
+    corpus_shingles = [shingles(index, question) for question in corpus]
+    sample = duplicates[:args.brute_force_queries // 2] + fresh[:args.brute_force_queries // 2]
+    started = time.perf_counter()
+    exact = []
+    for query in sample:
+        query_shingles = shingles(index, query)
+        exact.append(max(len(query_shingles & other) / len(query_shingles | other) for other in corpus_shingles))
+    brute_ms = (time.perf_counter() - started) * 1000 / len(sample)
+    flagged = [index.find(query) is not None for query in sample]
+    above = [f for f, similarity in zip(flagged, exact) if similarity >= args.threshold]
+    below = [f for f, similarity in zip(flagged, exact) if similarity < args.threshold]
+    print(f"brute-force pairwise Jaccard: {brute_ms:.0f} ms/check   on {len(sample)} sampled checks the index flagged "
+          f"{sum(above)}/{len(above)} at or above the threshold and {sum(below)}/{len(below)} below it")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Memory footprint of N sessions: the old Dict[str, SessionData] of pydantic
+models with ISO timestamp strings versus the compact SessionStore records.
+
+Each variant runs in its own subprocess and is measured with tracemalloc,
+so the numbers are Python heap bytes attributable to the sessions.
+
+    python benchmarks/bench_session_store.py --sessions 1000000
+"""
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def measure(variant: str, sessions: int) -> None:
+    import gc
+    import tracemalloc
+    import uuid
+    from datetime import datetime
+
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.services.session_store import SessionRecord, SessionStore
+    from main import SessionData
+
+    ids = [str(uuid.uuid4()) for _ in range(sessions)]
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    if variant == "dict":
+        store = {}
+        for session_id in ids:
+            store[session_id] = SessionData(
+                id=session_id, session_type="coding", difficulty="medium", duration=30,
+                topic=None, enable_hints=True, start_time=datetime.now().isoformat()
+            )
+    else:
+        store = SessionStore(max_sessions=sessions)
+
+        async def fill() -> None:
+            for session_id in ids:
+                await store.add(session_id, SessionRecord("coding", "medium", 30, None, True))
+
+        asyncio.run(fill())
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{variant}\t{current}\t{elapsed}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Session store memory benchmark")
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--variant", choices=["dict", "store"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        measure(args.variant, args.sessions)
+        return
+
+    results = {}
+    for variant in ("dict", "store"):
+        output = subprocess.run(
+            [sys.executable, __file__, "--sessions", str(args.sessions), "--variant", variant],
+            cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip().splitlines()[-1]
+        _, memory, elapsed = output.split("\t")
+        results[variant] = (int(memory), float(elapsed))
+
+    print(f"sessions: {args.sessions:,}")
+    for variant, label in (("dict", "Dict[str, SessionData]"), ("store", "SessionStore records")):
+        memory, elapsed = results[variant]
+        print(f"{label:24s} {memory / 2**20:9.1f} MiB  {memory / args.sessions:7.0f} B/session  "
+              f"insert {elapsed:5.2f}s")
+    print(f"reduction: {results['dict'][0] / results['store'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Time-to-first-feedback for POST /questions/submit (waits for the whole LLM
+completion) versus POST /questions/submit/stream (SSE with incremental JSON).
+
+Starts the fake OpenAI server and the API under uvicorn, then submits code for
+a question with no test cases so every request goes to the LLM tier. Each
+submission is unique so the analysis cache never answers.
+
+    python benchmarks/bench_sse_submit.py --requests 50 --latency-ms 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def start(command, port: int, env=None) -> subprocess.Popen:
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{command[0]} on port {port} did not start")
+
+
+def submission(i: int) -> dict:
+    code = f"def solve(nums):\n    total = {i}\n    for n in nums:\n        total += n\n    return total\n"
+    return {"question_id": "bench-unbanked", "user_code": code, "time_taken_seconds": 600}
+
+
+async def blocking(client: httpx.AsyncClient, i: int) -> dict:
+    started = time.perf_counter()
+    response = await client.post("/questions/submit", json=submission(i))
+    response.raise_for_status()
+    elapsed = time.perf_counter() - started
+    return {"first_feedback": elapsed, "done": elapsed}
+
+
+async def streaming(client: httpx.AsyncClient, i: int) -> dict:
+    started = time.perf_counter()
+    timings = {}
+    event = None
+    async with client.stream("POST", "/questions/submit/stream", json=submission(i)) as response:
+        async for line in response.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                now = time.perf_counter() - started
+                timings.setdefault(event, now)
+                if event == "item":
+                    timings.setdefault("first_feedback", now)
+                if event == "done":
+                    timings["done"] = now
+                    assert json.loads(line[6:])["analysis_tier"] == "llm"
+    return timings
+
+
+async def run_mode(base_url: str, mode, requests: int, concurrency: int, offset: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            results.append(await mode(client, i))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        await asyncio.gather(*(one(offset + i) for i in range(requests)))
+    return results
+
+
+def summarize(results, key: str) -> str:
+    values = sorted(r[key] for r in results if key in r)
+    return f"p50 {statistics.median(values) * 1000:7.0f} ms   p95 {values[int(len(values) * 0.95) - 1] * 1000:7.0f} ms"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SSE submit benchmark")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=2000)
+    parser.add_argument("--ttft-ms", type=float, default=200)
+    parser.add_argument("--fake-port", type=int, default=8021)
+    parser.add_argument("--api-port", type=int, default=8022)
+    args = parser.parse_args()
+
+    fake = start([sys.executable, "benchmarks/fake_openai_server.py", "--port", str(args.fake_port),
+                  "--latency-ms", str(args.latency_ms), "--jitter-ms", "0", "--ttft-ms", str(args.ttft_ms)],
+                 args.fake_port)
+    database = Path(tempfile.mkdtemp()) / "bench.db"
+    env = dict(os.environ, OPENAI_API_KEY="fake", OPENAI_BASE_URL=f"http://127.0.0.1:{args.fake_port}/v1",
+               DATABASE_URL=f"sqlite:///{database}", ANALYSIS_CACHE_DB_PATH="")
+    api = start([sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port), "--log-level", "warning"],
+                args.api_port, env)
+    try:
+        base_url = f"http://127.0.0.1:{args.api_port}"
+        results = {
+            "blocking": asyncio.run(run_mode(base_url, blocking, args.requests, args.concurrency, 0)),
+            "streaming": asyncio.run(run_mode(base_url, streaming, args.requests, args.concurrency, args.requests))
+        }
+    finally:
+        api.terminate()
+        fake.terminate()
+
+    print(f"requests: {args.requests}   concurrency: {args.concurrency}   "
+          f"LLM latency: {args.latency_ms:.0f} ms (first token {args.ttft_ms:.0f} ms)")
+    print(f"/submit          first feedback {summarize(results['blocking'], 'first_feedback')}")
+    print(f"/submit/stream   local result   {summarize(results['streaming'], 'local')}")
+    print(f"/submit/stream   first score    {summarize(results['streaming'], 'field')}")
+    print(f"/submit/stream   first feedback {summarize(results['streaming'], 'first_feedback')}")
+    print(f"/submit/stream   done           {summarize(results['streaming'], 'done')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Local OpenAI-compatible server for offline load testing.
+
+Answers POST /v1/chat/completions with canned question/analysis JSON after a
+configurable delay (streamed as chat.completion.chunk events when the request
+sets stream), or with a 429 past --rate-limit requests per second, so the real
+AsyncOpenAI client path can be exercised without network access or API spend.
+
+    python benchmarks/fake_openai_server.py --port 8001 --latency-ms 800
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+app = FastAPI(title="Fake OpenAI")
+app.state.latency_ms = 500.0
+app.state.jitter_ms = 100.0
+app.state.ttft_ms = 150.0
+app.state.requests = 0
+app.state.rate_limit = 0.0
+app.state.rate_limited = 0
+app.state.window = []
+
+FAKE_QUESTION = {
+    "id": "fake_question",
+    "title": "Merge Intervals",
+    "description": "Given an array of intervals, merge all overlapping intervals.",
+    "examples": [
+        {
+            "input": "intervals = [[1,3],[2,6],[8,10]]",
+            "output": "[[1,6],[8,10]]",
+            "explanation": "Intervals [1,3] and [2,6] overlap."
+        }
+    ],
+    "constraints": ["1 <= intervals.length <= 10^4"],
+    "difficulty": "medium",
+    "tags": ["Array", "Sorting"],
+    "time_limit_minutes": 25,
+    "hints": ["Sort by start time"]
+}
+
+FAKE_ANALYSIS = {
+    "correctness_score": 82,
+    "efficiency_score": 74,
+    "code_quality_score": 79,
+    "time_management_score": 88,
+    "overall_score": 80,
+    "feedback": ["Clear variable names", "Handles the main case correctly"],
+    "improvements": ["Cover empty input", "Avoid the nested loop"],
+    "time_complexity": "O(n log n)",
+    "space_complexity": "O(n)",
+    "interview_tips": ["State your complexity before coding"]
+}
+
+
+def _completion(content: str, model: str, prompt: str) -> Dict[str, Any]:
+    prompt_tokens = len(prompt) // 4
+    completion_tokens = len(content) // 4
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+async def _stream(content: str, model: str, total_seconds: float):
+    """Same total latency as the non-streamed call: first token after --ttft-ms, the rest spread out"""
+    ttft = min(app.state.ttft_ms / 1000, total_seconds)
+    tokens = [content[i:i + 4] for i in range(0, len(content), 4)]
+    per_token = (total_seconds - ttft) / max(len(tokens), 1)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    await asyncio.sleep(ttft)
+    for index, token in enumerate(tokens):
+        if index:
+            await asyncio.sleep(per_token)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    app.state.requests += 1
+    if app.state.rate_limit:
+        # Sliding one-second window, answered like the real API's 429
+        now = time.monotonic()
+        app.state.window = [t for t in app.state.window if now - t < 1.0]
+        if len(app.state.window) >= app.state.rate_limit:
+            app.state.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429
+            )
+        app.state.window.append(now)
+    prompt = " ".join(m.get("content", "") for m in body.get("messages", []))
+    payload = FAKE_ANALYSIS if "correctness_score" in prompt else FAKE_QUESTION
+
+    delay = app.state.latency_ms + random.uniform(-app.state.jitter_ms, app.state.jitter_ms)
+    if body.get("stream"):
+        return StreamingResponse(
+            _stream(json.dumps(payload), body.get("model", "fake-model"), max(0.0, delay) / 1000),
+            media_type="text/event-stream"
+        )
+    await asyncio.sleep(max(0.0, delay) / 1000)
+    return _completion(json.dumps(payload), body.get("model", "fake-model"), prompt)
+
+
+@app.get("/stats")
+async def stats():
+    return {"requests": app.state.requests, "rate_limited": app.state.rate_limited}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--ttft-ms", type=float, default=150.0, help="time to first token when streaming")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before answering 429 (0 = off)")
+    args = parser.parse_args()
+
+    app.state.latency_ms = args.latency_ms
+    app.state.jitter_ms = args.jitter_ms
+    app.state.ttft_ms = args.ttft_ms
+    app.state.rate_limit = args.rate_limit
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,207 @@
+"""
+Live session load test: how many concurrent WebSocket sessions one uvicorn worker can hold.
+
+Starts `uvicorn main:app` (one worker, fresh SQLite files), then ramps up
+through --steps open /api/sessions/{id}/live connections. Every connection
+receives the server's timer ticks; --probes of them also ping once a
+second. At each step, over --window seconds, it records:
+- tick lateness: when the server built a tick, and when it arrived, vs.
+  the deadline minus the remaining time it reports
+- ping round trips
+- the server's RSS and CPU use
+
+A step counts as held when no connection dropped and the p99 of ticks sent
+late stays under --max-latency-ms. The ramp stops at the first step that
+misses this.
+
+The load generator runs on the same machine. On few cores its own work
+competes with the server, and arrival and ping times include the client's
+event-loop lag, so the numbers are a lower bound.
+--deflate keeps permessage-deflate on, which is what browsers negotiate by
+default.
+
+    python benchmarks/load_live_sessions.py --steps 1000,2500,5000,10000,15000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import websockets
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+class Stats:
+    def __init__(self):
+        self.connected = 0
+        self.dropped = 0
+        self.recording = False
+        self.tick_lateness = []
+        self.server_lateness = []
+        self.rtts = []
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)] if values else float("nan")
+
+
+def rss_kb(pid: int) -> int:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmRSS:"):
+            return int(line.split()[1])
+    return 0
+
+
+def cpu_seconds(pid: int) -> float:
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def start_server(port: int, deflate: bool) -> subprocess.Popen:
+    workdir = Path(tempfile.mkdtemp())
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir / 'app.db'}", STATE_DB_PATH=str(workdir / "state.db"),
+               ANALYSIS_CACHE_DB_PATH="", LIVE_SESSION_MAX_CONNECTIONS="100000", METRICS_ENABLED="False")
+    command = [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning",
+               "--ws", "websockets", "--backlog", "4096"]
+    if not deflate:
+        command += ["--ws-per-message-deflate", "false"]
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.05)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def create_sessions(base: str, count: int) -> list:
+    async with httpx.AsyncClient(base_url=base, timeout=30) as client:
+        semaphore = asyncio.Semaphore(50)
+
+        async def create() -> str:
+            async with semaphore:
+                response = await client.post("/api/sessions", json={"duration": 120})
+                return response.json()["session_id"]
+
+        return await asyncio.gather(*(create() for _ in range(count)))
+
+
+async def live_client(url: str, stats: Stats, probe: bool, deflate: bool, opened: asyncio.Semaphore) -> None:
+    try:
+        async with opened:
+            ws = await websockets.connect(url, ping_interval=None, max_size=2**20,
+                                          compression="deflate" if deflate else None, open_timeout=60)
+            deadline_ms = json.loads(await ws.recv())["deadline_ms"]
+        stats.connected += 1
+        pinger = asyncio.create_task(ping_loop(ws)) if probe else None
+        try:
+            async for raw in ws:
+                arrived_ms = time.time() * 1000
+                message = json.loads(raw)
+                if not stats.recording:
+                    continue
+                if message["type"] == "tick":
+                    due_ms = deadline_ms - message["remaining_seconds"] * 1000
+                    stats.tick_lateness.append(arrived_ms - due_ms)
+                    stats.server_lateness.append(message["server_time_ms"] - due_ms)
+                elif message["type"] == "pong":
+                    stats.rtts.append(arrived_ms - message["id"])
+        finally:
+            if pinger is not None:
+                pinger.cancel()
+    except (OSError, websockets.WebSocketException, asyncio.TimeoutError):
+        stats.dropped += 1
+    else:
+        stats.dropped += 1  # The server closed a session that should still be running
+
+
+async def ping_loop(ws) -> None:
+    await asyncio.sleep(random.random())
+    while True:
+        # "id" is echoed back, so it carries the send time
+        await ws.send(json.dumps({"type": "ping", "id": time.time() * 1000}))
+        await asyncio.sleep(1)
+
+
+async def run(args) -> None:
+    proc = start_server(args.port, args.deflate)
+    base = f"http://127.0.0.1:{args.port}"
+    stats = Stats()
+    clients = []
+    opened = asyncio.Semaphore(200)
+    held = 0
+    try:
+        await asyncio.sleep(1)
+        baseline_kb = rss_kb(proc.pid)
+        print(f"server pid {proc.pid}   baseline RSS {baseline_kb / 1024:.0f} MB   permessage-deflate "
+              f"{'on' if args.deflate else 'off'}   CPUs {os.cpu_count()}")
+        for step in [int(n) for n in args.steps.split(",")]:
+            started = time.perf_counter()
+            session_ids = await create_sessions(base, step - len(clients))
+            for session_id in session_ids:
+                probe = len(clients) < args.probes
+                url = f"ws://127.0.0.1:{args.port}/api/sessions/{session_id}/live"
+                clients.append(asyncio.create_task(live_client(url, stats, probe, args.deflate, opened)))
+            while stats.connected + stats.dropped < len(clients):
+                await asyncio.sleep(0.1)
+            ramp = time.perf_counter() - started
+
+            await asyncio.sleep(2)  # let the ramp settle
+            stats.tick_lateness.clear()
+            stats.server_lateness.clear()
+            stats.rtts.clear()
+            cpu_before, wall_before = cpu_seconds(proc.pid), time.perf_counter()
+            stats.recording = True
+            await asyncio.sleep(args.window)
+            stats.recording = False
+            cpu = (cpu_seconds(proc.pid) - cpu_before) / (time.perf_counter() - wall_before)
+            rss = rss_kb(proc.pid)
+
+            server_p99 = percentile(stats.server_lateness, 0.99)
+            print(f"{stats.connected:>6} live   opened in {ramp:5.1f} s   RSS {rss / 1024:6.0f} MB "
+                  f"({(rss - baseline_kb) / max(stats.connected, 1):5.1f} KB/conn)   server CPU {cpu:6.1%}   "
+                  f"tick sent late p50 {percentile(stats.server_lateness, 0.5):6.1f} ms p99 {server_p99:7.1f} ms   "
+                  f"tick arrived late p50 {percentile(stats.tick_lateness, 0.5):6.1f} ms "
+                  f"p99 {percentile(stats.tick_lateness, 0.99):7.1f} ms   "
+                  f"ping p50 {percentile(stats.rtts, 0.5):6.1f} ms p99 {percentile(stats.rtts, 0.99):7.1f} ms   "
+                  f"dropped {stats.dropped}")
+            if stats.dropped or not server_p99 < args.max_latency_ms:
+                break
+            held = stats.connected
+        print(f"one worker held {held} concurrent live sessions "
+              f"(p99 of ticks sent under {args.max_latency_ms:.0f} ms late, nothing dropped)")
+    finally:
+        for client in clients:
+            client.cancel()
+        await asyncio.gather(*clients, return_exceptions=True)
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Live session WebSocket load test")
+    parser.add_argument("--steps", default="1000,2500,5000,10000,15000")
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--window", type=float, default=10)
+    parser.add_argument("--max-latency-ms", type=float, default=250)
+    parser.add_argument("--port", type=int, default=8041)
+    parser.add_argument("--deflate", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Where `import main` spends its time, from `python -X importtime`.
+
+Prints the slowest modules by cumulative time (a package's time includes
+everything it imports), self time summed per top-level package, and which
+heavy optional packages got imported at all; everything runs in a fresh
+interpreter so nothing is already cached in sys.modules.
+
+    python benchmarks/profile_imports.py --top 25
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Packages that should only load when a feature first needs them
+DEFERRED = ["openai", "httpx"]
+
+
+def importtime(module: str, env: dict) -> list:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip())))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time profile")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{workdir / 'app.db'}", STATE_DB_PATH=str(workdir / "state.db"))
+    rows = importtime(args.module, env)
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms over {len(rows)} modules (importtime adds overhead)\n")
+    print(f"slowest {args.top} by cumulative time")
+    for name, _, cumulative_us, indent in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {' ' * (indent - 1)}{name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print("\nself time per top-level package")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {package}")
+
+    imported = {name.split(".")[0] for name, _, _, _ in rows}
+    print("\ndeferred packages imported: " + (", ".join(p for p in DEFERRED if p in imported) or "none"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,85 @@
+import asyncio
 import os
 import json
 import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import random
+from fastapi.responses import Response
+from pydantic import BaseModel, ValidationError
 
 # Environment setup
 from dotenv import load_dotenv
 load_dotenv()
 
+from app.config import settings as app_settings
+from app.database import init_db
+from app.routes import interview, questions
+from app.services.ai_service import ai_service
+from app.services.analysis_pipeline import analysis_pipeline
+from app.services.code_runner import code_runner
+from app.services.fast_json import JSON_MEDIA_TYPE, ORJSONResponse, StaticJSON
+from app.services.live_sessions import CLOSE_POLICY_VIOLATION, LiveConnection, live_sessions
+from app.services.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+from app.services.progress_rollups import PERIODS, progress_rollups
+from app.services.question_index import public_question, question_index
+from app.services.question_pool import question_pool
+from app.services.question_similarity import question_similarity
+from app.services.session_store import ACTIVE, SessionRecord, now_ms, session_store
+from app.services.submission_writer import SubmissionQueueFull, submission_row, submission_writer
+from app.services.user_stats import user_stats
+
+# Bundled question bank, kept as data so importing main doesn't build it
+QUESTION_BANK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app", "data", "questions.json")
+
+def load_question_bank():
+    """Build the question index once; lookups never rescan the bank"""
+    question_index.load_file(QUESTION_BANK_FILE)
+    if app_settings.QUESTION_BANK_PATH:
+        question_index.load_file(app_settings.QUESTION_BANK_PATH)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the shared services before serving, stop them on shutdown
+    
+    /health isn't answered until start-up finishes, so only what the first
+    requests need runs inline; the sandbox workers fork in the background and
+    submissions that arrive first wait on the runner's queue for them.
+    """
+    await asyncio.to_thread(init_db)
+    load_question_bank()
+    # Generated questions are checked against the bank; a large bank is hashed off the event loop
+    similarity_loaded = asyncio.create_task(
+        asyncio.to_thread(question_similarity.add_many, list(question_index.questions.values()))
+    )
+    # Shared-state tables are created here rather than at import
+    await user_stats.start()
+    await session_store.start()
+    await submission_writer.start()
+    if app_settings.AI_ANALYSIS_ENABLED:
+        question_pool.start()
+    code_runner_started = asyncio.create_task(code_runner.start())
+    
+    yield
+    
+    await question_pool.stop()
+    # Drain queued submissions first, while the database is still there
+    await submission_writer.stop()
+    await session_store.stop()
+    await similarity_loaded
+    await code_runner_started
+    await code_runner.stop()
+    await ai_service.aclose()
+
 app = FastAPI(
     title="FAANG AI Interviewer API",
     description="AI-powered technical interview practice platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 origins = [
@@ -33,8 +96,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Outermost, so latency covers CORS handling and the in-flight gauge every request
+if app_settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+app.include_router(questions.router)
+app.include_router(interview.router)
+
 # Data Models
 class InterviewSettings(BaseModel):
     session_type: str = "coding"
@@ -62,234 +133,317 @@ class SessionData(BaseModel):
     duration_minutes: Optional[int] = None
     questions_attempted: int = 0
 
-# In-memory storage (replace with database in production)
-sessions_db: Dict[str, SessionData] = {}
-user_stats_db = {
-    "total_attempts": 0,
-    "average_score": 0,
-    "problems_solved": 0,
-    "favorite_difficulty": "medium",
-    "improvement_areas": ["Dynamic Programming", "System Design"],
-    "recent_sessions": []
-}
-
-# Mock Questions Database
-QUESTIONS_DB = {
-    "easy": [
-        {
-            "id": "two-sum",
-            "title": "Two Sum",
-            "description": "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target.",
-            "difficulty": "easy",
-            "time_limit_minutes": 15,
-            "examples": [
-                {
-                    "input": "nums = [2,7,11,15], target = 9",
-                    "output": "[0,1]",
-                    "explanation": "Because nums[0] + nums[1] == 9, we return [0, 1]."
-                }
-            ],
-            "constraints": [
-                "2 <= nums.length <= 10^4",
-                "-10^9 <= nums[i] <= 10^9",
-                "-10^9 <= target <= 10^9"
-            ],
-            "tags": ["Array", "Hash Table"],
-            "hints": ["Try using a hash map to store values and their indices"]
-        }
-    ],
-    "medium": [
-        {
-            "id": "longest-substring",
-            "title": "Longest Substring Without Repeating Characters",
-            "description": "Given a string s, find the length of the longest substring without repeating characters.",
-            "difficulty": "medium",
-            "time_limit_minutes": 25,
-            "examples": [
-                {
-                    "input": 's = "abcabcbb"',
-                    "output": "3",
-                    "explanation": 'The answer is "abc", with the length of 3.'
-                }
-            ],
-            "constraints": [
-                "0 <= s.length <= 5 * 10^4",
-                "s consists of English letters, digits, symbols and spaces."
-            ],
-            "tags": ["Hash Table", "String", "Sliding Window"],
-            "hints": ["Use sliding window technique", "Keep track of character positions"]
-        }
-    ],
-    "hard": [
-        {
-            "id": "median-sorted-arrays",
-            "title": "Median of Two Sorted Arrays",
-            "description": "Given two sorted arrays nums1 and nums2 of size m and n respectively, return the median of the two sorted arrays.",
-            "difficulty": "hard",
-            "time_limit_minutes": 35,
-            "examples": [
-                {
-                    "input": "nums1 = [1,3], nums2 = [2]",
-                    "output": "2.00000",
-                    "explanation": "merged array = [1,2,3] and median is 2."
-                }
-            ],
-            "constraints": [
-                "nums1.length == m",
-                "nums2.length == n",
-                "0 <= m <= 1000",
-                "0 <= n <= 1000"
-            ],
-            "tags": ["Array", "Binary Search", "Divide and Conquer"],
-            "hints": ["Think about binary search", "Consider the smaller array"]
-        }
-    ]
-}
+def iso_from_ms(epoch_ms: int) -> str:
+    return datetime.fromtimestamp(epoch_ms / 1000).isoformat()
+
+def to_session_data(session_id: str, record: SessionRecord) -> SessionData:
+    """Expand a compact store record into the API model"""
+    return SessionData(
+        id=session_id,
+        session_type=record.session_type,
+        difficulty=record.difficulty,
+        duration=record.duration,
+        topic=record.topic,
+        enable_hints=record.enable_hints,
+        status=record.status,
+        start_time=iso_from_ms(record.start_ms),
+        end_time=iso_from_ms(record.end_ms) if record.end_ms is not None else None,
+        duration_minutes=record.duration_minutes,
+        questions_attempted=record.questions_attempted
+    )
+
+async def record_expired_session(record: SessionRecord) -> None:
+    await user_stats.record_session_end(record.duration_minutes)
+
+session_store.on_expire = record_expired_session
+
+# Payloads that never change are encoded once and served with an ETag
+ROOT_PAYLOAD = StaticJSON({
+    "message": "FAANG AI Interviewer API",
+    "version": "1.0.0",
+    "status": "running",
+    "docs": "/docs"
+})
+
+QUESTION_CATEGORIES = StaticJSON([
+    "arrays", "strings", "trees", "graphs", "dynamic-programming",
+    "linked-lists", "hash-tables", "sorting", "searching", "recursion"
+])
 
 # API Endpoints
 @app.get("/")
-async def root():
-    return {
-        "message": "FAANG AI Interviewer API", 
-        "version": "1.0.0",
-        "status": "running",
-        "docs": "/docs"
-    }
+async def root(request: Request):
+    return ROOT_PAYLOAD.response(request)
 
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.post("/api/sessions")
 async def create_session(settings: InterviewSettings):
     session_id = str(uuid.uuid4())
-    session = SessionData(
-        id=session_id,
+    record = SessionRecord(
         session_type=settings.session_type,
         difficulty=settings.difficulty,
         duration=settings.duration,
         topic=settings.topic,
-        enable_hints=settings.enable_hints,
-        start_time=datetime.now().isoformat()
+        enable_hints=settings.enable_hints
     )
     
-    sessions_db[session_id] = session
-    return {"session_id": session_id, "session": session}
+    await session_store.add(session_id, record)
+    await user_stats.record_session_start(session_id)
+    return {"session_id": session_id, "session": to_session_data(session_id, record)}
 
 @app.get("/api/sessions/{session_id}")
 async def get_session(session_id: str):
-    if session_id not in sessions_db:
+    record = await session_store.get(session_id)
+    if record is None:
         raise HTTPException(status_code=404, detail="Session not found")
-    return sessions_db[session_id]
+    return to_session_data(session_id, record)
+
+async def finish_session(session_id: str) -> SessionData:
+    """Complete a session (counted in user stats once); ending an ended session just returns it"""
+    record = await session_store.complete(session_id)
+    if record is None:
+        record = await session_store.peek(session_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        return to_session_data(session_id, record)
+    
+    await user_stats.record_session_end(record.duration_minutes)
+    return to_session_data(session_id, record)
 
 @app.post("/api/sessions/{session_id}/end")
 async def end_session(session_id: str):
-    if session_id not in sessions_db:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session = sessions_db[session_id]
-    session.status = "completed"
-    session.end_time = datetime.now().isoformat()
-    
-    start_time = datetime.fromisoformat(session.start_time.replace('Z', '+00:00'))
-    end_time = datetime.fromisoformat(session.end_time.replace('Z', '+00:00'))
-    session.duration_minutes = int((end_time - start_time).total_seconds() / 60)
-    
-    return {"message": "Session ended", "session": session}
+    return {"message": "Session ended", "session": await finish_session(session_id)}
 
-@app.get("/api/questions")
-async def get_question(difficulty: str = "medium", topic: Optional[str] = None):
-    if difficulty not in QUESTIONS_DB:
+async def select_question(difficulty: str, topic: Optional[str] = None, session_id: Optional[str] = None) -> Dict[str, Any]:
+    if not question_index.has_difficulty(difficulty):
         raise HTTPException(status_code=400, detail="Invalid difficulty level")
     
-    questions = QUESTIONS_DB[difficulty]
-    if topic and questions:
-        # Filter by topic if specified
-        filtered = [q for q in questions if topic.lower() in [tag.lower() for tag in q.get("tags", [])]]
-        questions = filtered if filtered else questions
+    # Skip questions this session has already been served
+    record = await session_store.get(session_id) if session_id else None
+    seen = record.seen_questions if record is not None and record.seen_questions else ()
+    
+    question = None
+    if topic:
+        # Comma-separated topics must all match
+        tags = [tag for tag in topic.split(",") if tag.strip()]
+        question = question_index.select(difficulty, tags, exclude=seen)
+    if question is None:
+        question = question_index.select(difficulty, exclude=seen)
+    if question is None and seen:
+        question = question_index.select(difficulty)
     
-    if not questions:
+    if question is None:
         raise HTTPException(status_code=404, detail="No questions found")
     
-    return random.choice(questions)
+    if record is not None:
+        await session_store.mark_seen(session_id, question["id"])
+    return question
+
+@app.get("/api/questions")
+async def get_question(difficulty: str = "medium", topic: Optional[str] = None, session_id: Optional[str] = None):
+    # Random pick, so no ETag; the bytes are still encoded only once per question
+    question = await select_question(difficulty, topic, session_id)
+    return Response(question_index.encoded(question["id"]), media_type=JSON_MEDIA_TYPE)
 
 @app.get("/api/questions/categories")
-async def get_question_categories():
-    categories = [
-        "arrays", "strings", "trees", "graphs", "dynamic-programming",
-        "linked-lists", "hash-tables", "sorting", "searching", "recursion"
-    ]
-    return categories
+async def get_question_categories(request: Request):
+    return QUESTION_CATEGORIES.response(request)
 
-@app.post("/api/submissions")
-async def submit_code(submission: CodeSubmission):
-    # Simulate AI analysis
-    analysis_score = random.randint(60, 95)
+async def grade_submission(submission: CodeSubmission) -> Dict[str, Any]:
+    # Same grading as POST /questions/submit: tests and static analysis first, the LLM only when needed
+    question = questions.submission_question(submission.question_id)
+    analysis, tier, _ = await analysis_pipeline.analyze(
+        question=question,
+        user_code=submission.user_code,
+        time_taken=submission.time_taken_seconds
+    )
+    analysis_score = analysis["overall_score"]
     
-    analysis = {
-        "overall_score": analysis_score,
-        "correctness_score": min(100, analysis_score + random.randint(-5, 10)),
-        "efficiency_score": min(100, analysis_score + random.randint(-10, 5)),
-        "code_quality_score": min(100, analysis_score + random.randint(-5, 8)),
-        "time_management_score": min(100, analysis_score + random.randint(-8, 12)),
-        "time_complexity": random.choice(["O(1)", "O(log n)", "O(n)", "O(n log n)", "O(n²)"]),
-        "space_complexity": random.choice(["O(1)", "O(n)", "O(log n)"]),
-        "feedback": [
-            "Good problem-solving approach",
-            "Code structure is clear and readable",
-            "Appropriate use of data structures"
-        ],
-        "improvements": [
-            "Consider edge cases more thoroughly",
-            "Add input validation",
-            "Optimize for better time complexity"
-        ],
-        "interview_tips": [
-            "Always clarify requirements before coding",
-            "Think about edge cases early",
-            "Explain your approach before implementation",
-            "Test with multiple examples"
-        ]
-    }
+    session = await session_store.get(submission.session_id) if submission.session_id else None
+    difficulty = session.difficulty if session else question.get("difficulty")
     
-    # Update user stats
-    user_stats_db["total_attempts"] += 1
-    user_stats_db["problems_solved"] += 1 if analysis_score >= 70 else 0
+    submission_id = str(uuid.uuid4())
+    try:
+        await submission_writer.save(submission_row(
+            submission_id, submission.question_id, submission.user_code, submission.time_taken_seconds,
+            analysis, tier, submission.session_id, difficulty, question.get("tags")
+        ))
+    except SubmissionQueueFull:
+        raise HTTPException(status_code=503, detail="Too many submissions in flight", headers={"Retry-After": "1"})
     
-    # Calculate new average
-    current_avg = user_stats_db["average_score"]
-    total_attempts = user_stats_db["total_attempts"]
-    user_stats_db["average_score"] = int((current_avg * (total_attempts - 1) + analysis_score) / total_attempts)
+    # Counted only once saved, so a 503 and its retry don't count the attempt twice
+    await user_stats.record_submission(analysis_score, difficulty)
     
     return {
-        "submission_id": str(uuid.uuid4()),
+        "submission_id": submission_id,
         "success": True,
         "analysis": analysis,
-        "ai_powered": True
+        "analysis_tier": tier,
+        "ai_powered": tier == "llm"
     }
 
+@app.post("/api/submissions")
+async def submit_code(submission: CodeSubmission):
+    return await grade_submission(submission)
+
 @app.get("/api/user/stats")
 async def get_user_stats():
-    # Add some recent sessions
     recent_sessions = []
-    for i, (session_id, session) in enumerate(list(sessions_db.items())[-5:]):
+    for session_id in await user_stats.recent_session_ids():
+        record = await session_store.peek(session_id)
+        if record is None:
+            continue
         recent_sessions.append({
             "id": session_id,
-            "session_type": session.session_type,
-            "status": session.status,
-            "start_time": session.start_time,
-            "end_time": session.end_time,
-            "duration_minutes": session.duration_minutes or session.duration,
-            "questions_attempted": session.questions_attempted or 1
+            "session_type": record.session_type,
+            "status": record.status,
+            "start_time": iso_from_ms(record.start_ms),
+            "end_time": iso_from_ms(record.end_ms) if record.end_ms is not None else None,
+            "duration_minutes": record.duration_minutes or record.duration,
+            "questions_attempted": record.questions_attempted or 1
         })
     
+    # Weakest tags over the last 30 days, from the rollups rather than a scan of submissions
+    dashboard = await progress_rollups.dashboard("day", 30)
+    
     return {
-        **user_stats_db,
+        **(await user_stats.snapshot()),
+        "improvement_areas": dashboard["improvement_areas"],
         "recent_sessions": recent_sessions
     }
 
+@app.get("/api/user/dashboard")
+async def get_user_dashboard(period: str = "day", periods: int = 30):
+    """Progress chart series per day/week, overall and by difficulty and tag, from the precomputed rollups"""
+    if period not in PERIODS:
+        raise HTTPException(status_code=400, detail=f"period must be one of: {', '.join(PERIODS)}")
+    if not 1 <= periods <= 366:
+        raise HTTPException(status_code=400, detail="periods must be between 1 and 366")
+    return await progress_rollups.dashboard(period, periods)
+
+# Live session channel
+def live_reply(connection: LiveConnection, request: Dict[str, Any], message: Dict[str, Any]) -> None:
+    """Send a reply, echoing the request's "id" so clients can match it up"""
+    if "id" in request:
+        message["id"] = request["id"]
+    connection.send(message)
+
+async def live_submit(connection: LiveConnection, request: Dict[str, Any], submission: CodeSubmission) -> None:
+    try:
+        result = await grade_submission(submission)
+    except HTTPException as e:
+        live_reply(connection, request, {"type": "error", "request": "submit", "status": e.status_code, "detail": e.detail})
+        return
+    live_reply(connection, request, {"type": "result", **result})
+
+async def handle_live_message(connection: LiveConnection, request: Dict[str, Any]) -> None:
+    kind = request.get("type")
+    session_id = connection.session_id
+    try:
+        if kind == "ping":
+            live_reply(connection, request, {"type": "pong", "server_time_ms": now_ms()})
+        elif kind == "question":
+            record = await session_store.get(session_id)
+            if record is None or record.status != ACTIVE:
+                raise HTTPException(status_code=409, detail="Session has ended")
+            question = await select_question(request.get("difficulty") or record.difficulty,
+                                       request.get("topic") or record.topic, session_id)
+            connection.questions_served_ms[question["id"]] = now_ms()
+            live_reply(connection, request, {"type": "question", "question": public_question(question)})
+        elif kind == "hint":
+            record = await session_store.get(session_id)
+            if record is None or not record.enable_hints:
+                raise HTTPException(status_code=403, detail="Hints are disabled for this session")
+            question_id = str(request.get("question_id", ""))
+            question = question_index.get(question_id)
+            if question is None:
+                raise HTTPException(status_code=404, detail="Question not found")
+            hints = question.get("hints") or []
+            given = connection.hints_given.get(question_id, 0)
+            hint = hints[given] if given < len(hints) else None
+            if hint is not None:
+                given = connection.hints_given[question_id] = given + 1
+            live_reply(connection, request, {
+                "type": "hint", "question_id": question_id, "hint": hint, "remaining": len(hints) - given
+            })
+        elif kind == "submit":
+            if now_ms() >= connection.deadline_ms:
+                raise HTTPException(status_code=409, detail="Time is up")
+            if connection.grading is not None and not connection.grading.done():
+                raise HTTPException(status_code=409, detail="A submission is already being graded")
+            question_id = str(request.get("question_id", ""))
+            # Time on the question is measured here, from when this channel served it
+            served_ms = connection.questions_served_ms.get(question_id)
+            time_taken = (now_ms() - served_ms) // 1000 if served_ms is not None else request.get("time_taken_seconds", 0)
+            try:
+                submission = CodeSubmission(
+                    question_id=question_id, user_code=request.get("user_code"),
+                    time_taken_seconds=time_taken, session_id=session_id
+                )
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+            # Graded off the receive loop, so ticks, pings and hints keep flowing meanwhile
+            connection.grading = asyncio.create_task(live_submit(connection, request, submission))
+        elif kind == "end":
+            # A submission still being graded gets its result before the session ends
+            await connection.settle()
+            live_reply(connection, request, {"type": "ended", "session": (await finish_session(session_id)).model_dump()})
+            connection.finish()
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown message type: {kind}")
+    except HTTPException as e:
+        live_reply(connection, request, {"type": "error", "request": kind, "status": e.status_code, "detail": e.detail})
+
+async def live_time_up(connection: LiveConnection) -> List[Dict[str, Any]]:
+    """The server's clock ran out: end the session and tell the client"""
+    try:
+        session = await finish_session(connection.session_id)
+    except HTTPException:
+        return [{"type": "time_up"}]  # Evicted meanwhile; nothing left to end
+    return [{"type": "time_up"}, {"type": "ended", "session": session.model_dump()}]
+
+@app.websocket("/api/sessions/{session_id}/live")
+async def live_session(websocket: WebSocket, session_id: str):
+    """One connection for the whole interview, instead of polling and client-side timers
+    
+    Server -> client: "session" on connect, "tick" every LIVE_SESSION_TICK_SECONDS
+    with the authoritative remaining time, then "time_up" and "ended" when it
+    runs out. Client -> server (replies echo an optional "id"):
+    {"type": "question", "difficulty"?, "topic"?} -> "question";
+    {"type": "hint", "question_id"} -> "hint" (the bank's hints, one at a time);
+    {"type": "submit", "question_id", "user_code"} -> "result", graded like
+    POST /api/submissions with time measured from when the question was served
+    (a submission made before the deadline, or before the client leaves, is
+    still graded and saved, and its "result" precedes "time_up"/"ended");
+    {"type": "end"} -> "ended"; {"type": "ping"} -> "pong". Failures come back
+    as {"type": "error", "status", "detail"}.
+    """
+    record = await session_store.get(session_id)
+    if record is None or record.status != ACTIVE:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION, reason="Session not found or already ended")
+        return
+    
+    deadline_ms = record.start_ms + record.duration * 60000
+    current_ms = now_ms()
+    hello = {
+        "type": "session",
+        "session": to_session_data(session_id, record).model_dump(),
+        "deadline_ms": deadline_ms,
+        "remaining_seconds": max(0, round((deadline_ms - current_ms) / 1000)),
+        "server_time_ms": current_ms
+    }
+    await live_sessions.serve(websocket, session_id, deadline_ms, hello, handle_live_message, live_time_up)
+
 # Production server configuration
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=False)
\ No newline at end of file
+    # Live session frames are small JSON; per-connection deflate contexts cost ~100 KB each for no gain
+    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=False, ws="websockets", ws_per_message_deflate=False)
\ No newline at end of file
@@ -0,0 +1,9 @@
+"""Test settings: a throwaway database and no OpenAI key, set before the app is imported"""
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="faang-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/app.db"
+os.environ["STATE_DB_PATH"] = os.path.join(_workdir, "state.db")
+os.environ["OPENAI_API_KEY"] = ""
+os.environ["METRICS_ENABLED"] = "False"
@@ -0,0 +1,143 @@
+import asyncio
+
+from app.config import settings
+from app.services import analysis_pipeline as pipeline_module
+from app.services.analysis_pipeline import FAILING_MAX_OVERALL, AnalysisPipeline
+
+QUESTION = {
+    "id": "pipeline-two-sum",
+    "title": "Two Sum",
+    "difficulty": "easy",
+    "time_limit_minutes": 15,
+    "examples": [{"input": "nums = [2, 7], target = 9", "output": "[0, 1]"}]
+}
+
+# Clean, readable code: the static tier scores its quality high whether or not it works
+CODE = '''
+class Solution:
+    def twoSum(self, nums, target):
+        seen = {}
+        for index, value in enumerate(nums):
+            if target - value in seen:
+                return [seen[target - value], index]
+            seen[value] = index
+        return []
+'''
+
+COMPLEXITY = {"time": {"complexity": "O(n)", "confidence": 0.95}, "space": {"complexity": "O(n)", "confidence": 0.9}}
+
+
+def execution(passed: int, total: int = 4, complexity=None):
+    result = {"status": "ok", "passed": passed, "total": total, "tests": [], "runtime_ms": 1.0, "peak_memory_kb": 1}
+    if complexity:
+        result["complexity"] = complexity
+    return result
+
+
+def analyze(monkeypatch, result, llm_analysis=None, deep_review=False, question=QUESTION):
+    async def fake_run(code, question):
+        return result
+
+    monkeypatch.setattr(pipeline_module.code_runner, "run", fake_run)
+    monkeypatch.setattr(settings, "AI_ANALYSIS_ENABLED", llm_analysis is not None)
+    if llm_analysis is not None:
+        async def fake_llm(question, user_code, time_taken):
+            return dict(llm_analysis)
+
+        monkeypatch.setattr(pipeline_module.ai_service, "analyze_code_with_ai", fake_llm)
+    return asyncio.run(AnalysisPipeline().analyze(question, CODE, 300, deep_review))
+
+
+def test_failing_run_is_capped_and_not_praised(monkeypatch):
+    analysis, tier, _ = analyze(monkeypatch, execution(0))
+    assert tier == "execution"
+    assert analysis["correctness_score"] == 0
+    assert analysis["overall_score"] == 0
+    assert "Code structure is clear and readable" not in analysis["feedback"]
+    assert analysis["improvements"][0].startswith("Fix the failing test cases")
+
+
+def test_mostly_passing_run_stays_below_passing(monkeypatch):
+    analysis, _, _ = analyze(monkeypatch, execution(3))
+    assert analysis["correctness_score"] == 75
+    assert analysis["overall_score"] <= FAILING_MAX_OVERALL
+
+
+def test_passing_run_settles_with_the_mean(monkeypatch):
+    analysis, tier, _ = analyze(monkeypatch, execution(4, complexity=COMPLEXITY))
+    assert tier == "execution"
+    assert analysis["correctness_score"] == 100
+    assert analysis["time_complexity"] == "O(n)"
+    components = [analysis[f] for f in ("correctness_score", "efficiency_score", "code_quality_score",
+                                        "time_management_score")]
+    assert analysis["overall_score"] == round(sum(components) / 4) >= 70
+
+
+def test_failing_run_goes_to_the_llm_when_enabled(monkeypatch):
+    llm = {"correctness_score": 95, "efficiency_score": 90, "code_quality_score": 90, "overall_score": 93,
+           "feedback": ["Looks correct"], "improvements": ["Handle the empty input"]}
+    analysis, tier, _ = analyze(monkeypatch, execution(1), llm_analysis=llm,
+                                question=dict(QUESTION, id="pipeline-llm-failing"))
+    assert tier == "llm"
+    assert analysis["correctness_score"] == 25
+    assert analysis["overall_score"] <= 25
+    assert analysis["improvements"] == ["Handle the empty input"]
+
+
+def test_measured_values_win_over_llm_guesses(monkeypatch):
+    llm = {"correctness_score": 40, "efficiency_score": 20, "code_quality_score": 70, "time_management_score": 5,
+           "overall_score": 10, "time_complexity": "O(n²)", "space_complexity": "O(1)",
+           "feedback": ["Readable"], "improvements": ["Name variables better"]}
+    analysis, tier, _ = analyze(monkeypatch, execution(4, complexity=COMPLEXITY), llm_analysis=llm,
+                                deep_review=True, question=dict(QUESTION, id="pipeline-deep-review"))
+    assert tier == "llm"
+    assert analysis["correctness_score"] == 100
+    assert (analysis["time_complexity"], analysis["space_complexity"]) == ("O(n)", "O(n)")
+    assert analysis["efficiency_score"] == 90
+    assert analysis["time_management_score"] != 5
+    assert analysis["code_quality_score"] == 70  # review-only fields still come from the LLM
+    assert analysis["feedback"] == ["Readable"]
+    components = [analysis[f] for f in ("correctness_score", "efficiency_score", "code_quality_score",
+                                        "time_management_score")]
+    assert analysis["overall_score"] == round(sum(components) / 4)
+
+
+def test_cache_hit_is_rescored_for_the_new_time(monkeypatch):
+    llm = {"correctness_score": 90, "efficiency_score": 80, "code_quality_score": 85, "time_management_score": 100,
+           "overall_score": 89, "feedback": ["Good"], "improvements": []}
+    question = dict(QUESTION, id="pipeline-cache-retime", examples=[])
+    calls = []
+
+    async def fake_llm(question, user_code, time_taken):
+        calls.append(time_taken)
+        return dict(llm)
+
+    monkeypatch.setattr(settings, "AI_ANALYSIS_ENABLED", True)
+    monkeypatch.setattr(pipeline_module.ai_service, "analyze_code_with_ai", fake_llm)
+    pipeline = AnalysisPipeline()
+
+    async def submit_twice():
+        fast = await pipeline.analyze(question, CODE, 60)
+        slow = await pipeline.analyze(question, CODE + "\n# same code, resubmitted\n", 60 * 60)
+        return fast, slow
+
+    (fast, _, fast_cached), (slow, _, slow_cached) = asyncio.run(submit_twice())
+    assert calls == [60] and not fast_cached and slow_cached
+    assert slow["time_management_score"] < fast["time_management_score"]
+    for analysis in (fast, slow):
+        components = [analysis[f] for f in ("correctness_score", "efficiency_score", "code_quality_score",
+                                            "time_management_score")]
+        assert analysis["overall_score"] == round(sum(components) / 4)
+    cached = pipeline_module.analysis_cache.get(pipeline_module.analysis_cache.make_key(question["id"], CODE))
+    assert "time_management_score" not in cached and "overall_score" not in cached
+
+
+def test_fallback_analysis_keeps_local_complexity(monkeypatch):
+    fallback = pipeline_module.ai_service.analyze_code_solution(QUESTION, CODE, 300)
+    assert fallback["ai_fallback"] and "time_complexity" not in fallback
+    question = {**QUESTION, "id": "pipeline-fallback"}
+    analysis, tier, cached = analyze(monkeypatch, execution(3, complexity=COMPLEXITY),
+                                     llm_analysis=fallback, question=question)
+    assert tier == "execution" and analysis["ai_fallback"] and not cached
+    assert analysis["time_complexity"] == "O(n)"
+    assert pipeline_module.analysis_cache.get(pipeline_module.analysis_cache.make_key("pipeline-fallback", CODE)) is None
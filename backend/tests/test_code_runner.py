@@ -0,0 +1,147 @@
+import asyncio
+
+from app.services.code_runner import CodeRunner, _Worker, judge, outputs_match
+
+QUESTION = {
+    "id": "add",
+    "entry_point": "add",
+    "examples": [{"input": "a = 1, b = 2", "output": "3"}],
+    "test_cases": [
+        {"input": "a = 2, b = 2", "output": "4"},
+        {"input": "a = 5, b = 0", "output": "5"},
+        {"input": "a = -3, b = 1", "output": "-2"}
+    ]
+}
+
+CORRECT = "def add(a, b):\n    return a + b\n"
+WRONG = "def add(a, b):\n    return -1\n"
+
+
+def run_all(codes, question=QUESTION, **options):
+    """Results for each submission, run one after another through a single warm worker"""
+    async def go():
+        runner = CodeRunner(workers=1, complexity_budget_seconds=0, **options)
+        await runner.start()
+        try:
+            return [await runner.run(code, question) for code in codes]
+        finally:
+            await runner.stop()
+    return asyncio.run(go())
+
+
+def test_correct_and_wrong_solutions():
+    correct, wrong = run_all([CORRECT, WRONG])
+    assert (correct["status"], correct["passed"], correct["total"]) == ("ok", 4, 4)
+    assert (wrong["passed"], wrong["total"]) == (0, 4)
+    visible = [test for test in wrong["tests"] if not test["hidden"]]
+    assert visible[0]["expected"] == "3" and visible[0]["actual"] == "-1"
+    assert all("expected" not in test for test in wrong["tests"] if test["hidden"])
+
+
+def test_submission_cannot_poison_later_jobs():
+    poison = (
+        "import math\n"
+        "math.isclose = lambda *args, **kwargs: True\n"
+        "def add(a, b):\n"
+        "    return -1\n"
+    )
+    poisoned, wrong, correct = run_all([poison, WRONG, CORRECT])
+    assert poisoned["passed"] == 0
+    assert wrong["passed"] == 0
+    assert correct["passed"] == 4
+
+
+def test_rigged_eq_does_not_pass():
+    rigged = (
+        "class Anything:\n"
+        "    def __eq__(self, other):\n"
+        "        return True\n"
+        "def add(a, b):\n"
+        "    return Anything()\n"
+    )
+    int_subclass = (
+        "class Sneaky(int):\n"
+        "    def __eq__(self, other):\n"
+        "        return True\n"
+        "def add(a, b):\n"
+        "    return Sneaky(-1)\n"
+    )
+    for result in run_all([rigged, int_subclass]):
+        assert result["passed"] == 0
+
+
+def test_imports_and_builtins_are_restricted():
+    imports_os = "import os\ndef add(a, b):\n    return a + b\n"
+    opens_file = "def add(a, b):\n    open('/etc/passwd').read()\n    return a + b\n"
+    uses_allowed = "import heapq\nfrom collections import Counter\ndef add(a, b):\n    return sum(Counter([a, b]).elements()) * 0 + a + b\n"
+    blocked, no_open, allowed = run_all([imports_os, opens_file, uses_allowed])
+    assert blocked["status"] == "runtime_error" and "not allowed" in blocked["error"]
+    assert no_open["passed"] == 0 and "NameError" in no_open["tests"][0]["error"]
+    assert allowed["passed"] == 4
+
+
+def test_worker_never_receives_expected_outputs(monkeypatch):
+    sent = []
+    original = _Worker.run
+
+    def recording_run(self, job, timeout):
+        sent.append(job)
+        return original(self, job, timeout)
+
+    monkeypatch.setattr(_Worker, "run", recording_run)
+    (result,) = run_all([CORRECT])
+    assert result["passed"] == 4
+    assert set(sent[0]) >= {"code", "calls"} and "question" not in sent[0] and "tests" not in sent[0]
+    assert all(set(call) == {"args", "kwargs"} for call in sent[0]["calls"])
+
+
+def test_cpu_limit_leaves_worker_usable():
+    spin = "def add(a, b):\n    while True:\n        pass\n"
+    spun, correct = run_all([spin, CORRECT], cpu_seconds=1, wall_timeout_seconds=5)
+    assert spun["status"] in ("cpu_limit_exceeded", "timeout") and spun["passed"] == 0
+    assert correct["passed"] == 4
+
+
+def test_judge_compares_plain_data():
+    tests = [{"expected": [1, 2], "hidden": False}, {"expected": 0.3, "hidden": True}]
+    execution = {"status": "ok", "outcomes": [{"output": "[2, 1]"}, {"output": "0.30000000000000004"}]}
+    assert judge(execution, tests, unordered=True)["passed"] == 2
+    assert judge(execution, tests, unordered=False)["passed"] == 1
+    malformed = {"status": "ok", "outcomes": [{"output": "not json"}, "junk"]}
+    assert judge(malformed, tests)["passed"] == 0
+
+
+def test_outputs_match():
+    assert outputs_match([0, 1], [0, 1])
+    assert outputs_match(1.0000001, 1)
+    assert not outputs_match([1, 2], [2, 1])
+    assert outputs_match([[1, 2], [0]], [[0], [1, 2]], unordered=True)
+
+
+def escape(statement: str) -> str:
+    """A correct add() that first reaches os through object.__subclasses__(), around the restricted builtins"""
+    return (
+        "def add(a, b):\n"
+        "    wrap_close = next(c for c in ().__class__.__base__.__subclasses__() if c.__name__ == '_wrap_close')\n"
+        "    g = wrap_close.__init__.__globals__\n"
+        f"    {statement}\n"
+        "    return a + b\n"
+    )
+
+
+def test_subclasses_escape_cannot_run_commands_or_touch_files(tmp_path):
+    marker = tmp_path / "esc_marker"
+    secret = tmp_path / "secret"
+    secret.write_text("s3cret")
+    tmp_path.chmod(0o777)
+    popen, opens, writes, forks = run_all([
+        escape(f"print(g['popen']('id; echo pwned > {marker}').read())"),
+        escape(f"print(g['read'](g['open']({str(secret)!r}, g['O_RDONLY']), 100))"),
+        escape(f"g['open']({str(tmp_path / 'written')!r}, g['O_CREAT'] | g['O_WRONLY'])"),
+        escape("g['fork']()"),
+    ])
+    assert not marker.exists() and not (tmp_path / "written").exists()
+    for result in (popen, opens, writes, forks):
+        assert result["passed"] == 0
+        assert "uid=" not in str(result) and "s3cret" not in str(result)
+        assert "Operation not permitted" in result["tests"][0]["error"]
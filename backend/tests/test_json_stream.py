@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from app.services.json_stream import IncrementalJSONParser
+
+DOCUMENT = 'Sure, here it is:\n```json\n' + json.dumps({
+    "overall_score": 82,
+    "time_complexity": "O(n log n)",
+    "feedback": "Handles \"edge\" cases, {mostly} [fine]\\",
+    "strengths": ["clear names", "uses a heap, not a sort", {"note": "nested"}, 7],
+    "scores": {"correctness": 90, "style": [1, 2]},
+    "passed": True,
+    "extra": None,
+}, indent=2) + '\n```'
+
+
+def feed_in_chunks(parser, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start:start + size]))
+    return events
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(DOCUMENT)])
+def test_fields_and_items_survive_any_chunk_split(size):
+    parser = IncrementalJSONParser()
+    events = feed_in_chunks(parser, DOCUMENT, size)
+    expected = json.loads(DOCUMENT[DOCUMENT.index("{"):DOCUMENT.rindex("}") + 1])
+
+    assert parser.complete
+    assert parser.fields == expected
+    assert [event["name"] for event in events if event["type"] == "field"] == list(expected)
+    items = [(event["index"], event["value"]) for event in events if event["type"] == "item"]
+    assert items == list(enumerate(expected["strengths"]))
+
+
+def test_field_is_emitted_as_soon_as_it_completes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"overall_score": 7') == []
+    events = parser.feed('5, "strengths": ["a')
+    assert events == [{"type": "field", "name": "overall_score", "value": 75}]
+    assert parser.feed('", 1') == [{"type": "item", "name": "strengths", "index": 0, "value": "a"}]
+    assert parser.feed('2') == []
+    events = parser.feed(']')
+    assert events == [{"type": "item", "name": "strengths", "index": 1, "value": 12},
+                      {"type": "field", "name": "strengths", "value": ["a", 12]}]
+    assert not parser.complete
+    parser.feed("}")
+    assert parser.complete
+
+
+def test_malformed_value_loses_only_that_value():
+    parser = IncrementalJSONParser()
+    feed_in_chunks(parser, '{"overall_score": 60, "strengths": ["ok", nope], "feedback": "fine"}', 5)
+    assert parser.fields == {"overall_score": 60, "strengths": ["ok"], "feedback": "fine"}
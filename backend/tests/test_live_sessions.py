@@ -0,0 +1,119 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from app.services.question_index import GRADER_ONLY_FIELDS
+from app.services.session_store import COMPLETED
+
+
+@pytest.fixture()
+def client():
+    main.load_question_bank()
+    return TestClient(main.app)
+
+
+def start_session(client, seconds_left=None) -> str:
+    session_id = client.post("/api/sessions", json={"duration": 30}).json()["session_id"]
+    if seconds_left is not None:
+        record = main.session_store._active[session_id]
+        record.start_ms -= 30 * 60000 - int(seconds_left * 1000)
+    return session_id
+
+
+def receive_until(websocket, *types) -> list:
+    """Frames up to and including the first of one of these types, ticks left out"""
+    frames = []
+    while True:
+        frame = websocket.receive_json()
+        if frame["type"] != "tick":
+            frames.append(frame)
+        if frame["type"] in types:
+            return frames
+
+
+def slow_grading(monkeypatch, seconds: float) -> list:
+    """Swap in a grader that takes a while; returns the list it appends to when it finishes"""
+    graded = []
+
+    async def grade_submission(submission):
+        await asyncio.sleep(seconds)
+        graded.append(submission.question_id)
+        return {"submission_id": "s", "success": True, "analysis": {"overall_score": 50}, "ai_powered": True}
+
+    monkeypatch.setattr(main, "grade_submission", grade_submission)
+    return graded
+
+
+def test_question_frame_has_no_grader_fields(client):
+    with client.websocket_connect(f"/api/sessions/{start_session(client)}/live") as websocket:
+        assert websocket.receive_json()["type"] == "session"
+        websocket.send_json({"type": "question", "difficulty": "easy", "id": 1})
+        frame = receive_until(websocket, "question", "error")[-1]
+    assert frame["type"] == "question" and frame["id"] == 1
+    assert not GRADER_ONLY_FIELDS & frame["question"].keys()
+
+
+def test_submit_without_code_is_rejected(client):
+    with client.websocket_connect(f"/api/sessions/{start_session(client)}/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "submit", "question_id": "two-sum", "id": 7})
+        frame = receive_until(websocket, "error", "result")[-1]
+    assert frame["type"] == "error" and frame["request"] == "submit"
+    assert frame["status"] == 422 and frame["id"] == 7
+
+
+def test_deadline_ends_the_session(client):
+    session_id = start_session(client, seconds_left=1)
+    with client.websocket_connect(f"/api/sessions/{session_id}/live") as websocket:
+        websocket.receive_json()
+        frames = receive_until(websocket, "ended")
+    assert [frame["type"] for frame in frames] == ["time_up", "ended"]
+    assert main.session_store._peek(session_id).status == COMPLETED
+
+
+def test_submission_before_the_deadline_is_graded_and_sent(client, monkeypatch):
+    graded = slow_grading(monkeypatch, 1.5)
+    session_id = start_session(client, seconds_left=0.5)
+    with client.websocket_connect(f"/api/sessions/{session_id}/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "submit", "question_id": "q", "user_code": "pass"})
+        frames = receive_until(websocket, "ended")
+    assert [frame["type"] for frame in frames] == ["result", "time_up", "ended"]
+    assert graded == ["q"]
+
+
+def test_submission_after_the_deadline_is_refused(client, monkeypatch):
+    graded = slow_grading(monkeypatch, 0)
+    session_id = start_session(client, seconds_left=0)
+    with client.websocket_connect(f"/api/sessions/{session_id}/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "submit", "question_id": "q", "user_code": "pass"})
+        frames = receive_until(websocket, "ended")
+    assert "result" not in [frame["type"] for frame in frames]
+    assert graded == []
+
+
+def test_grading_survives_the_client_leaving(client, monkeypatch):
+    graded = slow_grading(monkeypatch, 0.5)
+    with client.websocket_connect(f"/api/sessions/{start_session(client)}/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "submit", "question_id": "q", "user_code": "pass"})
+        websocket.send_json({"type": "ping"})
+        receive_until(websocket, "pong")
+    deadline = time.monotonic() + 5
+    while not graded and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert graded == ["q"]
+
+
+def test_end_waits_for_the_result(client, monkeypatch):
+    slow_grading(monkeypatch, 0.5)
+    with client.websocket_connect(f"/api/sessions/{start_session(client)}/live") as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "submit", "question_id": "q", "user_code": "pass"})
+        websocket.send_json({"type": "end"})
+        frames = receive_until(websocket, "ended")
+    assert [frame["type"] for frame in frames] == ["result", "ended"]
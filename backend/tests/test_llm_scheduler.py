@@ -0,0 +1,160 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_scheduler import BACKGROUND, INTERACTIVE, LLMScheduler, LLMUnavailable
+
+
+class UpstreamDown(Exception):
+    pass
+
+
+async def fail(scheduler):
+    with pytest.raises(UpstreamDown):
+        async with scheduler.slot():
+            raise UpstreamDown()
+
+
+def test_token_bucket_allows_a_burst_then_paces_calls():
+    scheduler = LLMScheduler(max_concurrency=10, requests_per_second=20, burst=2)
+    admitted = []
+
+    async def call():
+        async with scheduler.slot():
+            admitted.append(time.monotonic())
+
+    async def scenario():
+        start = time.monotonic()
+        await asyncio.gather(*(call() for _ in range(4)))
+        return [moment - start for moment in admitted]
+
+    offsets = asyncio.run(scenario())
+    assert offsets[0] < 0.02 and offsets[1] < 0.02
+    # Then one token every 50ms
+    assert 0.04 <= offsets[2] < 0.2 and 0.09 <= offsets[3] < 0.3
+    assert scheduler.stats()["completed"] == 4
+
+
+def test_interactive_calls_jump_queued_background_calls():
+    scheduler = LLMScheduler(max_concurrency=1, requests_per_second=0)
+    order = []
+
+    async def call(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await asyncio.sleep(0)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiting = [asyncio.create_task(call("background-1", BACKGROUND)),
+                   asyncio.create_task(call("background-2", BACKGROUND)),
+                   asyncio.create_task(call("interactive", INTERACTIVE))]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth"] == {"interactive": 1, "background": 2}
+        release.set()
+        await asyncio.gather(holder, *waiting)
+
+    asyncio.run(scenario())
+    assert order == ["interactive", "background-1", "background-2"]
+
+
+def test_circuit_opens_then_half_open_trial_decides():
+    scheduler = LLMScheduler(requests_per_second=0, failure_threshold=2, reset_seconds=0.05)
+
+    async def scenario():
+        await fail(scheduler)
+        assert scheduler.state == "closed"
+        await fail(scheduler)
+        assert scheduler.state == "open"
+        with pytest.raises(LLMUnavailable) as refused:
+            await scheduler.acquire()
+        assert refused.value.reason == "circuit_open"
+
+        # After the reset window one trial goes through; anything alongside it is refused
+        await asyncio.sleep(0.06)
+        async with scheduler.slot():
+            assert scheduler.state == "half_open"
+            with pytest.raises(LLMUnavailable):
+                await scheduler.acquire()
+        assert scheduler.state == "closed"
+
+        # A failed trial opens the circuit again straight away
+        await fail(scheduler)
+        await fail(scheduler)
+        await asyncio.sleep(0.06)
+        await fail(scheduler)
+        assert scheduler.state == "open"
+
+    asyncio.run(scenario())
+    stats = scheduler.stats()
+    assert stats["circuit_opens"] == 3 and stats["shed"]["circuit_open"] == 2
+
+
+def test_calls_that_cannot_meet_their_deadline_are_shed():
+    scheduler = LLMScheduler(max_concurrency=1, requests_per_second=0)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        # The estimated wait (one call of ~2s ahead) is already past the deadline: refused up front
+        with pytest.raises(LLMUnavailable) as refused:
+            await scheduler.acquire(INTERACTIVE, max_wait=0.5)
+        assert refused.value.reason == "deadline"
+
+        # Estimated to fit, but the slot isn't freed in time: shed when the deadline passes
+        scheduler._service_seconds = 0.01
+        started = time.monotonic()
+        with pytest.raises(LLMUnavailable) as refused:
+            await scheduler.acquire(INTERACTIVE, max_wait=0.05)
+        assert refused.value.reason == "expired" and time.monotonic() - started < 0.5
+
+        release.set()
+        await holder
+
+    asyncio.run(scenario())
+    stats = scheduler.stats()
+    assert stats["shed"]["deadline"] == 1 and stats["shed"]["expired"] == 1
+    assert stats["queue_depth"] == {"interactive": 0, "background": 0} and stats["in_flight"] == 0
+
+
+def test_full_queue_evicts_background_for_interactive():
+    scheduler = LLMScheduler(max_concurrency=1, requests_per_second=0, max_queue=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        background = asyncio.create_task(scheduler.acquire(BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(scheduler.acquire(INTERACTIVE))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMUnavailable) as refused:
+            await background
+        assert refused.value.reason == "queue_full"
+        with pytest.raises(LLMUnavailable):
+            await scheduler.acquire(BACKGROUND)
+        release.set()
+        await asyncio.gather(holder, interactive)
+
+    asyncio.run(scenario())
+    assert scheduler.stats()["shed"]["queue_full"] == 2
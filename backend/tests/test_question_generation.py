@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from app.services import ai_service as ai_service_module
+from app.services.ai_service import AIInterviewService
+from app.services.question_similarity import QuestionSimilarityIndex
+
+GENERATED = {
+    "id": "lantern_relay",
+    "title": "Lantern Relay",
+    "description": "A row of lanterns is lit one at a time by runners who can each carry a flame a limited "
+                   "distance along the river bank. Given the lantern positions and each runner's range, return "
+                   "the fewest runners needed to light the final lantern, or -1 if it cannot be reached.",
+    "difficulty": "medium",
+    "tags": ["greedy"],
+    "examples": [{"input": "positions = [0, 3, 5], ranges = [3, 2]", "output": "2"}]
+}
+
+
+def make_service(monkeypatch, replies):
+    """A service with a fresh duplicate index whose completions come from replies, one per call"""
+    service = AIInterviewService()
+    service.enabled = True
+    monkeypatch.setattr(ai_service_module, "question_similarity", QuestionSimilarityIndex())
+    prompts = []
+
+    async def fake_completion(messages, temperature, operation, priority, max_tokens, report):
+        prompts.append(messages[0]["content"])
+        await asyncio.sleep(0.05)
+        return json.dumps(replies[min(len(prompts), len(replies)) - 1])
+
+    monkeypatch.setattr(service, "_request_completion", fake_completion)
+    return service, prompts
+
+
+def test_concurrent_requests_share_one_accepted_question(monkeypatch):
+    service, prompts = make_service(monkeypatch, [GENERATED])
+
+    async def generate_many():
+        return await asyncio.gather(*(service.generate_coding_question_with_ai("medium") for _ in range(5)))
+
+    questions = asyncio.run(generate_many())
+    assert len(prompts) == 1
+    assert all(question == GENERATED for question in questions)
+    assert not any(question.get("ai_fallback") or question.get("near_duplicate_of") for question in questions)
+    assert len({id(question) for question in questions}) == 5  # each waiter gets its own copy
+
+
+def test_repeat_generation_is_rejected_then_retried(monkeypatch):
+    fresh = dict(GENERATED, id="orchard_paths", title="Orchard Paths",
+                 description="Count the distinct paths through an orchard grid where some trees block the way "
+                             "and a picker may only move right or down while collecting at most k baskets.")
+    service, prompts = make_service(monkeypatch, [GENERATED, GENERATED, fresh])
+
+    async def generate_twice():
+        first = await service.generate_coding_question_with_ai("medium")
+        second = await service.generate_coding_question_with_ai("medium")
+        return first, second
+
+    first, second = asyncio.run(generate_twice())
+    assert first == GENERATED
+    assert second == fresh
+    assert len(prompts) == 3 and "Lantern Relay" in prompts[2]
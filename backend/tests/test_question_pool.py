@@ -0,0 +1,68 @@
+import asyncio
+
+from app.services.metrics import metrics
+from app.services.question_pool import QuestionPool
+
+
+def make_pool(**options):
+    generated = []
+
+    async def generator(difficulty, topic):
+        generated.append((difficulty, topic))
+        return {"id": f"q{len(generated)}", "difficulty": difficulty, "topic": topic}
+
+    pool = QuestionPool(generator, target_depth=3, refills_per_minute=0, difficulties=("easy",), **options)
+    return pool, generated
+
+
+async def settle():
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_topic_pools_are_stocked_by_demand():
+    pool, generated = make_pool()
+
+    async def scenario():
+        pool.start()
+        await settle()
+        assert generated.count(("easy", None)) == 3
+        assert pool.pop("easy", "graphs") is None
+        await settle()
+        assert generated.count(("easy", "graphs")) == 1  # one-off topic: one question, not a full pool
+        for _ in range(4):
+            pool.pop("easy", "Graphs ")
+            await settle()
+        await pool.stop()
+
+    asyncio.run(scenario())
+    # Four served, and now that it's in demand the pool is kept at full depth
+    assert generated.count(("easy", "graphs")) == 4 + 3
+    assert pool.stats()["depth"]["easy:graphs"] == 3
+
+
+def test_idle_topic_pools_are_evicted():
+    pool, generated = make_pool(key_idle_seconds=0.05, max_keys=2)
+
+    async def scenario():
+        pool.start()
+        pool.pop("easy", "trees")
+        await settle()
+        assert pool.pop("easy", "heaps") is None and "easy:heaps" not in pool.stats()["depth"]  # full
+        await asyncio.sleep(0.1)
+        pool.pop("easy", "heaps")
+        await settle()
+        await pool.stop()
+
+    asyncio.run(scenario())
+    depth = pool.stats()["depth"]
+    assert "easy:trees" not in depth and "easy:heaps" in depth and "easy:*" in depth
+    assert pool.evictions == 1
+    assert generated.count(("easy", "trees")) == 1
+
+
+def test_pool_counters_are_exported():
+    text = metrics.render()
+    assert "# TYPE question_pool_events_total counter" in text
+    assert 'question_pool_events_total{event="fallback"}' in text
+    assert 'question_pool_depth{difficulty="easy",topic="*"}' in text
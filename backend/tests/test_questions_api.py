@@ -0,0 +1,96 @@
+import asyncio
+
+import orjson
+from fastapi.testclient import TestClient
+
+import main
+from app.services.question_index import GRADER_ONLY_FIELDS, public_question, question_index
+from main import app
+
+
+def test_public_question_drops_grader_fields():
+    question = {"id": "q", "title": "Q", "test_cases": [{"input": "x = 1", "output": "1"}],
+                "compare": "unordered", "entry_point": "solve"}
+    assert public_question(question) == {"id": "q", "title": "Q"}
+    assert "test_cases" in question  # the bank entry itself is untouched
+
+
+def test_served_questions_carry_no_hidden_tests():
+    with TestClient(app) as client:
+        for difficulty in ("easy", "medium", "hard"):
+            for _ in range(10):
+                response = client.get("/api/questions", params={"difficulty": difficulty})
+                assert response.status_code == 200
+                question = response.json()
+                assert not GRADER_ONLY_FIELDS & set(question)
+                assert question_index.get(question["id"])["title"] == question["title"]
+
+        generated = client.get("/questions/generate/medium").json()["question"]
+        assert not GRADER_ONLY_FIELDS & set(generated)
+
+
+TWO_SUM = (
+    "def twoSum(nums, target):\n"
+    "    seen = {}\n"
+    "    for i, n in enumerate(nums):\n"
+    "        if target - n in seen:\n"
+    "            return [seen[target - n], i]\n"
+    "        seen[n] = i\n"
+)
+
+
+def test_both_submission_endpoints_grade_alike():
+    with TestClient(app) as client:
+        scores = set()
+        for _ in range(2):
+            legacy = client.post("/api/submissions", json={
+                "question_id": "two-sum", "user_code": TWO_SUM, "time_taken_seconds": 300
+            }).json()
+            graded = client.post("/questions/submit", json={
+                "question_id": "two-sum", "user_code": TWO_SUM, "time_taken_seconds": 300
+            }).json()
+            assert legacy["analysis"]["execution"]["passed"] == legacy["analysis"]["execution"]["total"]
+            assert legacy["analysis"]["overall_score"] == graded["analysis"]["overall_score"]
+            assert legacy["ai_powered"] is (legacy["analysis_tier"] == "llm")
+            scores.add(legacy["analysis"]["overall_score"])
+        assert len(scores) == 1 and scores.pop() >= 70
+
+
+def test_rejected_submission_is_not_counted(monkeypatch):
+    async def queue_full(row):
+        raise main.SubmissionQueueFull("full")
+
+    def attempts():
+        return asyncio.run(main.user_stats.snapshot())["total_attempts"]
+
+    with TestClient(app) as client:
+        before = attempts()
+        monkeypatch.setattr(main.submission_writer, "save", queue_full)
+        response = client.post("/api/submissions", json={
+            "question_id": "two-sum", "user_code": TWO_SUM, "time_taken_seconds": 300
+        })
+        assert response.status_code == 503
+        assert attempts() == before
+        monkeypatch.undo()
+        assert client.post("/api/submissions", json={
+            "question_id": "two-sum", "user_code": TWO_SUM, "time_taken_seconds": 300
+        }).status_code == 200
+        assert attempts() == before + 1
+
+
+def test_streams_are_orjson_and_stats_untagged():
+    body = {"question_id": "two-sum", "user_code": TWO_SUM, "time_taken_seconds": 300}
+    with TestClient(app) as client:
+        events = client.post("/questions/submit/stream", json=body).text.strip().split("\n\n")
+        assert events[-1].startswith("event: done\ndata: ")
+        done = orjson.loads(events[-1].split("data: ", 1)[1])
+        assert done["analysis"]["execution"]["passed"] == done["analysis"]["execution"]["total"]
+
+        lines = client.post("/questions/submit/batch", json={"submissions": [body, body]}).text.splitlines()
+        results = [orjson.loads(line) for line in lines]
+        assert results[-1]["done"] and results[-1]["items"] == 2
+        assert {result["index"] for result in results[:-1]} == {0, 1}
+
+        stats = client.get("/questions/stats")
+        assert stats.status_code == 200 and "etag" not in stats.headers
+        assert "analysis_pipeline" in stats.json()
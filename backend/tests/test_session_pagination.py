@@ -0,0 +1,60 @@
+import base64
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal
+from app.models.interview import InterviewSession
+from main import app
+
+SESSION_TYPE = "pagination-test"
+
+
+def add_sessions():
+    """Rows spread over a few seconds, several sharing each second, so (start_time, id) ties get exercised"""
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    with SessionLocal() as db:
+        for index in range(23):
+            db.add(InterviewSession(session_type=SESSION_TYPE, status="completed" if index % 3 else "in_progress",
+                                    start_time=base + timedelta(seconds=index // 4)))
+        db.commit()
+
+
+def pages(client, limit, **filters):
+    cursor, seen = None, []
+    while True:
+        params = {"limit": limit, "session_type": SESSION_TYPE, **filters}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/interview/sessions", params=params)
+        assert response.status_code == 200
+        seen.append([row["id"] for row in response.json()])
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            return seen
+
+
+def test_keyset_pages_have_no_gaps_or_duplicates():
+    with TestClient(app) as client:
+        add_sessions()
+        everything = client.get("/interview/sessions", params={"limit": 200, "session_type": SESSION_TYPE}).json()
+        expected = [row["id"] for row in sorted(everything, key=lambda row: (row["start_time"], row["id"]), reverse=True)]
+        assert len(expected) == 23
+
+        for limit in (1, 4, 7, 23):
+            walked = pages(client, limit)
+            assert all(len(page) == limit for page in walked[:-1])
+            assert [session_id for page in walked for session_id in page] == expected
+
+        in_progress = [row["id"] for row in everything if row["status"] == "in_progress"]
+        walked = [session_id for page in pages(client, 3, status="in_progress") for session_id in page]
+        assert sorted(walked) == sorted(in_progress) and len(set(walked)) == len(walked)
+
+
+def test_bad_cursor_is_a_400():
+    with TestClient(app) as client:
+        for cursor in ("!!!not-base64", base64.urlsafe_b64encode(b"no separator").decode(),
+                       base64.urlsafe_b64encode(b"yesterday|1").decode(),
+                       base64.urlsafe_b64encode(b"2026-01-01T00:00:00|x").decode()):
+            response = client.get("/interview/sessions", params={"cursor": cursor})
+            assert response.status_code == 400 and response.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": 42}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("same", upstream) for _ in range(5)), flight.do("other", upstream))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 2
+    assert all(result == {"answer": 42} for result in results)
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+
+def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+
+    async def upstream():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("key", upstream) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_one_waiter_cancelling_leaves_the_call_for_the_rest():
+    flight = SingleFlight()
+    calls = []
+
+    async def upstream():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        leaver = asyncio.create_task(flight.do("key", upstream))
+        stayer = asyncio.create_task(flight.do("key", upstream))
+        await asyncio.sleep(0.005)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(scenario()) == "done"
+    assert len(calls) == 1
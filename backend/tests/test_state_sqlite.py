@@ -0,0 +1,108 @@
+import asyncio
+import os
+import threading
+
+from app.services.session_store import ACTIVE, COMPLETED, SQLiteSessionStore, SessionRecord, SessionStore, now_ms
+from app.services.sqlite_state import SharedDB
+from app.services.user_stats import SQLiteUserStats
+
+
+def make_db(tmp_path) -> SharedDB:
+    return SharedDB(str(tmp_path / "state.db"))
+
+
+def trace(db: SharedDB) -> list:
+    """(statement, thread id) for every statement the connection runs from now on"""
+    statements = []
+    db._connect().set_trace_callback(lambda sql: statements.append((sql, threading.get_ident())))
+    return statements
+
+
+def test_constructing_the_stores_touches_no_file(tmp_path):
+    db = make_db(tmp_path)
+    SQLiteSessionStore(db)
+    SQLiteUserStats(db)
+    assert not os.path.exists(db.path)
+
+
+def test_get_is_a_select_and_runs_off_the_loop(tmp_path):
+    db = make_db(tmp_path)
+    store = SQLiteSessionStore(db)
+
+    async def scenario():
+        await store.start()
+        await store.add("s1", SessionRecord("coding", "medium", 30, None, True, start_ms=now_ms() - 60000))
+        statements = trace(db)
+        record = await store.get("s1")
+        during_get = list(statements)
+        await store.stop()
+        return threading.get_ident(), during_get, record
+
+    loop_thread, statements, record = asyncio.run(scenario())
+    assert statements and all(sql.lstrip().upper().startswith("SELECT") for sql, _ in statements)
+    assert all(thread != loop_thread for _, thread in statements)
+    assert record.status == ACTIVE
+
+
+def test_touches_are_written_back_in_a_batch(tmp_path):
+    db = make_db(tmp_path)
+    store = SQLiteSessionStore(db, idle_ttl_seconds=60)
+    old_ms = now_ms() - 120000
+
+    async def scenario():
+        await store.start()
+        for session_id in ("s1", "s2", "s3"):
+            await store.add(session_id, SessionRecord("coding", "medium", 30, None, True, start_ms=old_ms))
+        await store.get("s1")
+        await store.get("s2")
+        # Not written yet, but the sweep flushes first, so neither counts as idle
+        assert db.query("SELECT MAX(last_seen_ms) FROM sessions")[0][0] == old_ms
+        statements = trace(db)
+        expired = await store.sweep()
+        await store.stop()
+        return expired, statements
+
+    expired, statements = asyncio.run(scenario())
+    assert expired == 1
+    assert sum("last_seen_ms = max" in sql for sql, _ in statements) == 2
+    assert sum(sql == "BEGIN IMMEDIATE" for sql, _ in statements) == 1
+    statuses = dict(db.query("SELECT id, status FROM sessions"))
+    assert statuses == {"s1": ACTIVE, "s2": ACTIVE, "s3": COMPLETED}
+
+
+def test_sweep_awaits_on_expire(tmp_path):
+    ended = []
+
+    async def on_expire(record):
+        ended.append(record.duration_minutes)
+
+    async def scenario(store):
+        await store.start()
+        await store.add("s1", SessionRecord("coding", "medium", 30, None, True, start_ms=now_ms() - 600000))
+        await store.sweep()
+        await store.stop()
+
+    asyncio.run(scenario(SessionStore(idle_ttl_seconds=60, on_expire=on_expire)))
+    asyncio.run(scenario(SQLiteSessionStore(make_db(tmp_path), idle_ttl_seconds=60, on_expire=on_expire)))
+    assert ended == [0, 0]
+
+
+def test_sqlite_user_stats_round_trip(tmp_path):
+    stats = SQLiteUserStats(make_db(tmp_path), recent_size=2)
+
+    async def scenario():
+        await stats.start()
+        for session_id in ("a", "b", "c"):
+            await stats.record_session_start(session_id)
+        await stats.record_session_end(30)
+        await stats.record_submission(90, "easy")
+        await stats.record_submission(40, "easy")
+        return await stats.recent_session_ids(), await stats.snapshot()
+
+    recent, snapshot = asyncio.run(scenario())
+    assert recent == ["b", "c"]
+    assert snapshot["total_attempts"] == 2
+    assert snapshot["problems_solved"] == 1
+    assert snapshot["difficulty_breakdown"]["easy"]["average_score"] == 65
+    assert snapshot["sessions_started"] == 3
+    assert snapshot["average_session_minutes"] == 30